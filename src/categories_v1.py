@@ -823,4 +823,590 @@ CATEGORIES = {
         "first day of school", "první den ve škole", "prvni den ve skole",
         "back to school", "family trip", "birthday party", "milestone", "selfie"
     ]
-}
\ No newline at end of file
+}
+
+
+# ========================================================================
+# KONTEXTOVÁ PRAVIDLA
+# ========================================================================
+# Každé pravidlo má až tři seznamy triggerů:
+#   very_specific - stačí 1 shoda
+#   kombinacni    - 2+ shody NEBO 1 kombinační + 1 kontextová
+#   kontextove    - samy o sobě nestačí, jen doplňují kombinační
+# Pořadí v seznamu = priorita (první aktivované pravidlo vyhrává).
+CONTEXT_RULES = [
+    # PRAVIDLO 1: Recepty - vyžaduje 2+ triggery NEBO 1 velmi specifický
+    {
+        "name": "PRAVIDLO 1",
+        "category": "Recepty",
+        "very_specific": [
+            # ===== VELMI SPECIFICKÉ NÁSTROJE =====
+            "slowcooker", "slow cooker", "instant pot", "air fryer",
+            "airfryer", "thermomix", "multicooker",
+
+            # ===== FOOD BLOGGER ÚČTY =====
+            "mycookingdiary", "toprecepty", "receptyonline", "boredoflunch",
+
+            # ===== SPECIFICKÉ POKRMY =====
+            "slowcooker chorizo", "creamy chicken", "sundried tomato pasta",
+
+            # ===== JASNÉ INDIKÁTORY =====
+            "cookbook", "meal prep", "mealplan",
+            "jidelni plan", "food blog", "food diary"
+        ],
+        "kombinacni": [
+            "ingredience", "ingredients",
+            "cooking", "vareni", "peceni", "baking",
+            "foodie", "recept", "recipe",
+            "muffin", "muffins", "muffiny",
+            "cupcake", "cupcakes",
+            "cookie", "cookies",
+            "brownie", "brownies",
+            "cake", "buchta", "kolac", "kolace",
+            "dort", "dorty", "dessert", "sladke",
+            "chorizo", "sundried tomato", "pasta", "creamy", "chicken",
+            "vegan", "vegetarian", "vegetariansky",
+            "gluten free", "bezlepkovy", "bez lepku",
+            "low carb", "keto", "paleo", "whole30",
+            "sheet pan", "one pot", "skillet",
+            "co varit", "co uvarit", "what to cook",
+            "recept na", "recipe for"
+        ],
+        "kontextove": [
+            "food", "jidlo", "strava",
+            "cooking", "baking"
+        ],
+    },
+
+    # PRAVIDLO 2: Obleceni_Styl - musí mít alespoň 2 triggery
+    {
+        "name": "PRAVIDLO 2",
+        "category": "Obleceni_Styl",
+        "very_specific": [],
+        "kombinacni": [
+            # ===== ZNAČKY / OBCHODY =====
+            "zara", "hm", "h&m", "mango", "reserved", "cos", "uniqlo",
+            "nike", "adidas", "puma", "new balance", "vans",
+            "decathlon", "columbia", "northface", "patagonia",
+            "wheat", "bergam",
+            # ===== FASHION KONCEPTY =====
+            "capsule wardrobe", "capsule closet",
+            "ootd", "try on", "haul", "lookbook",
+            "color analysis", "barevna typologie",
+            "winter palette", "soft autumn",
+            "fit check", "mirror selfie",
+            "stylista", "stylist",
+            "vyprodej", "sleva",
+            # ===== SPECIFICKÉ KOUSKY =====
+            "dzinovina", "denim",
+            "kardigan", "cardigan",
+            "blazer",
+            "crop top",
+            "crossbody",
+            "lodicky", "heels",
+            "baleriny", "flats",
+            "bunda", "bundy", "jacket",
+            "kabat", "coat", "parka",
+            "saty", "dress", "dresses",
+            "sukne", "skirt",
+            "kalhoty", "pants",
+            "boty", "shoes",
+            # ===== MATERIÁLY =====
+            "kasmir", "cashmere",
+            "linen", "len",
+            "leather", "kozenka", "kuze",
+            # ===== KONTEXTOVÉ FRÁZE =====
+            "outfit", "outfits",
+            "kombinace", "mix and match",
+            "trendy", "trend",
+            # ===== VELIKOSTI (důležité pro PRAVIDLO 2) =====
+            "detska", "detska bunda", "zimnich", "zimnich dnu", 
+            "velikost", "size"
+        ],
+        "kontextove": [],
+    },
+
+    # PRAVIDLO 3: Zahrada - velmi specifické rostliny
+    {
+        "name": "PRAVIDLO 3",
+        "category": "Zahrada",
+        "very_specific": [
+            # ===== VELMI SPECIFICKÉ ROSTLINY =====
+            "allium", "giganteum", "ambassador",
+            "hydrangea", "hortenzie",
+            "erigeron", "karvinskianus",
+            "pinus mugo", "mugo",
+            "salvia", "purple rain",
+            "sesleria", "thymus", "dianthus",
+            # ===== ZAHRADNÍ STYLY =====
+            "gravel garden", "sterkovy zahon",
+            "naturalistic planting", "naturalisticky styl",
+            "layered mix", "mix vysadby",
+            "structured planting", "kompozice trvalek",
+            "coastal garden",
+            # ===== OSVĚTLENÍ ZAHRADY =====
+            "garden lighting", "osvetleni zahrady", "uplights",
+            "zahradni svetla", "osvetleni stromu",
+            # ===== SPECIFICKÉ POJMY =====
+            "gravel mulch", "sterkovy mulc",
+            "container gardening", "potted plants",
+            "garden composition",
+            "mrazuvzdorne",
+            "kapkova zavlaha",
+            "garden path", "sterkove cesty",
+            "flower bed", "planting border",
+            # ===== ZÁKLADNÍ ALE BEZPEČNÉ =====
+            "trvalky", "perennials",
+            "garden design", "design zahrady",
+            "gardening", "gardener", "zahradkar",
+            "bylinky", "herbs",
+            "sukulent", "succulent",
+            "travy", "grasses",
+            # ===== AKTIVITY =====
+            "pestovani", "growing",
+            "vysadba", "planting",
+            "pruning",
+            "mulching", "mulc",
+            # ===== Z TVÝCH PŘÍKLADŮ =====
+            "zahradka", "zahon", "pitko", "ptaci",
+            "petrazahradnici", "biogarden", "jahody", "rostliny", "oklepavaji"
+        ],
+        "kombinacni": [],
+        "kontextove": [],
+    },
+
+    # PRAVIDLO 4: Dum_Design - interiér, architektura, outdoor
+    {
+        "name": "PRAVIDLO 4",
+        "category": "Dum_Design",
+        "very_specific": [
+            # ===== ARCHITEKTONICKÉ PROJEKTY =====
+            "pudorys", "floorplan",
+            "pudorys 4kk",
+            "vizualizace", "render",
+            "rekonstrukce", "renovation",
+            "navrh domu", "plan domu",
+            "moderni dum", "bungalov",
+
+            # ===== NÁBYTKOVÉ OBCHODY =====
+            "ikea", "jysk", "kika",
+
+            # ===== SPECIFICKÉ STYLY =====
+            "scandi", "scandinavian", "nordic",
+            "japandi",
+            "boho", "bohemian",
+            "industrial",
+
+            # ===== VELMI SPECIFICKÉ PRVKY =====
+            "vestavena skrin", "walk-in closet",
+            "satna", "open closet",
+            "kuchynsky ostrov", "kitchen island",
+            "barove zidle",
+            "mikrocement", "terazzo",
+            "akusticke panely",
+            "lamely", "slat wall", "wood slats",
+            "accent wall", "green wall",
+            "moodboard",
+
+            # ===== OUTDOOR =====
+            "pergola", "lamelova pergola",
+            "outdoor living", "outdoor seating",
+            "baldachyn",
+
+            # ===== DĚTSKÝ POKOJ =====
+            "detsky pokoj", "kids room",
+            "playroom",
+
+            # ===== NÁBYTEK =====
+            "sedaci souprava", "sofa",
+            "vestaveny nabytek",
+            "ulozny system", "storage system",
+
+            # ===== SPECIFICKÉ MÍSTNOSTI =====
+            "home office", "study nook",
+            "living working",
+            "minimal bedroom", "cozy bedroom",
+            "modern hallway", "entry design",
+
+            # ===== MATERIÁLY =====
+            "parkety", "vinyl flooring",
+            "marble", "mramor",
+            "obklad", "sterka"
+        ],
+        "kombinacni": [],
+        "kontextove": [],
+    },
+
+    # PRAVIDLO 5: Deti_Aktivity - vyžaduje 2+ triggery NEBO 1 velmi specifický
+    {
+        "name": "PRAVIDLO 5",
+        "category": "Deti_Aktivity",
+        "very_specific": [
+            "montessori", "waldorf",
+            "sensory bin", "sensory play",
+            "busy book", "quiet book",
+            "slime", "kinetic sand",
+            "play dough", "plastelina",
+            "pracovni list", "worksheet",
+            "omalovanky", "coloring pages",
+            "printable", "sablona",
+            "phonics", "alphabet learning", "abeceda",
+            "counting activity", "pocitani",
+            "toddler activity", "preschool activity",
+            "kids craft", "crafts for kids",
+            "detske tvoreni"
+        ],
+        "kombinacni": [
+            "craft", "crafting", "tvoreni",
+            "vyrabeni", "making", "diy",
+            "malovani", "painting",
+            "drawing", "kresba",
+            "lepeni", "gluing",
+            "strihani", "cutting",
+            "pastelky", "crayons", "fixy", "markers",
+            "origami",
+            "kreativita", "creative",
+            "aktivita", "activity",
+            "trideni", "sorting",
+            "experiment"
+        ],
+        "kontextove": [
+            "deti", "kids", "children",
+            "detsky", "toddler", "preschool"
+        ],
+    },
+
+    # PRAVIDLO 6: Vychova_Deti - vyžaduje 2+ triggery NEBO 1 velmi specifický
+    {
+        "name": "PRAVIDLO 6",
+        "category": "Vychova_Deti",
+        "very_specific": [
+            "gentle parenting", "respectful parenting", "attachment parenting",
+            "positive discipline", "pozitivni vychova",
+            "detsky psycholog", "child psychologist",
+            "jak vychovavat", "raising children",
+            "tantrum", "tantrums",
+            "sibling rivalry", "sourozenci zlounost",
+            "time out", "time-out",
+            "natural consequences", "prirozene dusledky",
+            "routine chart", "behavioral chart",
+            "screen time limits", "obrazovky deti",
+            "spankova hygiena deti",
+            "emocni regulace deti",
+            "citova vazba", "attachment theory",
+            "toddler discipline", "preschooler behavior",
+            "parenting tips", "parenting advice",
+            "vychovne metody"
+        ],
+        "kombinacni": [
+            "vychova", "parenting",
+            "rodicovstvi", "parent", "parents",
+            "discipline", "disciplina",
+            "chovani", "behavior", "behaviour",
+            "hranice", "boundaries", "limits", "pravidla",
+            "respekt", "respect", "respectful",
+            "empatie", "empathy",
+            "odmena", "odmeny", "reward", "trest", "punishment",
+            "vztek", "anger", "uklidnit", "calming",
+            "rozvoj deti", "child development",
+            "emocni inteligence",
+            "socialni dovednosti",
+            "adaptace skolka", "school adaptation",
+            "sourozenec", "siblings",
+            "navyk", "habit", "rutina", "routine",
+            "temperament"
+        ],
+        "kontextove": [
+            "deti", "kids", "children", "child",
+            "detsky", "toddler", "preschooler",
+            "rodicovstvi", "motherhood", "fatherhood"
+        ],
+    },
+
+    # PRAVIDLO 7: Zdravi - medicína, těhotenství, cvičení
+    {
+        "name": "PRAVIDLO 7",
+        "category": "Zdravi",
+        "very_specific": [
+            # ===== MEDICÍNA =====
+            "lek", "leky", "medication", "pills",
+            "lecba", "treatment", "therapy", "terapie",
+            "fyzioterapie", "physiotherapy", "rehab", "rehabilitace",
+            "doktor", "doctor", "lekar", "physician", "medical specialist",
+            "krevni testy", "blood test", "screening",
+            "prevence zraneni", "injury prevention",
+
+            # ===== TĚHOTENSTVÍ & POROD =====
+            "porod", "po porodu", "postpartum", "after birth",
+            "tehotenstvi", "pregnancy", "pregnant", "tehotna",
+            "panevni dno", "pelvic floor",
+
+            # ===== NEMOCI & PŘÍZNAKY =====
+            "horecka", "fever",
+            "nachlazeni", "cold", "flu",
+            "imunita", "immunity",
+            "dermatitida", "akne", "vyrazka", "ekzem", "alergie",
+            "zinkova mast", "masticka",
+
+            # ===== ZDRAVOTNÍ LÁTKY =====
+            "probiotika", "probiotics",
+            "omega 3",
+            "mikrobiom", "gut health"
+        ],
+        "kombinacni": [
+            "calisthenics", "bodyweight",
+            "hiit", "tabata",
+            "protahovani", "stretching",
+            "cviceni", "workout",
+            "rehabilitacni cviceni",
+            "vitaminy", "vitamins",
+            "supplements", "doplnky",
+            "minerals", "mineraly"
+        ],
+        "kontextove": [
+            "zdravi", "health",
+            "prevence", "prevention",
+            "regenerace", "recovery"
+        ],
+    },
+
+    # PRAVIDLO 8: IT_Prace - vyžaduje 2+ triggery NEBO 1 velmi specifický
+    {
+        "name": "PRAVIDLO 8",
+        "category": "IT_Prace",
+        "very_specific": [
+            # ===== VELMI SPECIFICKÉ IT NÁSTROJE =====
+            "jira", "postman", "swagger", "newman", "bruno api",
+            "selenium", "playwright", "cypress", "pytest",
+            "gitlab", "github actions", "bitbucket",
+
+            # ===== IT KOMUNITY & VZDĚLÁVÁNÍ =====
+            "czechitas", "women go tech", "women in tech",
+            "engeto", "green fox", "itnetwork",
+            "coding bootcamp", "qa academy", "tester akademie",
+            "rekvalifikace it", "it rekvalifikace", "kariera v it",
+            "skillsbuild", "digitalni certifikat",
+            "sladovani kariery s materstvi",
+            "career in it", "work in it", "it industry", "it field",
+            "tech career", "tech industry",
+
+            # ===== KYBERBEZPEČNOST =====
+            "kyberbezpecnost", "cyberbezpecnost", "kyberneticka bezpecnost",
+            "cybersecurity", "cybersecurity courses",
+            "hands on cybersecurity",
+            "penetration test", "pentest",
+            "phishing", "malware", "ransomware",
+            "ethical hacking", "cyber attack",
+            "owasp", "vulnerability scan",
+            "threat detection", "incident response",
+            "soc analyst",
+
+            # ===== AI & AUTOMATION =====
+            "prompt engineering", "chatgpt", "claude ai", "copilot",
+            "machine learning", "deep learning", "neural network",
+            "data science", "data analyst",
+            "robotic process automation",
+            "ai tools", "ai apps", "generative ai",
+            "artificial intelligence",
+
+            # ===== QA SPECIFIKA =====
+            "test case", "test plan", "test scenario",
+            "bug report", "bug tracking",
+            "regression test", "smoke test", "sanity test",
+            "test automation", "api testing",
+            "manual testing", "exploratory testing",
+            "qa engineer", "qa process", "qa tools"
+        ],
+        "kombinacni": [
+            "junior developer", "junior tester", "junior coder",
+            "career switch", "career change",
+            "devops", "frontend", "backend", "fullstack",
+            "scrum", "agile",
+            "pipeline", "deployment",
+            "unit test", "integration test",
+            "endpoint", "rest api", "soap",
+            "pull request", "merge request",
+            "code review", "debugging",
+            "test environment", "staging", "production"
+        ],
+        "kontextove": [
+            "developer", "tester", "coder",
+            "programming", "programovani", "coding",
+            "software", "automation", "testing"
+        ],
+    },
+
+    # PRAVIDLO 9: Finance - pouze nejjasnější finanční termíny
+    {
+        "name": "PRAVIDLO 9",
+        "category": "Finance",
+        "very_specific": [
+            # ===== ÚČETNICTVÍ & DANĚ =====
+            "faktura", "invoice",
+            "danove priznani", "tax return",
+            "vypis z uctu", "bank statement",
+            "uctenka", "receipt",
+
+            # ===== INVESTICE =====
+            "etf", "dividenda", "dividend",
+            "portfolio", "net worth",
+            "akcie", "stocks",
+
+            # ===== FINANČNÍ PRODUKTY =====
+            "hypoteka", "mortgage",
+            "penzijko", "penzijni sporeni",
+            "stavebko",
+
+            # ===== FINANČNÍ PLÁNOVÁNÍ =====
+            "nouzovy fond", "emergency fund",
+            "fire movement",
+            "apr", "rpsn",
+            "inflace", "inflation"
+        ],
+        "kombinacni": [],
+        "kontextove": [],
+    },
+
+    # PRAVIDLO 10: Traveling - vyžaduje 2+ triggery NEBO 1 velmi specifický
+    {
+        "name": "PRAVIDLO 10",
+        "category": "Traveling",
+        "very_specific": [
+            # ===== CESTOVATELSKÉ FRÁZE =====
+            "kam jet", "kde jet", "where to go", "travel to",
+            "must visit", "must see", "top places",
+            "bucket list",
+            "travel itinerary", "itinerar", "itinerary",
+            "roadtrip", "road trip",
+
+            # ===== CESTOVATELSKÉ SLUŽBY =====
+            "home exchange", "vymena domu", "house swap",
+            "airbnb", "booking com",
+            "car rental", "pujcovna auta",
+            "travel insurance", "cestovni pojisteni",
+            "attractions", "tours",
+
+            # ===== DOKUMENTY & LETIŠTĚ =====
+            "visa", "esta visa", "esta application", "passport",
+            "letiste", "airport",
+            "flight", "letadlo",
+            "border crossing", "checklist cestovani",
+
+            # ===== OUTDOOROVÉ CESTOVÁNÍ =====
+            "glamping", "vanlife", "campervan",
+            "national park", "hiking trail",
+            "camping trip"
+        ],
+        "kombinacni": [
+            "dovolena", "vacation", "holiday",
+            "vylet", "trip", "weekend trip",
+            "cestovani", "traveling", "travelling",
+            "ubytovani", "accommodation",
+            "sightseeing", "pamatka", "monument",
+            # ZEMĚ
+            "australia", "austria", "belgium",
+            "chorvatsko", "croatia",
+            "france", "francie",
+            "recko", "greece",
+            "italie", "italy",
+            "nemecko", "germany",
+            "polsko", "poland",
+            "portugalsko", "portugal",
+            "spanelsko", "spain",
+            "svycarsko", "switzerland",
+            "uk", "england", "london",
+            "usa", "canada", "mexico",
+            "thajsko", "thailand", "vietnam", "bali",
+            "egypt", "maroko", "morocco", "turecko", "turkey"
+        ],
+        "kontextove": [
+            "travel", "cestovani",
+            "destination", "destinace",
+            "trip", "journey"
+        ],
+    },
+
+    # PRAVIDLO 11: Deti_Svaciny - vyžaduje 2+ triggery NEBO 1 velmi specifický
+    {
+        "name": "PRAVIDLO 11",
+        "category": "Deti_Svaciny",
+        "very_specific": [
+            # ===== SVAČINOVÁ TERMINOLOGIE =====
+            "svacina", "svaciny", "svacinek", "svaca",
+            "svacinka", "svacinky", "svacinovy", "svacinova",
+            "svacina do skolky", "svacina na cestu",
+            "zdrava svacina", "zdrava svacina",
+
+            # ===== BENTO & LUNCHBOXY =====
+            "bento", "bento box",
+            "krabickovani", "lunchbox",
+            "svacinkovy box", "snack box",
+
+            # ===== POUCHES & TYČINKY =====
+            "pouch", "kapsicka", "ovocny pouch",
+            "tycinka", "tycinky", "granola bar", "energy bar"
+        ],
+        "kombinacni": [
+            "snack", "snacks", "snacking",
+            "on the go", "do auta", "na cestu",
+            "skolka", "school", "preschool",
+            "bez cukru", "sugar free", "no sugar",
+            "bez orechu", "nut free",
+            "vhodne pro deti", "suitable for kids"
+        ],
+        "kontextove": [
+            "deti", "kids", "children",
+            "detsky", "detske",
+            "zdrava", "healthy"
+        ],
+    },
+
+    # PRAVIDLO 12: Holidays - vyžaduje 2+ triggery NEBO 1 velmi specifický
+    {
+        "name": "PRAVIDLO 12",
+        "category": "Holidays",
+        "very_specific": [
+            # ===== VÁNOCE =====
+            "vanoce", "christmas", "xmas", "vanocni",
+            "adventni kalendar", "advent calendar",
+            "christmas tree", "vanocni stromek",
+            "christmas market", "vanocni trhy",
+            "santa claus", "jezisek",
+            "wreath", "venec",
+
+            # ===== VELIKONOCE =====
+            "velikonoce", "easter",
+            "kraslice", "easter egg",
+            "pomlazka", "egg hunt",
+            "malovani vajicek", "easter bunny",
+            "easter basket", "easter decoration",
+
+            # ===== HALLOWEEN =====
+            "halloween",
+            "pumpkin carving",
+            "trick or treat",
+
+            # ===== OSTATNÍ SVÁTKY =====
+            "silvestr", "new year's eve", "novy rok",
+            "mikulas", "cert", "andel",
+            "mother's day", "svatek matek",
+            "father's day", "svatek otcu",
+            "valentine's day", "valentyn"
+        ],
+        "kombinacni": [
+            "advent", "adventni",
+            "wrapping", "gift wrap", "baleni darku",
+            "holiday decor", "holiday decoration",
+            "fireworks", "ohnostroj",
+            "new year party",
+            "valentine card",
+            "pumpkin", "dyne",
+            "kostym", "mask"
+        ],
+        "kontextove": [
+            "holiday", "holidays", "svatek",
+            "celebration", "oslava",
+            "tradition", "tradice"
+        ],
+    },
+]
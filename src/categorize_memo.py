@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Memo výsledků kategorizace podle otisku normalizovaného textu.
+
+Stejný příspěvek bývá vyscreenshotovaný víckrát a kopie se liší jen UI prvky,
+které filtr stejně odstraní. Klíčem je proto hash už vyčištěného textu
+(norm_text z clean_text), ne hash souboru.
+
+Memo se ukládá na disk spolu s otiskem sady pravidel - když se pravidla
+změní, uložené výsledky se zahodí.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+
+def text_digest(norm_text):
+    """Krátký otisk normalizovaného textu (klíč do memo)."""
+    return hashlib.blake2b(norm_text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CategorizeMemo:
+    """LRU memo: otisk norm_text → (kategorie, matched_terms)."""
+
+    def __init__(self, fingerprint, path=None, maxsize=200_000):
+        self.fingerprint = fingerprint
+        self.path = path
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.loaded = 0
+
+    def get(self, norm_text):
+        """Vrátí (klíč, výsledek nebo None). Klíč se použije pro put()."""
+        key = (self.generation, text_digest(norm_text))
+        entries = self.entries
+        result = entries.get(key[1])
+        if result is None:
+            self.misses += 1
+            return key, None
+        try:
+            entries.move_to_end(key[1])
+        except KeyError:
+            pass    # souběžný clear()
+        self.hits += 1
+        return key, result
+
+    def key(self, norm_text):
+        """Klíč pro put() bez hledání (výsledek spočítaný mimo get, např. po dávkách)."""
+        return self.generation, text_digest(norm_text)
+
+    def put(self, key, result):
+        generation, digest = key
+        if generation != self.generation:
+            return      # výsledek spočítaný podle pravidel z doby před clear()
+        category, matched_terms = result
+        entries = self.entries
+        entries[digest] = (category, list(matched_terms))
+        entries.move_to_end(digest)
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    def clear(self, fingerprint=None):
+        """
+        Zahodí všechny výsledky (např. po změně pravidel). Nahradí slovník novým,
+        takže souběžné get/put z jiného vlákna nespadnou; put s klíčem z doby
+        před clear() se zahodí.
+        """
+        if fingerprint is not None:
+            self.fingerprint = fingerprint
+        self.generation += 1
+        self.entries = OrderedDict()
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def load(self):
+        """Načte memo z disku, pokud sedí otisk pravidel. Vrací počet načtených položek."""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if data.get("fingerprint") != self.fingerprint:
+            return 0
+        for key, (category, matched_terms) in data.get("entries", {}).items():
+            self.entries[key] = (category, matched_terms)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        self.loaded = len(self.entries)
+        return self.loaded
+
+    def save(self):
+        """Uloží memo na disk (atomicky přes dočasný soubor)."""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "entries": self.entries},
+                      f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def summary(self):
+        total = self.hits + self.misses
+        return (f"💾 Memo kategorizace: {self.hits}/{total} zásahů ({self.hit_rate * 100:.1f} %), "
+                f"načteno z disku: {self.loaded}, uloženo položek: {len(self.entries)}")
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Kompaktní datové struktury pro deduplikaci milionů souborů v jednom běhu.
+
+Slovník hex řetězec → jméno souboru stojí 200+ B na záznam (objekt klíče,
+objekt hodnoty, slot v hash tabulce). Tady:
+- StringTable: jména souborů v jednom bloku bajtů + pole offsetů (~jméno + 8 B),
+  odkazuje se na ně celým číslem,
+- SortedMultiMap: klíče (velikost souboru, binární digest…) v seřazených NumPy
+  polích s hodnotami int32; nové klíče se sbírají v malém bufferu, ten se
+  seřadí jako nový běh a běhy se slévají po dvojnásobcích (searchsorted =
+  O(log n) dotaz v každém z nejvýš log n běhů),
+- DigestColumn: digesty pevné délky podle id záznamu v jednom bytearray
+  (16 B místo hex řetězce ve slovníku),
+- BloomFilter: bitové pole pro rychlé "tenhle klíč tu určitě není" bez
+  dotazu do velké struktury.
+Každá struktura má nbytes, aby šla změřit cena na záznam.
+"""
+
+import hashlib
+import math
+from array import array
+
+import numpy as np
+
+
+class StringTable:
+    """Internované řetězce: id → řetězec, uložené v jednom bytearray."""
+
+    def __init__(self):
+        self._data = bytearray()
+        self._offsets = array("q", [0])
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def add(self, text):
+        self._data += text.encode("utf-8")
+        self._offsets.append(len(self._data))
+        return len(self._offsets) - 2
+
+    def get(self, string_id):
+        return self._data[self._offsets[string_id]:self._offsets[string_id + 1]].decode("utf-8")
+
+    @property
+    def nbytes(self):
+        return len(self._data) + self._offsets.itemsize * len(self._offsets)
+
+
+class SortedMultiMap:
+    """
+    Klíč (NumPy dtype, např. int64 nebo "S16" pro binární digest) → hodnoty int32.
+    Stejný klíč může mít víc hodnot. merge_every - velikost bufferu nových klíčů.
+
+    Plný buffer se seřadí sám (merge_every · log) a přidá jako nejnovější běh;
+    běh, který není menší než předchozí, se do něj vlije (searchsorted + insert,
+    lineárně). Běhy tak mají rostoucí velikosti po dvojnásobcích, každý klíč se
+    přelije nejvýš log n krát a dotaz hledá v nejvýš log n bězích.
+    """
+
+    def __init__(self, dtype, merge_every=4096):
+        self.dtype = np.dtype(dtype)
+        self.merge_every = merge_every
+        self._runs = []                 # [(klíče, hodnoty)] od nejstaršího
+        self._pending = {}              # klíč → array("i") hodnot
+        self._pending_count = 0
+
+    def __len__(self):
+        return sum(len(keys) for keys, _ in self._runs) + self._pending_count
+
+    def add(self, key, value):
+        values = self._pending.get(key)
+        if values is None:
+            values = self._pending[key] = array("i")
+        values.append(value)
+        self._pending_count += 1
+        if self._pending_count >= self.merge_every:
+            self._merge()
+
+    def _merge(self):
+        if not self._pending:
+            return
+        keys = np.array([key for key, values in self._pending.items() for _ in values], dtype=self.dtype)
+        values = np.array([value for values in self._pending.values() for value in values], dtype=np.int32)
+        order = np.argsort(keys, kind="stable")
+        self._runs.append((keys[order], values[order]))
+        self._pending = {}
+        self._pending_count = 0
+        while len(self._runs) > 1 and len(self._runs[-2][0]) <= len(self._runs[-1][0]):
+            newer_keys, newer_values = self._runs.pop()
+            older_keys, older_values = self._runs.pop()
+            # side="right" - u stejného klíče zůstanou starší hodnoty první
+            positions = np.searchsorted(older_keys, newer_keys, side="right")
+            self._runs.append((np.insert(older_keys, positions, newer_keys),
+                               np.insert(older_values, positions, newer_values)))
+
+    def get(self, key):
+        """Všechny hodnoty klíče (v pořadí vložení)."""
+        found = []
+        if self._runs:
+            key_array = np.array(key, dtype=self.dtype)
+            for keys, values in self._runs:
+                start = np.searchsorted(keys, key_array, side="left")
+                end = np.searchsorted(keys, key_array, side="right")
+                found.extend(int(v) for v in values[start:end])
+        found.extend(self._pending.get(key, ()))
+        return found
+
+    @property
+    def nbytes(self):
+        self._merge()
+        return sum(keys.nbytes + values.nbytes for keys, values in self._runs)
+
+
+DIGEST_BYTES = 16
+
+
+def pack_digest(digest, size=DIGEST_BYTES):
+    """Hex digest (i s prefixem algoritmu "blake2b:…") jako size bajtů; delší se zkrátí."""
+    return bytes.fromhex(digest.rpartition(":")[2])[:size].ljust(size, b"\0")
+
+
+class DigestColumn:
+    """
+    Digest každého záznamu (id = pořadí přidání) zabalený do size bajtů
+    v jednom bytearray. Neznámý digest se spočítá až při prvním get().
+    """
+
+    def __init__(self, size=DIGEST_BYTES):
+        self.size = size
+        self._data = bytearray()
+        self._known = bytearray()
+
+    def __len__(self):
+        return len(self._known)
+
+    def append(self, digest=None):
+        """digest - hex řetězec nebo None (spočítá se později)."""
+        self._data += bytes(self.size) if digest is None else pack_digest(digest, self.size)
+        self._known.append(digest is not None)
+
+    def get(self, entry_id, compute):
+        """Zabalený digest záznamu; compute() → hex digest, pokud ještě není znám."""
+        start = entry_id * self.size
+        if not self._known[entry_id]:
+            self._data[start:start + self.size] = pack_digest(compute(), self.size)
+            self._known[entry_id] = 1
+        return bytes(self._data[start:start + self.size])
+
+    @property
+    def nbytes(self):
+        return len(self._data) + len(self._known)
+
+
+class BloomFilter:
+    """Bloomův filtr pro bajtové klíče; false positive ≈ error_rate při capacity prvcích."""
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        """False = klíč tu určitě není; True = asi je."""
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def nbytes(self):
+        return len(self._bits)
+
+
+def _synthetic_names(n):
+    return [f"/Volumes/Backup/Screenshots/2024/Screenshot 2024-{i % 12 + 1:02d}-{i % 28 + 1:02d} "
+            f"at {i % 24:02d}.{i % 60:02d}.{i:07d}.png" for i in range(n)]
+
+
+def benchmark(n=200000, seed=1):
+    """
+    Naměřená paměť (tracemalloc) na záznam pro n syntetických souborů.
+    Vrací [(rozvržení, B na záznam)]:
+    - slovníky hex MD5 → jméno a hex pHash → jméno (původní seen_hashes, seen_p_hashes),
+    - binární digesty v SortedMultiMap + jména v StringTable (+ Bloomův filtr),
+    - NearDuplicateIndex se čtyřmi hashi v array,
+    - struktury, které běh opravdu drží: LibraryCatalog (cesty, velikosti,
+      zabalené digesty, vizuální index) a záznamy indexu souborů.
+    """
+    import tracemalloc
+    from dedup import LibraryCatalog
+    from file_index import FileIdentityIndex
+    from hamming_index import NearDuplicateIndex
+
+    rng = np.random.RandomState(seed)
+    digests = rng.randint(0, 256, size=(n, 16), dtype=np.uint8)
+    image_hashes = rng.randint(0, 2**63, size=(n, 4), dtype=np.int64).astype(np.uint64)
+    names = _synthetic_names(n)
+
+    def measure(build):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        del kept
+        return used / n
+
+    def dicts():
+        seen_hashes, seen_p_hashes = {}, {}
+        for i in range(n):
+            name = names[i].encode("utf-8").decode("utf-8")     # vlastní kopie jména jako v původním běhu
+            seen_hashes[digests[i].tobytes().hex()] = name
+            seen_p_hashes[f"{int(image_hashes[i, 2]):016x}"] = name
+        return seen_hashes, seen_p_hashes
+
+    def packed(bloom):
+        table = StringTable()
+        by_digest = SortedMultiMap("S16")
+        bloom_filter = BloomFilter(n) if bloom else None
+        for i in range(n):
+            key = digests[i].tobytes()
+            by_digest.add(key, table.add(names[i]))
+            if bloom_filter is not None:
+                bloom_filter.add(key)
+        by_digest.nbytes                                           # slije buffer
+        return table, by_digest, bloom_filter
+
+    def visual():
+        index = NearDuplicateIndex()
+        for i in range(n):
+            index.add({name: int(image_hashes[i, j]) for j, name in enumerate(index.names)}, i)
+        return index
+
+    def catalog():
+        library = LibraryCatalog(edge_of=None, hash_of=None, expected=n)
+        for i in range(n):
+            hashes = {name: int(image_hashes[i, j]) for j, name in enumerate(library.visual.names)}
+            library.add(names[i], 100000 + i, hashes, width=1170, height=2532, mtime=i, filed=True,
+                        edge=digests[i].tobytes().hex(), digest=digests[i, ::-1].tobytes().hex())
+        library.nbytes()                                           # slije buffer velikostí
+        return library
+
+    def file_index():
+        index = FileIdentityIndex(None)
+        for i in range(n):
+            index.entries[f"16777220:{1000000 + i}:{100000 + i}:{1700000000000000000 + i}"] = {
+                "hash": digests[i, ::-1].tobytes().hex(), "edge": digests[i].tobytes().hex(),
+                **{name: int(image_hashes[i, j]) for j, name in enumerate(("ahash", "dhash", "phash", "whash"))},
+                "width": 1170, "height": 2532, "name": names[i].rpartition("/")[2]}
+        return index
+
+    return [("dict hex → jméno (MD5 + pHash)", measure(dicts)),
+            ("digesty + tabulka jmen", measure(lambda: packed(False))),
+            ("digesty + tabulka jmen + Bloom", measure(lambda: packed(True))),
+            ("NearDuplicateIndex (4 hashe)", measure(visual)),
+            ("LibraryCatalog (jako v běhu)", measure(catalog)),
+            ("index souborů (záznamy)", measure(file_index))]
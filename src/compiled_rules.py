@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Binární artefakt s předkompilovanými pravidly (výstup compile_rules).
+
+Normalizace a lemmatizace tisíců klíčových slov z CATEGORIES a CONTEXT_RULES
+stojí při každém startu víc než zbytek kategorizace jednoho dokumentu. Artefakt
+uloží hotovou strukturu přes marshal (nejrychlejší loader CPythonu pro tuple,
+dicty, množiny a řetězce) a při startu se jen přečte a načte.
+
+Formát: MAGIC + 40 znaků otisku zdrojů + marshal(compiled).
+Otisk zdrojů počítá organizer (obsah categories_v1.py, CONTEXT_RULES, tabulka
+lemmat, verze formátu, Pythonu a marshal) - když nesedí, artefakt se zahodí a postaví znovu.
+"""
+
+import hashlib
+import marshal
+import os
+
+MAGIC = b"SORULES1"
+_HEADER = len(MAGIC) + 40
+
+
+def source_digest(paths, extra=()):
+    """Otisk zdrojových souborů (obsah, ne mtime) a dalších řetězců."""
+    hasher = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            hasher.update(f.read())
+        hasher.update(b"\0")
+    for item in extra:
+        hasher.update(str(item).encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+def write_artifact(path, digest, compiled):
+    """Uloží předkompilovaná pravidla (atomicky). Vrací velikost souboru v bajtech."""
+    data = MAGIC + digest.encode("ascii") + marshal.dumps(compiled)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def load_artifact(path, digest):
+    """Načte pravidla z artefaktu, pokud existuje a sedí otisk. Jinak None."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if data[:len(MAGIC)] != MAGIC or data[len(MAGIC):_HEADER] != digest.encode("ascii"):
+        return None
+    try:
+        # řez přes memoryview nekopíruje data za hlavičkou znovu
+        return marshal.loads(memoryview(data)[_HEADER:])
+    except (ValueError, EOFError, TypeError):
+        return None
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Volitelný algoritmus hashe obsahu souborů (deduplikace, klíč OCR cache).
+
+Pro deduplikaci není potřeba kryptografická odolnost, jen rychlost a nízká
+pravděpodobnost kolize. MD5 zůstává výchozí kvůli existujícím cache; BLAKE2b
+je v hashlib vždy a bývá rychlejší, xxHash (pip install xxhash) je rychlejší
+o řád, pokud je nainstalovaný.
+
+Id hashe nese název algoritmu ("blake2b:…"), takže cache naplněná jiným
+algoritmem se nikdy nesplete - jen se nenajde. MD5 id zůstávají bez
+prefixu, aby staré cache platily dál.
+"""
+
+import hashlib
+import mmap
+import os
+import threading
+import time
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+DEFAULT_ALGORITHM = "md5"
+DEFAULT_CHUNK_SIZE = 1 << 20        # USB HDD čte nejrychleji po 1-4 MB
+MMAP_THRESHOLD = 64 << 20           # větší soubory se hashují přes mmap
+
+ALGORITHMS = {
+    "md5": hashlib.md5,
+    "sha1": hashlib.sha1,
+    "blake2b": lambda: hashlib.blake2b(digest_size=16),
+}
+if xxhash is not None:
+    ALGORITHMS["xxh64"] = xxhash.xxh64
+    ALGORITHMS["xxh3_128"] = xxhash.xxh3_128
+
+
+def new_hasher(algorithm):
+    """Nový hasher s rozhraním hashlib (update, digest, hexdigest)."""
+    try:
+        return ALGORITHMS[algorithm]()
+    except KeyError:
+        raise ValueError(f"neznámý nebo nenainstalovaný algoritmus: {algorithm} "
+                         f"(dostupné: {', '.join(ALGORITHMS)})") from None
+
+
+_buffers = threading.local()
+
+
+def _buffer(chunk_size):
+    """Znovupoužitelný buffer pro readinto (jeden na vlákno a velikost)."""
+    buf = getattr(_buffers, "buf", None)
+    if buf is None or len(buf) != chunk_size:
+        buf = _buffers.buf = bytearray(chunk_size)
+    return buf
+
+
+def hash_file(path, hasher, chunk_size=DEFAULT_CHUNK_SIZE, mmap_threshold=MMAP_THRESHOLD):
+    """
+    Prožene obsah souboru hasherem bez alokace nového bytes na každý blok:
+    malé soubory readinto do jednoho bufferu, velké přes mmap po blocích.
+    Vrací hasher.
+    """
+    with open(path, "rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if mmap_threshold is not None and size >= max(mmap_threshold, 1):
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, size, chunk_size):
+                        hasher.update(view[offset:offset + chunk_size])
+                finally:
+                    view.release()
+            return hasher
+        view = memoryview(_buffer(chunk_size))
+        while True:
+            n = f.readinto(view)
+            if not n:
+                break
+            hasher.update(view[:n])
+    return hasher
+
+
+def hash_file_simple(path, hasher, chunk_size=65536):
+    """Původní způsob (f.read po blocích, nový bytes pro každý) - jen pro srovnání v benchmarku."""
+    with open(path, "rb") as f:
+        buf = f.read(chunk_size)
+        while buf:
+            hasher.update(buf)
+            buf = f.read(chunk_size)
+    return hasher
+
+
+def hash_id(algorithm, hexdigest):
+    """Id hashe pro cache: "algoritmus:hex" (u MD5 jen hex kvůli starým cache)."""
+    return hexdigest if algorithm == "md5" else f"{algorithm}:{hexdigest}"
+
+
+def benchmark(size=64 * 2**20, algorithms=None, repeat=3):
+    """
+    Propustnost algoritmů v MB/s nad bufferem v paměti (čistě CPU, bez disku).
+    Vrací {algoritmus: MB/s} - nejlepší z repeat měření.
+    """
+    data = os.urandom(size)
+    view = memoryview(data)
+    chunk = 1 << 20
+    result = {}
+    for algorithm in algorithms or ALGORITHMS:
+        best = None
+        for _ in range(repeat):
+            hasher = new_hasher(algorithm)
+            start = time.perf_counter()
+            for offset in range(0, size, chunk):
+                hasher.update(view[offset:offset + chunk])
+            hasher.digest()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        result[algorithm] = size / 2**20 / best
+    return result
+
+
+# Linux umí soubor vyhodit z page cache (studené čtení v benchmarku bez sudo/purge)
+CAN_DROP_CACHE = hasattr(os, "posix_fadvise")
+
+
+def drop_page_cache(paths):
+    """Požádá jádro, aby zahodilo soubory z page cache (posix_fadvise DONTNEED). Vrací False, kde to nejde."""
+    if not CAN_DROP_CACHE:
+        return False
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return False
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+
+def benchmark_files(paths, algorithm=DEFAULT_ALGORITHM, chunk_sizes=(64 << 10, 1 << 20, 4 << 20), repeat=2):
+    """
+    Propustnost čtení + hashování souborů v MB/s pro různé způsoby čtení:
+    "read 64 KB" (původní), "readinto <blok>" a "mmap <blok>".
+
+    Každý způsob má studený průchod (soubory přímo z disku) a teplý (nejlepší
+    z repeat průchodů z page cache). Studený čte disk: kde je CAN_DROP_CACHE,
+    soubory se před ním vyhodí z page cache, jinde dostane každý způsob vlastní
+    část souborů, které v tomhle běhu ještě nikdo nečetl. Studený ≈ rychlost
+    disku znamená, že režie Pythonu nebrzdí; teplý ukazuje samotnou režii.
+    Vrací [(způsob, studený MB/s, teplý MB/s)].
+    """
+    methods = [("read 64 KB", lambda path: hash_file_simple(path, new_hasher(algorithm)))]
+    for chunk in chunk_sizes:
+        label = f"{chunk >> 20} MB" if chunk >= 1 << 20 else f"{chunk >> 10} KB"
+        methods.append((f"readinto {label}",
+                        lambda path, chunk=chunk: hash_file(path, new_hasher(algorithm), chunk, None)))
+        methods.append((f"mmap {label}",
+                        lambda path, chunk=chunk: hash_file(path, new_hasher(algorithm), chunk, 0)))
+    if CAN_DROP_CACHE:
+        file_sets = [paths] * len(methods)
+    else:
+        file_sets = [paths[i::len(methods)] for i in range(len(methods))]
+
+    def timed(method, files):
+        start = time.perf_counter()
+        for path in files:
+            method(path)
+        return time.perf_counter() - start
+
+    result = []
+    for (label, method), files in zip(methods, file_sets):
+        total = sum(os.path.getsize(path) for path in files) / 2**20
+        drop_page_cache(files)
+        cold = timed(method, files)
+        warm = min(timed(method, files) for _ in range(repeat))
+        result.append((label, total / cold if cold else 0.0, total / warm if warm else 0.0))
+    return result
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Strukturované záznamy rozhodnutí kategorizace (místo debug printů).
+
+Každý dokument dostane jeden DecisionTrace: kdo rozhodl (pravidlo / váhy /
+fuzzy / klasifikátor / memo), druh shody pravidla, matched terms, skóre
+kategorií a penalizace z NEGATIVE_HINTS. Záznamy se drží v bufferu a do JSONL
+souboru se zapisují po dávkách; když tracing vypnutý, organizer trace vůbec
+nevytváří.
+
+Soubor jde později prohledat (query_traces / --query_traces), např.
+"všechny dokumenty, kde NEGATIVE_HINTS změnily výsledek": hint_changed=true.
+"""
+
+import json
+import os
+
+
+class DecisionTrace:
+    """Jedno rozhodnutí categorize_text."""
+
+    __slots__ = ("doc", "text", "category", "matched", "stage", "decider", "rule", "tier",
+                 "scores", "penalties", "top", "second", "hint_changed", "fuzzy")
+
+    def __init__(self, doc=None, text=None):
+        self.doc = doc              # jméno souboru / id dokumentu
+        self.text = text            # normalizovaný text (zkrácený)
+        self.category = None
+        self.matched = []
+        self.stage = None           # "pravidla", "vahy", "fuzzy", "klasifikator", "memo"
+        self.decider = None         # "PRAVIDLO 3", "VAHY: Finance", "NEPRIRAZENO: remiza"…
+        self.rule = None            # název pravidla, které zabralo
+        self.tier = None            # "velmi specifické" / "kombinace"
+        self.scores = {}            # nenulová skóre váhového systému (po penalizaci)
+        self.penalties = {}         # kategorie → odečtené body z NEGATIVE_HINTS
+        self.top = None             # (kategorie, skóre) nejlepší ve váhovém systému
+        self.second = None          # skóre druhé kategorie
+        self.hint_changed = False   # bez NEGATIVE_HINTS by váhový systém rozhodl jinak
+        self.fuzzy = []             # tokeny/n-gramy z opravy OCR překlepů
+
+    def to_dict(self):
+        data = {"doc": self.doc, "category": self.category, "matched": list(self.matched),
+                "stage": self.stage, "decider": self.decider}
+        for key in ("rule", "tier", "top", "second", "text"):
+            value = getattr(self, key)
+            if value is not None:
+                data[key] = value
+        if self.scores:
+            data["scores"] = self.scores
+        if self.penalties:
+            data["penalties"] = self.penalties
+        if self.hint_changed:
+            data["hint_changed"] = True
+        if self.fuzzy:
+            data["fuzzy"] = self.fuzzy
+        return data
+
+    def format(self):
+        """Čitelný výpis pro --debug."""
+        return format_trace(self.to_dict())
+
+
+def format_trace(data):
+    """Víceřádkový výpis jednoho záznamu (dict z to_dict / ze souboru)."""
+    lines = [f"🧾 {data.get('doc') or '-'} → {data['category']}  [{data.get('decider')}]"]
+    if data.get("text"):
+        lines.append(f"   text: {data['text'][:120]}")
+    if data.get("rule"):
+        lines.append(f"   pravidlo: {data['rule']} ({data.get('tier')})")
+    if data.get("matched"):
+        lines.append(f"   matched: {', '.join(data['matched'][:8])}")
+    if data.get("fuzzy"):
+        lines.append(f"   fuzzy: {', '.join(data['fuzzy'][:8])}")
+    scores = data.get("scores")
+    if scores:
+        ordered = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:5]
+        lines.append("   skóre: " + ", ".join(f"{cat}={score:g}" for cat, score in ordered))
+    if data.get("top") and data.get("stage") != "pravidla":
+        lines.append(f"   nejlepší: {data['top'][0]}={data['top'][1]:g}, druhé: {data.get('second', 0):g}")
+    if data.get("penalties"):
+        lines.append("   NEGATIVE_HINTS: " + ", ".join(f"{cat} -{p}" for cat, p in data["penalties"].items())
+                     + ("  (změnilo výsledek)" if data.get("hint_changed") else ""))
+    return "\n".join(lines)
+
+
+class TraceWriter:
+    """Buffer záznamů, zapisovaný do JSONL po dávkách batch_size."""
+
+    def __init__(self, path, batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self.buffer = []
+        self.written = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # nový běh = nový soubor
+        open(path, "w", encoding="utf-8").close()
+
+    def record(self, trace):
+        self.buffer.append(trace.to_dict())
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(item, ensure_ascii=False, separators=(",", ":")) + "\n"
+                            for item in self.buffer))
+        self.written += len(self.buffer)
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+
+
+def iter_traces(path):
+    """Záznamy ze souboru jako dicty."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def parse_filters(expressions):
+    """["category=Recepty", "hint_changed=true"] → [(klíč, hodnota)]."""
+    filters = []
+    for expression in expressions or ():
+        key, sep, value = expression.partition("=")
+        if not sep:
+            raise ValueError(f"filtr musí mít tvar klíč=hodnota: {expression}")
+        filters.append((key.strip(), value.strip()))
+    return filters
+
+
+def match_trace(data, filters):
+    """
+    Splňuje záznam všechny filtry? Seznamy (matched, fuzzy) a dicty (scores,
+    penalties) se testují na obsah, "decider" na prefix, true/false na bool.
+    """
+    for key, value in filters:
+        field = data.get(key)
+        if isinstance(field, (list, dict)):
+            if value not in field:
+                return False
+        elif isinstance(field, bool) or value in ("true", "false"):
+            if bool(field) != (value == "true"):
+                return False
+        elif key == "decider":
+            if not str(field or "").startswith(value):
+                return False
+        elif str(field) != value:
+            return False
+    return True
+
+
+def query_traces(path, filters):
+    """Záznamy ze souboru, které splňují filtry (viz match_trace)."""
+    return [data for data in iter_traces(path) if match_trace(data, filters)]
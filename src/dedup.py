@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+Hledání identických souborů bez čtení celé knihovny.
+
+Soubor s velikostí, kterou nemá žádný jiný soubor, nemůže mít duplikát -
+velikost je zadarmo ze skenu složky. Uvnitř skupin se stejnou velikostí se
+nejdřív porovná hash prvních a posledních EDGE_BYTES (screenshoty se stejnou
+velikostí se skoro vždy liší už v hlavičce nebo na konci). Celý obsah se
+hashuje jen u souborů, kterým sedí i okraje.
+"""
+
+import hashlib
+import os
+from array import array
+
+import numpy as np
+
+from compact_state import BloomFilter, DigestColumn, SortedMultiMap, StringTable, pack_digest
+from hamming_index import NearDuplicateIndex
+
+EDGE_BYTES = 64 * 1024
+
+
+def scan_files(root, accept):
+    """[(cesta, velikost)] souborů ve složce root, pro jejichž jméno accept(jméno) platí."""
+    files = []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_file() and accept(entry.name):
+                files.append((entry.path, entry.stat().st_size))
+    return files
+
+
+def scan_tree(root, accept):
+    """Jako scan_files, ale včetně podsložek (cílová složka s kategoriemi)."""
+    files = []
+    for folder, _, names in os.walk(root):
+        for name in names:
+            if accept(name):
+                path = os.path.join(folder, name)
+                try:
+                    files.append((path, os.path.getsize(path)))
+                except OSError:
+                    continue
+    return files
+
+
+def edge_hash(path, size, edge_bytes=EDGE_BYTES, new_hash=hashlib.md5):
+    """Hash (hex) prvních a posledních edge_bytes souboru (u malého souboru celý obsah)."""
+    hasher = new_hash()
+    with open(path, "rb") as f:
+        if size <= 2 * edge_bytes:
+            hasher.update(f.read())
+        else:
+            hasher.update(f.read(edge_bytes))
+            f.seek(size - edge_bytes)
+            hasher.update(f.read(edge_bytes))
+    return hasher.hexdigest()
+
+
+def _group(items, key):
+    groups = {}
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def find_exact_duplicates(files, full_hash, edge_bytes=EDGE_BYTES, new_hash=hashlib.md5, known=None):
+    """
+    Skupiny identických souborů.
+
+    files     - [(cesta, velikost)] v pořadí, v jakém se mají brát "originály"
+    full_hash - funkce cesta → hash celého obsahu (calculate_file_hash)
+    new_hash  - hasher pro okraje souborů
+    known     - {cesta: {"edge": …, "hash": …}} už známé hodnoty (index souborů),
+                ty se znovu nepočítají
+
+    Vrací (skupiny [[cesta, ...]] - první je originál, {cesta: {"edge"/"hash": …}}
+    nově spočítané hodnoty, statistiky čtení).
+    """
+    known = known or {}
+    stats = {"files": len(files), "size_groups": 0, "edge_reads": 0, "full_reads": 0,
+             "bytes_read": 0, "bytes_total": sum(size for _, size in files)}
+    order = {path: i for i, (path, _) in enumerate(files)}
+    computed = {}
+    duplicates = []
+    for same_size in _group(files, key=lambda item: item[1]):
+        stats["size_groups"] += 1
+        edges = {}
+        for path, size in same_size:
+            edge = known.get(path, {}).get("edge")
+            if edge is None:
+                try:
+                    edge = edge_hash(path, size, edge_bytes, new_hash)
+                except OSError:
+                    continue
+                stats["edge_reads"] += 1
+                stats["bytes_read"] += min(size, 2 * edge_bytes)
+                computed.setdefault(path, {})["edge"] = edge
+            edges[path] = edge
+        for same_edges in _group([item for item in same_size if item[0] in edges],
+                                 key=lambda item: edges[item[0]]):
+            content = {}
+            for path, size in same_edges:
+                if size <= 2 * edge_bytes:
+                    # okraje pokryly celý soubor - shoda okrajů = shoda obsahu
+                    content[path] = edges[path]
+                    continue
+                digest = known.get(path, {}).get("hash")
+                if digest is None:
+                    try:
+                        digest = full_hash(path)
+                    except OSError:
+                        continue
+                    stats["full_reads"] += 1
+                    stats["bytes_read"] += size
+                    computed.setdefault(path, {})["hash"] = digest
+                content[path] = digest
+            duplicates.extend(_group([item for item in same_edges if item[0] in content],
+                                     key=lambda item: content[item[0]]))
+    groups = [sorted((path for path, _ in group), key=order.get) for group in duplicates]
+    groups.sort(key=lambda group: order[group[0]])
+    return groups, computed, stats
+
+
+class UnionFind:
+    """Disjunktní množiny nad libovolnými klíči (komprese cesty půlením, spojování podle velikosti)."""
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def find(self, item):
+        parent = self.parent
+        if item not in parent:
+            parent[item] = item
+            self.size[item] = 1
+            return item
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+    def groups(self):
+        """Množiny s víc než jedním prvkem jako seznamy."""
+        members = {}
+        for item in self.parent:
+            members.setdefault(self.find(item), []).append(item)
+        return [group for group in members.values() if len(group) > 1]
+
+
+def keep_best_key(meta):
+    """
+    Řazení kopií: už zařazená v cílové složce ("filed"), pak nejvyšší rozlišení,
+    pak největší soubor, pak nejstarší mtime.
+    """
+    width, height = meta.get("width") or 0, meta.get("height") or 0
+    return not meta.get("filed"), -(width * height), -meta.get("size", 0), meta.get("mtime", 0)
+
+
+def duplicate_plan(edges, meta):
+    """
+    Skupiny duplicit z hran a volba kopie, která zůstane.
+
+    edges - [(a, b, druh)] druh = "identické" / "vizuální" / …; řetězce A≈B≈C
+            skončí v jedné skupině
+    meta  - {položka: {"width", "height", "size", "mtime"}}
+    Vrací [{"keep": položka, "remove": [...], "kinds": {druh: počet hran},
+    "reclaim": bajtů}] od největší skupiny.
+    """
+    sets = UnionFind()
+    for a, b, _ in edges:
+        sets.union(a, b)
+    kinds = {}
+    for a, _, kind in edges:
+        counts = kinds.setdefault(sets.find(a), {})
+        counts[kind] = counts.get(kind, 0) + 1
+    plan = []
+    for group in sets.groups():
+        ordered = sorted(group, key=lambda item: (keep_best_key(meta.get(item, {})), str(item)))
+        plan.append({"keep": ordered[0], "remove": ordered[1:], "kinds": kinds[sets.find(ordered[0])],
+                     "reclaim": sum(meta.get(item, {}).get("size", 0) for item in ordered[1:])})
+    plan.sort(key=lambda entry: (-len(entry["remove"]), str(entry["keep"])))
+    return plan
+
+
+class LibraryCatalog:
+    """
+    Soubory, které už máme (další zdroje, cílová složka), pro kontrolu nových
+    souborů bez procházení celé knihovny.
+
+    Identické: seřazené pole velikostí (před ním Bloomův filtr, takže nová
+    velikost se odmítne bez hledání), při shodě velikosti porovná okraje
+    a případně celý obsah. Digesty okrajů a obsahu jsou zabalené po 16 B
+    v DigestColumn podle id souboru - známé se předají do add() (z indexu
+    souborů), chybějící dodají edge_of/hash_of při první shodě velikosti
+    a katalog si je zapamatuje. Vizuální: NearDuplicateIndex.
+
+    Kvůli milionovým knihovnám drží katalog cesty v StringTable a metadata
+    v polích (id souboru = index); do slovníku meta se dostanou jen soubory,
+    které se našly jako duplikát (pro duplicate_plan).
+
+    expected - očekávaný počet souborů pro velikost Bloomova filtru (0 = bez filtru)
+    """
+
+    def __init__(self, edge_of, hash_of, phash_distance=6, edge_bytes=EDGE_BYTES, expected=0):
+        self.edge_of = edge_of
+        self.hash_of = hash_of
+        self.edge_bytes = edge_bytes
+        self.paths = StringTable()
+        self.by_size = SortedMultiMap(np.int64)
+        self.size_filter = BloomFilter(expected) if expected else None
+        self._sizes = array("q")
+        self._mtimes = array("q")
+        self._widths = array("i")
+        self._heights = array("i")
+        self._filed = bytearray()
+        self._edges = DigestColumn()
+        self._digests = DigestColumn()
+        self.meta = {}
+        self.visual = NearDuplicateIndex(max_distance=phash_distance)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def add(self, path, size, hashes=None, width=None, height=None, mtime=0, filed=False, edge=None, digest=None):
+        """
+        hashes - {"ahash", "dhash", "phash", "whash"} nebo None
+        edge, digest - už známý hash okrajů a obsahu (hex) nebo None
+        zbytek pro keep_best_key
+        """
+        entry_id = self.paths.add(path)
+        self.by_size.add(size, entry_id)
+        if self.size_filter is not None:
+            self.size_filter.add(size.to_bytes(8, "little"))
+        self._sizes.append(size)
+        self._mtimes.append(mtime)
+        self._widths.append(-1 if width is None else width)
+        self._heights.append(-1 if height is None else height)
+        self._filed.append(bool(filed))
+        self._edges.append(edge)
+        self._digests.append(digest)
+        if hashes is not None:
+            self.visual.add(hashes, entry_id)
+        return entry_id
+
+    def _found(self, entry_id):
+        """Cesta souboru; jeho metadata si zapamatuje pro duplicate_plan."""
+        path = self.paths.get(entry_id)
+        if path not in self.meta:
+            width, height = self._widths[entry_id], self._heights[entry_id]
+            self.meta[path] = {"width": None if width < 0 else width, "height": None if height < 0 else height,
+                               "size": self._sizes[entry_id], "mtime": self._mtimes[entry_id],
+                               "filed": bool(self._filed[entry_id])}
+        return path
+
+    def find_exact(self, path, size):
+        """Identický soubor z katalogu, jinak None."""
+        if self.size_filter is not None and size.to_bytes(8, "little") not in self.size_filter:
+            return None
+        candidates = [(entry_id, other) for entry_id in self.by_size.get(size)
+                      for other in [self.paths.get(entry_id)] if other != path]
+        if not candidates:
+            return None
+        edge = pack_digest(self.edge_of(path))
+        digest = None
+        for entry_id, other in candidates:
+            if self._edges.get(entry_id, lambda: self.edge_of(other)) != edge:
+                continue
+            if size <= 2 * self.edge_bytes:
+                return self._found(entry_id)
+            if digest is None:
+                digest = pack_digest(self.hash_of(path))
+            if self._digests.get(entry_id, lambda: self.hash_of(other)) == digest:
+                return self._found(entry_id)
+        return None
+
+    def find_visual(self, hashes):
+        """[(cesta, počet shodných hashů, součet vzdáleností)] z katalogu."""
+        return [(self._found(entry_id), votes, total) for entry_id, votes, total in self.visual.matches(hashes)]
+
+    def nbytes(self):
+        """Přibližná paměť katalogu v bajtech včetně vizuálního indexu (bez slovníku meta)."""
+        arrays = (self._sizes, self._mtimes, self._widths, self._heights)
+        total = self.paths.nbytes + self.by_size.nbytes + len(self._filed)
+        total += self._edges.nbytes + self._digests.nbytes + self.visual.nbytes()
+        total += sum(a.itemsize * len(a) for a in arrays)
+        if self.size_filter is not None:
+            total += self.size_filter.nbytes
+        return total
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Trvalý index identity souborů: (zařízení, inode, velikost, mtime_ns) → hash
+obsahu, perceptual hash a rozměry obrázku.
+
+Soubor, jehož stat sedí se záznamem, se vůbec nečte. Klíč nezávisí na cestě,
+takže přejmenování nebo přesun v rámci stejného disku (stejný inode, mtime
+se nemění) záznam zachová; změna obsahu mění mtime, starý záznam se nenajde.
+
+Nové záznamy se drží v bufferu a po dávkách (batch_size) se připisují do
+deníku vedle snapshotu (JSONL), takže pád dlouhého běhu přijde nejvýš o jednu
+dávku a průběžný zápis nepřepisuje celý index. save() deník sloučí do snapshotu.
+"""
+
+import json
+import os
+import sys
+
+
+def identity_key(st):
+    """Klíč záznamu z os.stat_result."""
+    return f"{st.st_dev}:{st.st_ino}:{st.st_size}:{st.st_mtime_ns}"
+
+
+class FileIdentityIndex:
+    """
+    version    - algoritmus hashe obsahu + verze perceptual hashe; index s jinou
+                 verzí se při load() zahodí
+    batch_size - po kolika nových záznamech se připisuje do deníku
+    Záznam je dict {"hash", "phash", "width", "height", "name"}.
+    """
+
+    def __init__(self, version, path=None, batch_size=1000):
+        self.version = version
+        self.path = path
+        self.batch_size = batch_size
+        self.entries = {}
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.loaded = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, path, st=None):
+        """Záznam pro soubor, pokud se od posledního běhu nezměnil (jinak None)."""
+        if st is None:
+            st = os.stat(path)
+        entry = self.entries.get(identity_key(st))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry["name"] = os.path.basename(path)      # přejmenování/přesun - stejný inode
+        return entry
+
+    def record(self, path, st=None, **info):
+        """Uloží (nebo doplní) záznam souboru; hodnoty None se nepřepisují."""
+        if st is None:
+            st = os.stat(path)
+        key = identity_key(st)
+        entry = self.entries.setdefault(key, {})
+        entry.update((k, v) for k, v in info.items() if v is not None)
+        entry["name"] = os.path.basename(path)
+        self.pending[key] = entry
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        return entry
+
+    @property
+    def _journal_path(self):
+        return self.path + ".log"
+
+    def flush(self):
+        """Připíše dávku nových záznamů do deníku."""
+        if not self.pending or not self.path:
+            self.pending = {}
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if not os.path.exists(self._journal_path):
+            with open(self._journal_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"version": self.version}) + "\n")
+        with open(self._journal_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps([key, entry], ensure_ascii=False, separators=(",", ":")) + "\n"
+                            for key, entry in self.pending.items()))
+        self.pending = {}
+
+    def load(self):
+        """Načte snapshot a deník, pokud sedí verze. Vrací počet záznamů."""
+        if not self.path:
+            return 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == self.version:
+                self.entries.update(data.get("entries", {}))
+        except (OSError, ValueError):
+            pass
+        try:
+            with open(self._journal_path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline() or "{}")
+                stale = header.get("version") != self.version
+                if not stale:
+                    for line in f:
+                        try:
+                            key, entry = json.loads(line)
+                        except ValueError:
+                            break       # useknutý poslední řádek po pádu
+                        self.entries[key] = entry
+            if stale:
+                os.remove(self._journal_path)
+        except (OSError, ValueError):
+            pass
+        self.loaded = len(self.entries)
+        return self.loaded
+
+    def save(self):
+        """Sloučí všechno do snapshotu (atomicky) a smaže deník."""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "entries": self.entries},
+                      f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self.pending = {}
+        try:
+            os.remove(self._journal_path)
+        except OSError:
+            pass
+
+    def nbytes(self):
+        """Přibližná paměť záznamů v bajtech (slovník, klíče, záznamy a jejich hodnoty)."""
+        total = sys.getsizeof(self.entries)
+        for key, entry in self.entries.items():
+            total += sys.getsizeof(key) + sys.getsizeof(entry) + sum(sys.getsizeof(v) for v in entry.values())
+        return total
+
+    def summary(self):
+        total = self.hits + self.misses
+        return (f"🗂️  Index souborů: {self.hits}/{total} souborů beze čtení, "
+                f"načteno z disku: {self.loaded}, uloženo: {len(self.entries)}")
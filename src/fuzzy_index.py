@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Tolerance překlepů z OCR ("rec1pe", "montesori") pomocí deletion indexu (SymSpell).
+
+Index se postaví jednou nad slovy z klíčových slov: pro každé slovo uložíme
+všechny varianty vzniklé smazáním až max_distance znaků. Dotaz na token pak
+vygeneruje jen své vlastní delece a podívá se do slovníku - žádné porovnávání
+s každým klíčovým slovem zvlášť.
+"""
+
+
+def _deletes(word, max_distance):
+    """Všechny varianty slova s až max_distance smazanými znaky (včetně slova samotného)."""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for w in frontier:
+            if len(w) <= 1:
+                continue
+            for i in range(len(w)):
+                next_frontier.add(w[:i] + w[i + 1:])
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+def edit_distance(a, b, max_distance):
+    """
+    Damerau-Levenshtein (optimal string alignment) s předčasným ukončením.
+    Vrací vzdálenost, nebo max_distance + 1 pokud je větší.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    prev_prev = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if (prev_prev is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, prev_prev[j - 2] + 1)
+            cur[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return max_distance + 1
+        prev_prev, prev = prev, cur
+    return prev[-1] if prev[-1] <= max_distance else max_distance + 1
+
+
+class DeletionIndex:
+    """
+    Deletion index nad slovníkem normalizovaných slov.
+
+    max_distance - maximální editační vzdálenost (1 stačí na většinu OCR chyb)
+    min_length   - kratší tokeny se neopravují (u "hra" by se našlo moc falešných shod)
+    """
+
+    def __init__(self, words, max_distance=1, min_length=5):
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self.vocabulary = frozenset(words)
+        self.index = {}
+        for word in self.vocabulary:
+            if len(word) < min_length:
+                continue
+            for variant in _deletes(word, max_distance):
+                self.index.setdefault(variant, []).append(word)
+        self._cache = {}
+
+    def lookup(self, token):
+        """
+        Vrátí (slovo ze slovníku, vzdálenost) pro nejbližší slovo, nebo None.
+        Přesná shoda má vzdálenost 0; při remíze více slov vrací None (nejednoznačné).
+        """
+        if token in self.vocabulary:
+            return token, 0
+        if len(token) < self.min_length or token.isdigit():
+            return None
+        cached = self._cache.get(token, False)
+        if cached is not False:
+            return cached
+
+        best = None
+        best_distance = self.max_distance + 1
+        ambiguous = False
+        seen = set()
+        for variant in _deletes(token, self.max_distance):
+            for word in self.index.get(variant, ()):
+                if word in seen:
+                    continue
+                seen.add(word)
+                distance = edit_distance(token, word, self.max_distance)
+                if distance < best_distance:
+                    best, best_distance, ambiguous = word, distance, False
+                elif distance == best_distance and word != best:
+                    ambiguous = True
+
+        result = None if best is None or ambiguous else (best, best_distance)
+        if len(self._cache) > 100_000:
+            self._cache.clear()
+        self._cache[token] = result
+        return result
+
+    def correct_tokens(self, words):
+        """
+        Opraví posloupnost slov textu. Vrací (opravená_slova, opravy) kde opravy
+        je dict {původní token: slovo ze slovníku} jen pro skutečně změněné tokeny.
+        """
+        corrected = []
+        corrections = {}
+        for word in words:
+            hit = self.lookup(word)
+            if hit and hit[1] > 0:
+                corrections[word] = hit[0]
+                corrected.append(hit[0])
+            else:
+                corrected.append(word)
+        return corrected, corrections
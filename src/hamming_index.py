@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Hledání blízkých perceptuálních hashů (Hammingova vzdálenost ≤ k) pomocí
+multi-index hashingu.
+
+64bitový hash se rozdělí na m úseků a každý úsek má vlastní slovník
+hodnota úseku → id hashů. Dva hashy ve vzdálenosti ≤ k se podle Dirichletova
+principu musí v některém úseku lišit nejvýš o ⌊k/m⌋ bitů, takže stačí
+v každém úseku projít sousední hodnoty do této vzdálenosti a kandidáty
+ověřit plnou vzdáleností.
+
+Úseky se volají podle velikosti indexu: šířka ≈ log2(n) bitů, aby na jednu
+hodnotu úseku připadalo jen pár hashů (úzké úseky, např. k + 1 po 9 bitech,
+by dávaly n/512 kandidátů na úsek - lineárně s knihovnou). Když index
+dvojnásobně naroste, úseky se přepočítají. Pro rovnoměrné hashe je
+kandidátů ≈ počet sond · n / 2^šířka; u hodně podobných hashů (skoro bílé
+screenshoty) jsou kandidáti hlavně skuteční blízcí sousedé. Počet
+prověřených kandidátů je v `examined`.
+
+Hashe a seznamy id jsou v array (8 B na hash, 4 B na id v úseku) místo
+seznamů Python intů, aby index pro miliony obrázků nezabral gigabajty.
+"""
+
+import sys
+from array import array
+from itertools import combinations
+from math import comb
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+def _flip_masks(width, radius):
+    """XOR masky všech hodnot úseku šířky width ve vzdálenosti ≤ radius."""
+    masks = []
+    for flips in range(radius + 1):
+        for positions in combinations(range(width), flips):
+            mask = 0
+            for position in positions:
+                mask |= 1 << position
+            masks.append(mask)
+    return masks
+
+
+def plan_chunks(n, max_distance, bits=64):
+    """
+    Počet úseků m (1 … max_distance + 1) s nejnižší odhadovanou cenou dotazu
+    pro n hashů: sondy m · Σ C(šířka, j ≤ ⌊k/m⌋) + kandidáti sondy · n / 2^šířka.
+    """
+    best = None
+    for chunks in range(1, min(max_distance + 1, bits) + 1):
+        width = bits // chunks
+        radius = max_distance // chunks
+        probes = chunks * sum(comb(width, j) for j in range(radius + 1))
+        cost = probes * (1 + n / 2 ** width)
+        if best is None or cost < best[0]:
+            best = (cost, chunks)
+    return best[1]
+
+
+class HammingIndex:
+    """
+    Index celočíselných hashů s dotazem "všechny hashe ve vzdálenosti ≤ max_distance".
+
+    max_distance - největší k, na které se dá ptát
+    bits         - délka hashe v bitech
+    """
+
+    def __init__(self, max_distance=6, bits=64):
+        if not 0 <= max_distance < bits:
+            raise ValueError(f"max_distance musí být mezi 0 a {bits - 1}")
+        self.max_distance = max_distance
+        self.bits = bits
+        self.values = array("Q")
+        self.items = []
+        self.examined = 0           # prověření kandidáti ve všech dotazech
+        self._planned_for = 0
+        self._build(1)
+
+    def __len__(self):
+        return len(self.values)
+
+    def _build(self, n):
+        """Rozdělí hash na úseky podle plan_chunks(n) a znovu naplní slovníky úseků."""
+        chunks = plan_chunks(n, self.max_distance, self.bits)
+        self._chunks = []           # (posun, maska) každého úseku
+        shift = 0
+        for i in range(chunks):
+            width = self.bits // chunks + (1 if i < self.bits % chunks else 0)
+            self._chunks.append((shift, (1 << width) - 1))
+            shift += width
+        self._chunk_count = chunks
+        self._masks = {}            # (šířka, poloměr) → XOR masky sousedů
+        self._tables = [{} for _ in range(chunks)]
+        self._planned_for = n
+        for hash_id, value in enumerate(self.values):
+            self._insert(hash_id, value)
+
+    def _insert(self, hash_id, value):
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            key = (value >> shift) & mask
+            ids = table.get(key)
+            if ids is None:
+                ids = table[key] = array("i")
+            ids.append(hash_id)
+
+    def add(self, value, item):
+        """Přidá hash (int) s připojenou položkou (např. jménem souboru). Vrací id."""
+        hash_id = len(self.values)
+        self.values.append(value)
+        self.items.append(item)
+        if len(self.values) >= 2 * self._planned_for:
+            chunks = plan_chunks(len(self.values), self.max_distance, self.bits)
+            if chunks != self._chunk_count:
+                self._build(len(self.values))
+                return hash_id
+            self._planned_for = len(self.values)
+        self._insert(hash_id, value)
+        return hash_id
+
+    def _neighbor_masks(self, mask, radius):
+        width = mask.bit_length()
+        masks = self._masks.get((width, radius))
+        if masks is None:
+            masks = self._masks[(width, radius)] = _flip_masks(width, radius)
+        return masks
+
+    def query(self, value, max_distance=None):
+        """Všechny uložené hashe ve vzdálenosti ≤ max_distance: [(položka, vzdálenost)] vzestupně."""
+        if max_distance is None:
+            max_distance = self.max_distance
+        elif max_distance > self.max_distance:
+            raise ValueError(f"index je postavený pro vzdálenost nejvýš {self.max_distance}")
+        radius = max_distance // self._chunk_count
+        seen = set()
+        found = []
+        values = self.values
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            key = (value >> shift) & mask
+            for flip in self._neighbor_masks(mask, radius):
+                for hash_id in table.get(key ^ flip, ()):
+                    if hash_id in seen:
+                        continue
+                    seen.add(hash_id)
+                    distance = hamming_distance(value, values[hash_id])
+                    if distance <= max_distance:
+                        found.append((distance, hash_id))
+        self.examined += len(seen)
+        found.sort()
+        return [(self.items[hash_id], distance) for distance, hash_id in found]
+
+    def nbytes(self):
+        """Přibližná paměť v bajtech: pole hashů, slovníky úseků s klíči a poli id, seznam položek (bez nich)."""
+        total = self.values.itemsize * len(self.values) + sys.getsizeof(self.items)
+        for table in self._tables:
+            total += sys.getsizeof(table)
+            total += sum(sys.getsizeof(key) + sys.getsizeof(ids) for key, ids in table.items())
+        return total
+
+    def nearest(self, value, max_distance=None):
+        """Nejbližší uložený hash ve vzdálenosti ≤ max_distance jako (položka, vzdálenost), jinak None."""
+        found = self.query(value, max_distance)
+        return found[0] if found else None
+
+
+class NearDuplicateIndex:
+    """
+    Blízké obrázky podle několika perceptuálních hashů najednou.
+
+    Kandidáti se hledají v HammingIndexech hashů `indexed`; kandidát je
+    duplikát, pokud aspoň min_votes hashů z `names` je ve vzdálenosti
+    ≤ max_distance. Jeden hash sám často selže (pHash u skoro bílých
+    screenshotů změní i hodiny ve status baru), shoda dvou je spolehlivá.
+
+    Aby se žádný duplikát neztratil, musí být indexováno aspoň
+    len(names) - min_votes + 1 hashů: mimo index pak zbude nejvýš
+    min_votes - 1 hashů, takže aspoň jeden ze shodných je v indexu.
+    Výchozí indexed je právě tolik prvních hashů z names (pro 4 hashe
+    a 2 hlasy tři indexy - i dvojice shodná jen v aHash a wHash).
+    """
+
+    def __init__(self, max_distance=6, names=("ahash", "dhash", "phash", "whash"),
+                 indexed=None, min_votes=2):
+        if indexed is None:
+            indexed = names[:len(names) - min_votes + 1]
+        elif len(set(indexed) & set(names)) < len(names) - min_votes + 1:
+            raise ValueError(f"pro {min_votes} hlasy z {len(names)} hashů je potřeba indexovat "
+                             f"aspoň {len(names) - min_votes + 1} z nich")
+        self.max_distance = max_distance
+        self.names = names
+        self.min_votes = min_votes
+        self._indexes = {name: HammingIndex(max_distance) for name in indexed}
+        self._columns = {name: array("Q") for name in names}
+        self.items = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, hashes, item):
+        """hashes - {název: int}; vrací id."""
+        entry_id = len(self.items)
+        for name, column in self._columns.items():
+            column.append(hashes[name])
+        self.items.append(item)
+        for name, index in self._indexes.items():
+            index.add(hashes[name], entry_id)
+        return entry_id
+
+    def matches(self, hashes):
+        """[(položka, počet shodných hashů, součet vzdáleností)] od nejbližší."""
+        candidates = set()
+        for name, index in self._indexes.items():
+            candidates.update(entry_id for entry_id, _ in index.query(hashes[name]))
+        found = []
+        for entry_id in candidates:
+            distances = [hamming_distance(hashes[name], self._columns[name][entry_id]) for name in self.names]
+            votes = sum(1 for d in distances if d <= self.max_distance)
+            if votes >= self.min_votes:
+                found.append((-votes, sum(distances), entry_id))
+        found.sort()
+        return [(self.items[entry_id], -votes, total) for votes, total, entry_id in found]
+
+    def nbytes(self):
+        """Přibližná paměť v bajtech včetně HammingIndexů a samotných položek."""
+        total = sum(column.itemsize * len(column) for column in self._columns.values())
+        total += sys.getsizeof(self.items) + sum(sys.getsizeof(item) for item in self.items)
+        return total + sum(index.nbytes() for index in self._indexes.values())
+
+    def nearest(self, hashes):
+        found = self.matches(hashes)
+        return found[0] if found else None
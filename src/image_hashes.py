@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Dávkové perceptuální hashe (aHash, dHash, pHash, wHash) ve vektorovém NumPy.
+
+Obrázek se dekóduje jen jednou do malé šedé miniatury THUMB_SIZE × THUMB_SIZE;
+všechny čtyři hashe se pak počítají najednou pro celou dávku miniatur
+(pole n × 64 × 64), bez dalšího dekódování a bez smyček přes obrázky.
+Každý hash je 64 bitů zabalených do uint64 (bit 63 = levý horní pixel,
+stejné pořadí jako hex z imagehash).
+
+- aHash: průměry bloků 8×8, práh průměr
+- dHash: 8 × 9 průměrů, bit = jas roste zleva doprava
+- pHash: DCT miniatury 32×32, nejnižších 8×8 frekvencí, práh medián
+- wHash: Haarovo LL pásmo 8×8 po odečtení stejnosměrné složky (jako
+  imagehash.whash), práh medián - odečtení průměru práh nemění, takže jde
+  o průměry bloků proti jejich mediánu
+"""
+
+import numpy as np
+from PIL import Image
+
+THUMB_SIZE = 64
+HASH_NAMES = ("ahash", "dhash", "phash", "whash")
+
+
+def load_thumbnail(path, size=THUMB_SIZE):
+    """(šedá miniatura size × size jako uint8 pole, (šířka, výška) originálu), při chybě None."""
+    try:
+        with Image.open(path) as img:
+            original_size = img.size
+            img.draft("L", (size * 2, size * 2))     # JPEG dekóduje rovnou zmenšený
+            thumb = np.asarray(img.convert("L").resize((size, size), Image.LANCZOS), dtype=np.uint8)
+        return thumb, original_size
+    except Exception:
+        return None
+
+
+def _area_resize(stack, rows, cols):
+    """Zmenšení dávky (n, h, w) na (n, rows, cols) průměrem přes oblasti."""
+    n, h, w = stack.shape
+    row_edges = np.linspace(0, h, rows + 1).astype(np.int64)
+    col_edges = np.linspace(0, w, cols + 1).astype(np.int64)
+    sums = np.add.reduceat(np.add.reduceat(stack, row_edges[:-1], axis=1), col_edges[:-1], axis=2)
+    areas = np.outer(np.diff(row_edges), np.diff(col_edges))
+    return sums / areas
+
+
+def _dct_matrix(size):
+    k = np.arange(size)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * size))
+    matrix[0] *= 1 / np.sqrt(2)
+    return matrix * np.sqrt(2 / size)
+
+
+_DCT32 = _dct_matrix(32)
+
+
+def pack_bits(bits):
+    """(n, 64) bool → (n,) uint64, první bit je nejvyšší."""
+    return np.packbits(bits.reshape(len(bits), 64), axis=1).view(">u8").ravel().astype(np.uint64)
+
+
+def batch_hashes(thumbs):
+    """
+    Hashe pro dávku miniatur (n, THUMB_SIZE, THUMB_SIZE).
+    Vrací {"ahash"|"dhash"|"phash"|"whash": pole (n,) uint64}.
+    """
+    stack = np.asarray(thumbs, dtype=np.float32)
+    if stack.ndim == 2:
+        stack = stack[None]
+    n = len(stack)
+    if not n:
+        return {name: np.zeros(0, dtype=np.uint64) for name in HASH_NAMES}
+
+    blocks = _area_resize(stack, 8, 8).reshape(n, 64)
+    ahash = blocks > blocks.mean(axis=1, keepdims=True)
+    whash = blocks > np.median(blocks, axis=1, keepdims=True)
+
+    wide = _area_resize(stack, 8, 9)
+    dhash = wide[:, :, 1:] > wide[:, :, :-1]
+
+    small = _area_resize(stack, 32, 32)
+    dct = np.einsum("ij,njk,lk->nil", _DCT32, small, _DCT32, optimize=True)
+    low = dct[:, :8, :8].reshape(n, 64)
+    phash = low > np.median(low, axis=1, keepdims=True)
+
+    return {"ahash": pack_bits(ahash), "dhash": pack_bits(dhash),
+            "phash": pack_bits(phash), "whash": pack_bits(whash)}
+
+
+def hash_images(paths, batch_size=256):
+    """
+    Hashe a rozměry obrázků po dávkách miniatur.
+    Vrací {cesta: {"ahash", "dhash", "phash", "whash" (int), "width", "height"}};
+    soubory, které nejdou otevřít, ve výsledku chybí.
+    """
+    result = {}
+    for start in range(0, len(paths), batch_size):
+        loaded = []
+        for path in paths[start:start + batch_size]:
+            thumb = load_thumbnail(path)
+            if thumb is not None:
+                loaded.append((path, thumb[1], thumb[0]))
+        if not loaded:
+            continue
+        hashes = batch_hashes(np.stack([thumb for _, _, thumb in loaded]))
+        for i, (path, (width, height), _) in enumerate(loaded):
+            info = {name: int(hashes[name][i]) for name in HASH_NAMES}
+            info["width"], info["height"] = width, height
+            result[path] = info
+    return result
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Tabulka tvar → lemma pro české klíčové slovo a OCR tokeny.
+
+Tabulka se generuje OFFLINE (organizer --build_lemmas) do binárního souboru
+a za běhu se jen načte do dictu - lemmatizace tokenu je pak jeden lookup.
+
+Zdroj tvarů:
+- vestavěné koncovkové vzory pro slova z pravidel a CATEGORIES
+  (bunda → bundy, bundu, bundou…; muffin → muffiny, muffinu…),
+- volitelně TSV z morfologického slovníku (např. export MorfFlex),
+  řádky "tvar<TAB>lemma"; texty se normalizují stejně jako klíčová slova.
+
+Tvary, které by patřily ke dvěma různým lemmatům, se vynechají. Ohýbají se jen
+česká slova (psaná s diakritikou nebo z CZECH_WORDS) - anglické "healthy" není
+tvar "health". Dvě klíčová slova se sloučí jen tehdy, když patří do stejných
+pravidel a kategorií, jinak by tvar jednoho pravidla ("detsky" z "detsky pokoj")
+začal matchovat trigger jiného ("detska" u oblečení).
+"""
+
+import hashlib
+import os
+import zlib
+
+MAGIC = b"SOLEMMA1"
+
+# Koncovky podle zakončení základního tvaru (vše už bez diakritiky).
+# Krátké a cizí tvary ("cos", "hm") se neohýbají - viz MIN_STEM_WORD.
+# Holý kmen (2. pád množného čísla "bund", "cest") se negeneruje: bez diakritiky
+# koliduje s anglickými slovy z OCR ("link" ≠ linka, "vest" ≠ vesta).
+_ENDINGS = {
+    "a": ("y", "e", "u", "ou", "o", "ach", "am", "ami"),              # bunda, svacina, detska
+    "e": ("i", "emi", "ich", "im", "e"),                             # kolace, zidle
+    "o": ("a", "u", "e", "em", "ech", "um", "y"),                    # mesto, jidlo
+    "y": ("a", "e", "eho", "emu", "em", "ym", "ych", "ymi", "ou", "i"),  # detsky, zdravy
+    "i": ("ho", "mu", "m", "ch", "mi"),                              # vareni, jarni
+}
+_CONSONANT_ENDINGS = ("u", "y", "e", "em", "ech", "um", "ove", "a", "i", "ach", "ami")
+
+MIN_STEM_WORD = 4
+
+# Slova, která vzory vygenerují jako tvar jiného slova, ale mají jiný význam
+# (menu ≠ měna, taška ≠ task, večeře ≠ večer, zdraví ≠ zdravá…) nebo jsou po odstranění
+# diakritiky anglická (mapě → "mape", vaně → "vane", módě → "mode") - nikdy se nepřemapují.
+NEVER_MAP = frozenset({
+    "menu", "parka", "taska", "darku", "date", "vecere", "zdravi", "plane",
+    "banka", "kilo", "rady", "mape", "vane", "mode",
+})
+
+
+# Česká slova z pravidel psaná bez diakritiky (s diakritikou se pozná samo);
+# ostatní slova bez diakritiky se berou jako cizí a neohýbají se.
+CZECH_WORDS = frozenset("""
+    abeceda adaptace afirmace akademie akcie akne aktivita aktivity akustika alergie
+    architekt architektura atrakce audiokniha autismus autobus automatizace autor
+    balkon barvy batoh bavlna belgie bermudy beton biografie bodovky bolest borovice
+    botky boty brokolice broskev broskve buchta bunda bundy bungalov bylinky
+    certifikat cesta cestou cestu cesty chodba chorvatsko chyba cibule cihla citron
+    cuketa cukr cukru dedecek dekorace destinace detektivka dezert dispozice dividenda
+    dluh doklad doktor dokumentace dort dorty dotaz dovednosti dystopie efekt ekzem
+    emoce empatie epizoda esej eseje faktura faktury filozofie filtr fixy fotky
+    fotografie francie fyzioterapie geografie hnojiva hnojivo hodinky holky hortenzie
+    hory hranice hygiena imunita inflace ingredience inspirace inteligence investice
+    jablka jablko jahoda jahody jaro jedle jogurt kabelka kaktus kalhoty kalorie kanada
+    kapitola kapitoly kardigan kariera kariery karneval karton kniha knihovna knihy
+    koberec kolace koledy kombinace komoda kompost kompozice komunikace koupelna
+    kraslice kreativita kresba krok kroky kurz kurzy kytka lamely lampa lebka lebky
+    lepidlo letadlo linka literatura malina maliny maminka mandle mapa maroko maska
+    maso masopust masticka matek materstvi matrace metody mexiko mikina motivace
+    motorika mouka mramor mrkev muffin muffinek muffiny narcis narozenin narozeniny
+    navyk novostavba objektiv obklad obraz obrazovky obrazy ocel okno okurka okurky
+    olej oslava ostrov ovoce ovocny ozdoba paleta panely panevni paprika parkety
+    pastelky pavouk pedagogika pergolou pergoly platba podcasty podlaha podzim poezie
+    pokoj pokojove pokrm poledne polsko porod porodu portugalsko posilovna poslech
+    postel postup pozitivita pozitivni pracovna pravidla prevence priznani probiotika
+    profese profil projekt prostor psycholog psychologie rakousko recenze recept
+    recepty regenerace registrace regulace rehabilitace rehabilitacni rekonstrukce
+    rekvalifikace respekt restaurace rezerva rodina rolety rostlina rostliny rozhovor
+    rozvoj ruksak rutina sazba seznam skica sklo sladkosti sladovani sleva slova
+    smlouva smrk socialni souprava sourozenci sourozenec spiritualita spisovatel
+    spisovatelka sprcha srdce stavba stolek strava strom stromek stylista sukulent
+    svacinkovy svatba svet svetr tapeta tenisky terapie terasa testovani testy textura
+    thajsko tipy toaleta tradice transakce trasa traviny trvalek trvalky turecko tvaroh
+    typologie umyvadlo vana vanochka vazba vchod velikonoce velikost veranda vesnice
+    vesta vizualizace vlak vlna vychovne vyprodej vyrazka vztah vztek zahrada zahrady
+    zelenina zima zimnich zinkova
+""".split())
+
+_CZECH_LETTERS = frozenset("áčďéěíňóřšťúůýž")
+
+
+def is_czech(keyword_word, normalized):
+    """Patří slovo klíčového slova (původní zápis, normalizovaný tvar) k češtině?"""
+    return any(c in _CZECH_LETTERS for c in keyword_word.lower()) or normalized in CZECH_WORDS
+
+
+def generate_forms(word):
+    """Možné ohýbané tvary jednoho (normalizovaného) slova podle koncovkových vzorů."""
+    if len(word) < MIN_STEM_WORD or not word.isalpha():
+        return set()
+    last = word[-1]
+    if last in _ENDINGS:
+        stem = word[:-1]
+        forms = {stem + ending for ending in _ENDINGS[last]}
+    else:
+        forms = {word + ending for ending in _CONSONANT_ENDINGS}
+    forms.discard(word)
+    return {f for f in forms if len(f) >= MIN_STEM_WORD}
+
+
+def build_table(vocabulary, tsv_pairs=(), groups=None, czech=None):
+    """
+    Postaví tabulku tvar → lemma.
+
+    vocabulary - normalizovaná slova z klíčových slov; slovo, které je tvarem
+                 jiného slova ze slovníku (muffiny → muffin), se na něj sloučí,
+                 pokud obě patří do stejných skupin
+    tsv_pairs  - volitelné dvojice (tvar, lemma) z morfologického slovníku,
+                 mají přednost před vzory
+    groups     - {slovo: frozenset pravidel/kategorií, kde se vyskytuje};
+                 None = všechna slova v jedné skupině
+    czech      - slova, která se smějí ohýbat podle vzorů; None = všechna
+    """
+    vocabulary = sorted(set(vocabulary), key=lambda w: (len(w), w))
+    known = set(vocabulary)
+    groups = groups or {}
+    owner = {}      # tvar -> lemma
+    ambiguous = set()
+
+    def assign(form, lemma):
+        if form in ambiguous or form in NEVER_MAP:
+            return
+        # jiné klíčové slovo se sloučí jen se slovem ze stejných pravidel a kategorií
+        if form in known and form != lemma and groups.get(form) != groups.get(lemma):
+            return
+        current = owner.get(form)
+        if current is None:
+            owner[form] = lemma
+        elif current != lemma:
+            ambiguous.add(form)
+            del owner[form]
+
+    for form, lemma in tsv_pairs:
+        if form != lemma:
+            assign(form, lemma)
+
+    # nejkratší slova první: "muffin" si "muffiny" přivlastní dřív než naopak
+    for word in vocabulary:
+        if czech is not None and word not in czech:
+            continue
+        lemma = owner.get(word, word)
+        for form in generate_forms(word):
+            assign(form, lemma)
+
+    # lemma samo nesmí být přemapované na něco jiného (zabránilo by to zpětné shodě)
+    table = {form: lemma for form, lemma in owner.items() if form != lemma}
+    for lemma in set(table.values()):
+        table.pop(lemma, None)
+    return table
+
+
+def read_tsv(path, normalize):
+    """Načte dvojice (tvar, lemma) z TSV a normalizuje je funkcí normalize."""
+    pairs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) < 2:
+                continue
+            form, lemma = normalize(parts[0]), normalize(parts[1])
+            if form and lemma and " " not in form and " " not in lemma:
+                pairs.append((form, lemma))
+    return pairs
+
+
+def source_digest(vocabulary, groups=None, czech=None):
+    """Otisk slovníku (i se skupinami a českými slovy), ze kterého se tabulka generovala."""
+    groups = groups or {}
+    lines = [f"{word}\t{'|'.join(sorted(groups.get(word, ())))}\t{czech is None or word in czech}"
+             for word in sorted(set(vocabulary))]
+    return hashlib.sha1("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def write_table(path, table, digest):
+    """Uloží tabulku jako MAGIC + otisk + zlib("tvar\\tlemma\\n"...)."""
+    body = "\n".join(f"{form}\t{lemma}" for form, lemma in sorted(table.items()))
+    data = MAGIC + digest.encode("ascii") + zlib.compress(body.encode("utf-8"), 9)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def load_table(path):
+    """Načte tabulku. Vrací (dict tvar → lemma, otisk), nebo ({}, None) pokud soubor chybí/je vadný."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return {}, None
+    if not data.startswith(MAGIC):
+        return {}, None
+    digest = data[len(MAGIC):len(MAGIC) + 40].decode("ascii")
+    try:
+        body = zlib.decompress(data[len(MAGIC) + 40:]).decode("utf-8")
+    except (zlib.error, UnicodeDecodeError):
+        return {}, None
+    table = {}
+    for line in body.split("\n"):
+        form, _, lemma = line.partition("\t")
+        if lemma:
+            table[form] = lemma
+    return table, digest
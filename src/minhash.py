@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Textové duplikáty přes MinHash a LSH (locality-sensitive hashing).
+
+Dva screenshoty stejného článku - jeden oříznutý, druhý kousek odscrollovaný -
+mají různé perceptuální hashe, ale skoro stejný OCR text. Text se rozloží na
+překrývající se trojice slov (shingles); MinHash signatura z num_perm
+nezávislých hashovacích funkcí odhaduje Jaccardovu podobnost množin shingles
+(podíl shodných pozic signatury).
+
+LSH rozdělí signaturu na `bands` pásem po `rows` řádcích; dokumenty se stejným
+pásmem padnou do stejného kbelíku. Kandidáti jsou jen dokumenty se společným
+kbelíkem - práh, kolem kterého se kandidáti objevují, je ≈ (1/bands)^(1/rows).
+Kandidáti se ověří odhadem podobnosti ze signatur.
+"""
+
+import zlib
+
+import numpy as np
+
+_PRIME = (1 << 31) - 1
+
+
+def shingles(words, size=3):
+    """Množina hashů (uint32) překrývajících se n-tic slov; krátký text = jedna n-tice."""
+    if len(words) < size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """Signatury délky num_perm z hashů (a·x + b) mod p; seed určuje funkce (stejný = porovnatelné)."""
+
+    def __init__(self, num_perm=100, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, _PRIME, size=num_perm).astype(np.int64)
+        self._b = rng.randint(0, _PRIME, size=num_perm).astype(np.int64)
+
+    def signature(self, shingle_set):
+        """Signatura (num_perm,) uint32, pro prázdnou množinu None."""
+        if not shingle_set:
+            return None
+        values = np.fromiter(shingle_set, dtype=np.int64, count=len(shingle_set)) % _PRIME
+        hashed = (values[:, None] * self._a[None, :] + self._b[None, :]) % _PRIME
+        return hashed.min(axis=0).astype(np.uint32)
+
+
+def similarity(sig_a, sig_b):
+    """Odhad Jaccardovy podobnosti ze dvou signatur."""
+    return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+class LshIndex:
+    """
+    LSH nad MinHash signaturami.
+
+    bands      - počet pásem (rows = num_perm // bands řádků v pásmu)
+    threshold  - minimální odhadnutá podobnost, aby šlo o duplikát
+    """
+
+    def __init__(self, num_perm=100, bands=20, threshold=0.6):
+        if num_perm % bands:
+            raise ValueError("num_perm musí být dělitelné bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self._buckets = [{} for _ in range(bands)]
+        self.signatures = []
+        self.items = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [signature[i * rows:(i + 1) * rows].tobytes() for i in range(self.bands)]
+
+    def add(self, signature, item):
+        doc_id = len(self.items)
+        self.signatures.append(signature)
+        self.items.append(item)
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(key, []).append(doc_id)
+        return doc_id
+
+    def query(self, signature):
+        """[(položka, odhad podobnosti)] nad prahem, od nejpodobnější."""
+        candidates = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(key, ()))
+        found = []
+        for doc_id in candidates:
+            score = similarity(signature, self.signatures[doc_id])
+            if score >= self.threshold:
+                found.append((score, doc_id))
+        found.sort(reverse=True)
+        return [(self.items[doc_id], score) for score, doc_id in found]
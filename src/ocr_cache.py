@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Cache OCR textů podle hashe souboru.
+
+OCR je nejdražší krok celého běhu; text stejného souboru se mezi běhy nemění,
+dokud se nezmění nastavení OCR (OCR_VERSION v organizeru). Uložené texty zároveň
+slouží jako korpus pro trénink klasifikátoru a další offline nástroje.
+"""
+
+import json
+import os
+
+
+class _JsonStream:
+    """Postupné čtení JSON hodnot ze souboru po blocích (json.JSONDecoder.raw_decode)."""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.pos >= self.chunk_size:
+            # přečtená část bufferu se zahodí - v paměti zůstane jen rozečtený blok
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def peek(self):
+        """Další znak mimo bílé znaky (bez posunu), "" na konci souboru."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"čekám {char!r} na pozici {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """Další JSON hodnota; když ji konec bufferu usekne, dočte další blok."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # číslo na konci bufferu může pokračovat v dalším bloku
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+class OcrTextCache:
+    """hash souboru → OCR text (bez chybových výstupů "[CHYBA: …]") + jméno souboru pro reporty."""
+
+    def __init__(self, version, path=None):
+        self.version = version
+        self.path = path
+        self.entries = {}
+        self.names = {}
+        self.hits = 0
+        self.misses = 0
+        self.loaded = 0
+
+    def get(self, file_hash):
+        text = self.entries.get(file_hash)
+        if text is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return text
+
+    def put(self, file_hash, text, filename=None):
+        if text is not None and not text.startswith("[CHYBA"):
+            self.entries[file_hash] = text
+            if filename:
+                self.names[file_hash] = filename
+
+    def name(self, file_hash):
+        """Jméno souboru, pod kterým byl text uložen (nebo zkrácený hash)."""
+        return self.names.get(file_hash) or file_hash[:12]
+
+    def texts(self):
+        """Všechny uložené texty (pořadí vložení)."""
+        return list(self.entries.values())
+
+    def __len__(self):
+        return len(self.entries)
+
+    def iter_texts(self, chunk_size=1 << 20):
+        """
+        Texty z cache souboru na disku jako proud, bez load() - v paměti je jen
+        rozečtený blok souboru, ne celá cache (offline nástroje nad miliony textů).
+        Počítá s pořadím klíčů, které zapisuje save ("version" a hned "entries").
+        Jiná verze OCR nebo jiné pořadí nedá nic; u poškozeného souboru proud skončí.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stream = _JsonStream(f, chunk_size)
+                stream.expect("{")
+                if stream.value() != "version":
+                    return
+                stream.expect(":")
+                if stream.value() != self.version:
+                    return
+                stream.expect(",")
+                if stream.value() != "entries":
+                    return
+                stream.expect(":")
+                stream.expect("{")
+                if stream.peek() == "}":
+                    return
+                while True:
+                    stream.value()      # hash souboru
+                    stream.expect(":")
+                    yield stream.value()
+                    if stream.peek() != ",":
+                        return
+                    stream.pos += 1
+        except (OSError, ValueError):
+            return
+
+    def load(self):
+        """Načte cache z disku, pokud sedí verze OCR. Vrací počet načtených textů."""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if data.get("version") != self.version:
+            return 0
+        self.entries.update(data.get("entries", {}))
+        self.names.update(data.get("names", {}))
+        self.loaded = len(self.entries)
+        return self.loaded
+
+    def save(self):
+        """Uloží cache na disk (atomicky přes dočasný soubor)."""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "entries": self.entries, "names": self.names},
+                      f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def summary(self):
+        total = self.hits + self.misses
+        return (f"📖 OCR cache: {self.hits}/{total} textů z cache, "
+                f"načteno z disku: {self.loaded}, uloženo: {len(self.entries)}")
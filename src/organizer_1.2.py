@@ -2,19 +2,46 @@
 # -*- coding: utf-8 -*-
 
 import os
+import sys
 import hashlib
+import marshal
 import re
 from datetime import datetime
-from PIL import Image
+from PIL import Image, ImageFilter, ImageOps
 import pytesseract
 from pillow_heif import register_heif_opener
 import argparse
 import random
 import json
-import imagehash
-
-# Import kategorií ze samostatného souboru
-from categories_v1 import CATEGORIES, WORD_WEIGHTS, SOCIAL_MEDIA_UI_KEYWORDS
+import time
+import importlib.util
+import multiprocessing
+from collections import namedtuple
+
+from compiled_rules import (source_digest as rules_source_digest, write_artifact as write_rules_artifact,
+                            load_artifact as load_rules_artifact)
+from rule_profiler import RuleProfiler
+from categorize_memo import CategorizeMemo
+from fuzzy_index import DeletionIndex
+from text_classifier import HashedLinearClassifier
+from ocr_cache import OcrTextCache
+from text_index import Bm25Index
+from hamming_index import NearDuplicateIndex
+from compact_state import benchmark as benchmark_dedup_memory
+from minhash import MinHasher, LshIndex, shingles
+from image_hashes import hash_images, HASH_NAMES as IMAGE_HASH_NAMES
+from dedup import scan_files, scan_tree, edge_hash, find_exact_duplicates, duplicate_plan, LibraryCatalog
+from file_index import FileIdentityIndex
+from content_hash import (ALGORITHMS as HASH_ALGORITHMS, DEFAULT_ALGORITHM, DEFAULT_CHUNK_SIZE, new_hasher, hash_id,
+                          hash_file, benchmark as benchmark_hashes, benchmark_files as benchmark_file_hashing,
+                          CAN_DROP_CACHE as FILE_CACHE_DROPPABLE)
+from term_miner import TermMiner
+from stage_stats import StageStats
+from rule_watcher import RuleWatcher
+from decision_trace import DecisionTrace, TraceWriter, format_trace, parse_filters, query_traces
+from lemmas import (load_table as load_lemma_table, build_table as build_lemma_table,
+                    write_table as write_lemma_table, read_tsv as read_lemma_tsv,
+                    source_digest as lemma_source_digest, is_czech as is_czech_word)
 from unidecode import unidecode  # pip install Unidecode
 
 register_heif_opener()
@@ -29,6 +56,14 @@ MAX_TEST_FILES = 100
 # python3 organizer_1.1.py --input_dir "/tvoje/cesta/screenshots"
 DEFAULT_SOURCE_FOLDER = "/Volumes/Elements2023/Screenshot Organizer/screenshots"
 
+# Složka pro cache mezi běhy (memo kategorizace apod.)
+DEFAULT_CACHE_DIR = os.path.expanduser("~/.screenshots_organizer")
+OCR_CACHE_FILE = "ocr_texts.json"
+RULES_ARTIFACT_FILE = "rules_compiled.bin"
+CLASSIFIER_FILE = "classifier.npz"
+TEXT_INDEX_FILE = "text_index.npz"
+FILE_INDEX_FILE = "file_index.json"
+
 # ========================================================================
 # FUNKCE
 # ========================================================================
@@ -43,12 +78,13 @@ def filter_social_media_ui_text(text):
 
     words = text.split()
     filtered_words = []
+    ui_keywords = get_ruleset().ui_keywords
 
     for word in words:
         word_lower = word.lower().strip('.,!?;:')
 
         # 1) UI prvky sociálních sítí (tvůj seznam SOCIAL_MEDIA_UI_KEYWORDS)
-        if any(ui_keyword in word_lower for ui_keyword in SOCIAL_MEDIA_UI_KEYWORDS):
+        if any(ui_keyword in word_lower for ui_keyword in ui_keywords):
             continue
 
         # 2) Počty/metriky: 10,2 k / 28k / 1.1m / 356K (povolíme i mezeru)
@@ -80,39 +116,174 @@ def tokenize_words(s: str) -> set:
     return set(re.findall(r"\b\w+\b", s))
 
 
+# ========================================================================
+# SLOUČENÉ ČIŠTĚNÍ TEXTU (filtr UI + normalizace + tokenizace v jednom)
+# ========================================================================
+def _keyword_trie_pattern(keywords):
+    """
+    Složí klíčová slova do regexu ve tvaru trie ("follow(?:ers|ing)?" místo
+    "follow|followers|following"), aby regex nezkoušel každou alternativu zvlášť.
+    Slova, která obsahují jiné klíčové slovo, vynecháme - na test "obsahuje" nemají vliv.
+    """
+    words = set(keywords)
+    words = {w for w in words if not any(o != w and o in w for o in words)}
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node):
+        alternatives = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return ""
+        body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+        if "" in node:
+            body = "(?:" + body + ")?"
+        return body
+
+    return emit(trie)
+
+
+def _build_ui_word_re(keywords):
+    """
+    Celé "slovo" (úsek bez mezer), které obsahuje UI prvek nebo je metrika
+    typu 10,2k / 1.1m - stejná pravidla jako filter_social_media_ui_text,
+    jen jako jeden předkompilovaný regex místo any() přes seznam pro každé slovo.
+    """
+    return re.compile(
+        r"(?<!\S)(?:"
+        r"\S*" + _keyword_trie_pattern(keywords) + r"\S*"
+        r"|[.,!?;:]*\d{1,3}(?:[.,]\d{1,2})?[km][.,!?;:]*"
+        r")(?!\S)"
+    )
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _build_diacritics_table():
+    """Překladová tabulka pro latinku s diakritikou (U+00A0–U+024F) podle unidecode."""
+    table = {}
+    for code in range(0xA0, 0x250):
+        ch = chr(code)
+        table[code] = unidecode(ch)
+    return table
+
+
+# Tabulka se postaví až při prvním clean_text (unidecode pro 432 znaků), ne při importu
+_DIACRITICS_TABLE = None
+
+
+def _diacritics_table():
+    global _DIACRITICS_TABLE
+    if _DIACRITICS_TABLE is None:
+        _DIACRITICS_TABLE = _build_diacritics_table()
+    return _DIACRITICS_TABLE
+
+
+def clean_text(text, ruleset=None):
+    """
+    Jeden průchod místo filter_social_media_ui_text → normalize_text_simple → tokenize_words.
+    Vrací (norm_text, tokens) - stejný výsledek jako původní řetězec funkcí.
+    ruleset = sada pravidel, kterou si volající už vzal (None = aktivní).
+    """
+    if not text:
+        return "", set()
+    ui_word_re = (ruleset or get_ruleset()).ui_word_re
+    s = ui_word_re.sub(" ", text.lower())
+    s = s.translate(_DIACRITICS_TABLE or _diacritics_table())
+    if not s.isascii():
+        # vzácné znaky mimo tabulku (emoji, azbuka...) - necháme na unidecode
+        s = unidecode(s)
+    words = _WORD_RE.findall(s)
+    return " ".join(words), set(words)
+
+
+def benchmark_text_cleaning(texts, repeat=3):
+    """
+    Porovná clean_text s původním řetězcem filter → normalize → tokenize.
+    Vrací dict s µs na dokument pro obě varianty a počtem rozdílných výsledků.
+    """
+    def chain(text):
+        norm_text = normalize_text_simple(filter_social_media_ui_text(text))
+        return norm_text, tokenize_words(norm_text)
+
+    texts = [t for t in texts if t]
+    result = {"documents": len(texts), "mismatches": sum(1 for t in texts if chain(t) != clean_text(t))}
+    for name, func in (("chain", chain), ("fused", clean_text)):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for t in texts:
+                func(t)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        result[name] = best / len(texts) * 1e6 if texts else 0.0
+    return result
+
+
+# Algoritmus hashe obsahu souborů (viz set_hash_algorithm / --hash_algorithm)
+HASH_ALGORITHM = DEFAULT_ALGORITHM
+# Velikost bloku čtení při hashování (--hash_chunk_mb); USB HDD chce 1-4 MB
+HASH_CHUNK_SIZE = DEFAULT_CHUNK_SIZE
+
+
+def set_hash_algorithm(algorithm):
+    """Přepne algoritmus calculate_file_hash (ValueError, pokud není dostupný)."""
+    global HASH_ALGORITHM
+    new_hasher(algorithm)
+    HASH_ALGORITHM = algorithm
+
+
+def new_file_hasher():
+    return new_hasher(HASH_ALGORITHM)
+
+
 def calculate_file_hash(filepath):
-    hasher = hashlib.md5()
-    with open(filepath, 'rb') as f:
-        buf = f.read(65536)
-        while len(buf) > 0:
-            hasher.update(buf)
-            buf = f.read(65536)
-    return hasher.hexdigest()
+    """Id obsahu souboru zvoleným algoritmem (s prefixem algoritmu, u MD5 bez)."""
+    hasher = hash_file(filepath, new_file_hasher(), HASH_CHUNK_SIZE)
+    return hash_id(HASH_ALGORITHM, hasher.hexdigest())
 
 
-def perceptual_hash(filepath):
-    """Perceptuální hash pro zjištění vizuálních duplicit"""
-    try:
-        img = Image.open(filepath).convert('RGB')
-        # phash je citlivý na vizuální podobnost
-        return str(imagehash.phash(img))
-    except Exception:
-        return None
+# Změna výpočtu perceptuálních hashů musí změnit i tuto verzi (zneplatní index souborů)
+PHASH_VERSION = "np64|a,d,p,w"
+
+
+def open_file_index(cache_dir):
+    """Index identity souborů z cache složky (pro aktuální algoritmus hashe)."""
+    index = FileIdentityIndex(f"{HASH_ALGORITHM}|{PHASH_VERSION}", os.path.join(cache_dir, FILE_INDEX_FILE))
+    index.load()
+    return index
+
 
+# Změna nastavení OCR níže musí změnit i tuto verzi (zneplatní cache OCR textů)
+OCR_VERSION = "ces+eng|oem3|psm6|x1.5|50-200"
 
-def extract_text_from_image(image_path):
+
+def extract_text_from_image(image_path, high_quality=False):
     """
     Vylepšené předzpracování obrázku pro OCR:
     - převod do stupňů šedi
     - zvětšení (resize)
     - jednoduchý kontrast/threshold
     - lepší konfigurace pro pytesseract
+    high_quality=True je pomalejší varianta pro stupeň 2b (re-OCR nepřiřazených):
+    větší zvětšení, autokontrast + doostření a automatická segmentace stránky.
     """
     try:
         img = Image.open(image_path)
         # převést na grayscale
         img = img.convert('L')
 
+        if high_quality:
+            img = img.resize((int(img.width * 2.5), int(img.height * 2.5)), Image.LANCZOS)
+            img = ImageOps.autocontrast(img, cutoff=1).filter(ImageFilter.SHARPEN)
+            # PSM 3: automatická segmentace (sloupce, bubliny komentářů…)
+            text = pytesseract.image_to_string(img, lang='ces+eng', config="--oem 3 --psm 3")
+            return text.lower().strip()
+
         # zvětšení pro lepší rozpoznání drobného textu
         scale = 1.5
         img = img.resize((int(img.width * scale), int(img.height * scale)), Image.BILINEAR)
@@ -134,832 +305,1582 @@ def extract_text_from_image(image_path):
         return f"[CHYBA: {e}]"
 
 
-def categorize_text(text, debug=False):
+# Profiler pravidel (None = vypnuto, viz enable_profiling / --profile)
+PROFILER = None
+
+
+def enable_profiling():
+    """Zapne sběr statistik pro categorize_text a vrátí profiler."""
+    global PROFILER
+    PROFILER = RuleProfiler()
+    return PROFILER
+
+
+# Jak porovnávat víceslovné fráze:
+#   "ngram"     - množina n-gramů z tokenů textu, fráze = hash lookup (hranice slov)
+#   "substring" - původní `fráze in norm_text` (pro porovnání, viz --compare_matching)
+PHRASE_MATCHING = "ngram"
+
+
+# Tabulka tvar → lemma generovaná offline (--build_lemmas); chybí-li, nelemmatizuje se
+LEMMAS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lemmas_cs.bin")
+# Zdroj výchozích pravidel; modul se importuje až v _default_ruleset (při prvním použití pravidel)
+CATEGORIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "categories_v1.py")
+
+
+def lemmatize_text(norm_text, lemmas):
+    """Převede normalizovaný text na lemmata (jeden dict lookup na slovo)."""
+    if not lemmas:
+        return norm_text
+    return " ".join([lemmas.get(w, w) for w in norm_text.split()])
+
+
+def _normalize_keywords(keywords, lemmas):
     """
-    Vrací tuple: (kategorie (str), matched_terms (list[str]))
-    matched_terms jsou top klíčová slova, která rozhodnutí podpořila.
+    Předpočítá dvojice (původní keyword, normalizovaný a lemmatizovaný keyword).
+    Keywordy se stejným lemmatem ("muffin", "muffiny") zůstanou jen jednou.
     """
-    if not text or text.startswith("[CHYBA"):
-        return "Neprirazeno", []
+    pairs = []
+    seen = set()
+    for k in keywords:
+        k_norm = lemmatize_text(normalize_text_simple(k), lemmas)
+        if k_norm in seen:
+            continue
+        seen.add(k_norm)
+        pairs.append((k, k_norm))
+    return tuple(pairs)
+
+
+def compile_rules(context_rules=None, categories=None, word_weights=None, lemmas=None):
+    """
+    Jednou předpočítá vše, co categorize_text potřebuje z pravidel a CATEGORIES:
+    normalizované triggery, váhy, délky frází a první slova frází.
+    Vynechané argumenty se vezmou z aktivní sady pravidel (aktivní nemění).
+    """
+    if context_rules is None or categories is None or word_weights is None or lemmas is None:
+        rs = get_ruleset()
+        context_rules = rs.context_rules if context_rules is None else context_rules
+        categories = rs.categories if categories is None else categories
+        word_weights = rs.word_weights if word_weights is None else word_weights
+        lemmas = rs.lemmas if lemmas is None else lemmas
+    categories_data = categories
+
+    rules = []
+    for rule in context_rules:
+        rules.append({
+            "name": rule["name"],
+            "category": rule["category"],
+            "very_specific": _normalize_keywords(rule["very_specific"], lemmas),
+            "kombinacni": _normalize_keywords(rule["kombinacni"], lemmas),
+            "kontextove": _normalize_keywords(rule["kontextove"], lemmas),
+        })
+
+    categories = []
+    for category, keywords in categories_data.items():
+        # lemma -> {normalizovaný tvar: součet vah}; stejný tvar zapsaný víckrát
+        # ("zahrádka", "zahradka") se dřív započítal víckrát - součet to zachová
+        forms = {}
+        toy_flags = {}
+        for keyword in keywords:
+            k_norm = normalize_text_simple(keyword)
+            weight = word_weights.get(keyword, word_weights.get(k_norm, 3))
+            # výjimka pro hračky u oblečení (pokud je to hračka, ignoruj velikosti)
+            toy_exception = category == "Obleceni_Styl" and k_norm in ["vel", "velikost", "size", "cm"]
+            lemma = lemmatize_text(k_norm, lemmas)
+            by_form = forms.setdefault(lemma, {})
+            by_form[k_norm] = by_form.get(k_norm, 0) + weight
+            toy_flags[lemma] = toy_flags.get(lemma, True) and toy_exception
+        # různé tvary jednoho lemmatu ("kolac", "kolace") se počítají jednou - nejvyšší váhou
+        entries = tuple((lemma, max(by_form.values()), toy_flags[lemma]) for lemma, by_form in forms.items())
+        categories.append((category, entries))
+
+    # n-gramy stačí stavět jen od slov, kterými nějaká fráze začíná
+    phrase_lengths = set()
+    phrase_first_words = set()
+    for rule in rules:
+        for key in ("very_specific", "kombinacni", "kontextove"):
+            for _, k_norm in rule[key]:
+                words = k_norm.split()
+                if len(words) > 1:
+                    phrase_lengths.add(len(words))
+                    phrase_first_words.add(words[0])
+
+    return {
+        "rules": rules,
+        "categories": categories,
+        "phrase_lengths": tuple(sorted(phrase_lengths)),
+        "phrase_first_words": frozenset(phrase_first_words),
+        "toy_keywords": tuple(lemmatize_text(normalize_text_simple(k), lemmas) for k in
+                              ["stavebnice", "hracka", "hra", "puzzle", "lego", "vrtacka"]),
+    }
 
-    # 1) FILTROVÁNÍ UI PRVKŮ ZE SOCIÁLNÍCH MÉDIÍ
-    filtered_text = filter_social_media_ui_text(text)
 
-    # 2) NORMALIZACE + TOKENIZACE
-    norm_text = normalize_text_simple(filtered_text)  # string bez diakritiky, malé písmena
-    tokens = tokenize_words(norm_text)                # množina slov
+# Verze výstupu compile_rules - při změně jeho struktury/logiky zvýšit (zneplatní artefakty)
+RULES_FORMAT = 1
 
-    if debug:
-        print("\n" + "="*60)
-        print("DEBUG - original (prvních 200):", text[:200])
-        print("DEBUG - filtered:", filtered_text[:200])
-        print("DEBUG - normalized:", norm_text[:200])
-        print("="*60 + "\n")
+# Předkompilovaná pravidla se načítají líně z artefaktu (get_ruleset, --build_rules)
+RULES_ARTIFACT_PATH = os.path.join(DEFAULT_CACHE_DIR, RULES_ARTIFACT_FILE)
 
-    # ===== KONTEXTOVÁ PRAVIDLA =====
-    # Používáme kombinaci: token matching pro jednotlivá slova + substring matching pro fráze
-    
-    # Pomocná funkce pro matching
-    def matches_keyword(keyword, norm_text, tokens):
-        """Zkontroluje keyword - buď jako celé slovo (token) nebo jako frázi v textu"""
-        k_norm = normalize_text_simple(keyword)
-        # pokud má keyword mezery, hledej jako substring (fráze)
+# Sada pravidel jako jeden neměnný objekt: data z categories_v1, tabulka lemmat
+# a z nich odvozený regex UI prvků a předkompilovaná pravidla (compile_rules).
+Ruleset = namedtuple("Ruleset", ["categories", "word_weights", "ui_keywords", "context_rules",
+                                 "lemmas", "lemmas_digest", "ui_word_re", "compiled"])
+
+# Aktivní sada (None = ještě nenačtená, viz get_ruleset). Přepnutí je jedno přiřazení
+# reference (activate_ruleset); kategorizace si ji vezme jednou na začátku a celý
+# dokument vyhodnotí podle ní, i když se mezitím pravidla přenačtou.
+ACTIVE_RULESET = None
+
+
+def make_ruleset(categories, word_weights, ui_keywords, context_rules, lemmas, lemmas_digest, compiled=None):
+    """Sestaví Ruleset; bez compiled pravidla zkompiluje (aktivní sadu nemění)."""
+    if compiled is None:
+        compiled = compile_rules(context_rules, categories, word_weights, lemmas)
+    return Ruleset(categories, word_weights, ui_keywords, context_rules, lemmas, lemmas_digest,
+                   _build_ui_word_re(ui_keywords), compiled)
+
+
+def rules_digest(ruleset=None):
+    """
+    Otisk všeho, z čeho compile_rules staví: categories_v1.py, CONTEXT_RULES, lemmata,
+    verze formátu - a verze Pythonu a marshal, protože marshal mezi nimi kompatibilní není.
+    """
+    rs = ruleset or get_ruleset()
+    context_rules = json.dumps(rs.context_rules, sort_keys=True, ensure_ascii=False)
+    return rules_source_digest([CATEGORIES_PATH], [context_rules, rs.lemmas_digest, RULES_FORMAT,
+                                                   sys.version_info[:2], marshal.version])
+
+
+def build_rules(path=None):
+    """Zkompiluje aktivní pravidla a uloží artefakt. Vrací (compiled, velikost v bajtech)."""
+    rs = get_ruleset()
+    compiled = compile_rules(rs.context_rules, rs.categories, rs.word_weights, rs.lemmas)
+    size = write_rules_artifact(path or RULES_ARTIFACT_PATH, rules_digest(rs), compiled)
+    return compiled, size
+
+
+def _default_ruleset():
+    """
+    Sada z categories_v1.py a tabulky lemmat. Pravidla se vezmou z artefaktu, a když
+    chybí nebo neodpovídá zdrojům (změna categories_v1.py…), postaví se znovu a uloží.
+    """
+    import categories_v1
+
+    lemmas, lemmas_digest = load_lemma_table(LEMMAS_PATH)
+    rs = make_ruleset(categories_v1.CATEGORIES, categories_v1.WORD_WEIGHTS,
+                      categories_v1.SOCIAL_MEDIA_UI_KEYWORDS, categories_v1.CONTEXT_RULES,
+                      lemmas, lemmas_digest, compiled={})
+    digest = rules_digest(rs)
+    compiled = load_rules_artifact(RULES_ARTIFACT_PATH, digest)
+    if compiled is None:
+        compiled = compile_rules(rs.context_rules, rs.categories, rs.word_weights, rs.lemmas)
+        try:
+            write_rules_artifact(RULES_ARTIFACT_PATH, digest, compiled)
+        except OSError:
+            pass    # cache složka nejde zapsat - jen bez artefaktu
+    return rs._replace(compiled=compiled)
+
+
+def get_ruleset():
+    """Aktivní sada pravidel; při prvním použití se načte (_default_ruleset)."""
+    rs = ACTIVE_RULESET
+    if rs is None:
+        rs = activate_ruleset(_default_ruleset())
+    return rs
+
+
+def activate_ruleset(ruleset):
+    """
+    Přepne aktivní pravidla na ruleset (z get_ruleset, make_ruleset nebo load_ruleset)
+    jedním přiřazením reference, bez zámků - rozběhnutá kategorizace dál pracuje
+    se sadou, kterou si už vzala. Vrací ruleset.
+    """
+    global ACTIVE_RULESET
+    ACTIVE_RULESET = ruleset
+    return ruleset
+
+
+def get_compiled():
+    """Předkompilovaná pravidla aktivní sady."""
+    return get_ruleset().compiled
+
+
+def disable_lemmas():
+    """Vypne lemmatizaci (--no_lemmas) a přepočítá pravidla."""
+    rs = get_ruleset()
+    activate_ruleset(rs._replace(lemmas={}, lemmas_digest=None,
+                                 compiled=compile_rules(rs.context_rules, rs.categories, rs.word_weights, {})))
+
+
+def rule_vocabulary():
+    """
+    Normalizovaná slova z pravidel a CATEGORIES (bez lemmatizace).
+    Vrací ({slovo: frozenset pravidel a kategorií, kde se vyskytuje}, množina českých slov).
+    """
+    rs = get_ruleset()
+    groups = {}
+    czech = set()
+
+    def add(group, keyword):
+        for original in keyword.split():
+            for word in normalize_text_simple(original).split():
+                groups.setdefault(word, set()).add(group)
+                if is_czech_word(original, word):
+                    czech.add(word)
+
+    for rule in rs.context_rules:
+        for key in ("very_specific", "kombinacni", "kontextove"):
+            for k in rule[key]:
+                add("pravidlo:" + rule["name"], k)
+    for category, keywords in rs.categories.items():
+        for k in keywords:
+            add("kategorie:" + category, k)
+    return {word: frozenset(names) for word, names in groups.items()}, czech
+
+
+def build_lemmas(path=None, tsv_path=None):
+    """
+    Offline krok: vygeneruje tabulku tvar → lemma pro slova z pravidel
+    (případně doplněnou o TSV z morfologického slovníku) a uloží ji do path.
+    """
+    groups, czech = rule_vocabulary()
+    tsv_pairs = read_lemma_tsv(tsv_path, normalize_text_simple) if tsv_path else ()
+    table = build_lemma_table(groups, tsv_pairs, groups=groups, czech=czech)
+    size = write_lemma_table(path or LEMMAS_PATH, table, lemma_source_digest(groups, groups, czech))
+    return len(table), size
+
+
+def prepare_text(text, ruleset=None):
+    """clean_text + lemmatizace: (norm_text, tokens) tak, jak je vidí pravidla."""
+    rs = ruleset or get_ruleset()
+    norm_text, tokens = clean_text(text, rs)
+    lemmas = rs.lemmas
+    if lemmas:
+        words = [lemmas.get(w, w) for w in norm_text.split()]
+        return " ".join(words), set(words)
+    return norm_text, tokens
+
+
+def prepare_text_surface(text, ruleset=None):
+    """
+    Jako prepare_text, navíc {lemma: tvar v textu} pro slova, která lemmatizace
+    změnila (první výskyt) - pro hlášení klíčových slov tak, jak jsou v textu.
+    """
+    rs = ruleset or get_ruleset()
+    norm_text, tokens = clean_text(text, rs)
+    lemmas = rs.lemmas
+    if not lemmas:
+        return norm_text, tokens, {}
+    words = []
+    surface = {}
+    for word in norm_text.split():
+        lemma = lemmas.get(word, word)
+        if lemma != word:
+            surface.setdefault(lemma, word)
+        words.append(lemma)
+    return " ".join(words), set(words), surface
+
+
+def surface_terms(matched, surface, tokens, ruleset=None):
+    """
+    Nalezená klíčová slova tak, jak byla v textu: keyword "trendy" sjednocený
+    lemmatem s "trend" se u textu "nový trend" hlásí jako "trend".
+    surface a tokens jsou z prepare_text_surface; slovo, které v textu není
+    (výsledek z re-OCR uložený v memu), zůstane jako v pravidlech.
+    """
+    lemmas = (ruleset or get_ruleset()).lemmas
+    if not lemmas:
+        return matched
+    result = []
+    for term in matched:
+        if term.endswith(FUZZY_MARK):
+            result.append(term)
+            continue
+        words = normalize_text_simple(term).split()
+        found = []
+        for word in words:
+            lemma = lemmas.get(word, word)
+            found.append(surface.get(lemma, lemma) if lemma in tokens else word)
+        result.append(term if found == words else " ".join(found))
+    return result
+
+
+def ruleset_fingerprint(include_classifier=True):
+    """
+    Otisk sady pravidel: data z categories_v1 + CONTEXT_RULES + zdrojový kód
+    organizeru (změna logiky categorize_text musí zneplatnit uložené výsledky).
+    include_classifier=False dá otisk samotných pravidel (štítky pro trénink klasifikátoru).
+    """
+    rs = get_ruleset()
+    hasher = hashlib.sha1()
+    fuzzy = (FUZZY_INDEX.max_distance, FUZZY_INDEX.min_length, FUZZY_WEIGHT) if FUZZY_INDEX else None
+    classifier = (CLASSIFIER.digest, CLASSIFIER_THRESHOLD) if CLASSIFIER and include_classifier else None
+    data = [rs.context_rules, rs.categories, rs.word_weights, rs.ui_keywords, PHRASE_MATCHING, fuzzy,
+            rs.lemmas_digest, classifier, REOCR]
+    hasher.update(json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    with open(os.path.abspath(__file__), "rb") as f:
+        hasher.update(f.read())
+    return hasher.hexdigest()
+
+
+# Tolerance OCR překlepů (None = vypnuto, viz enable_fuzzy / --fuzzy).
+# Fuzzy shody se zkoušejí jen u textů, které přesné pravidla nechala v Neprirazeno.
+FUZZY_INDEX = None
+FUZZY_WEIGHT = 0.5   # váha fuzzy shody ve váhovém systému (násobek váhy slova)
+FUZZY_MARK = "~"     # přípona u klíčových slov nalezených přes opravu překlepu
+
+
+def enable_fuzzy(max_distance=1, min_length=5):
+    """Postaví deletion index nad všemi slovy z pravidel a CATEGORIES a zapne fuzzy matching."""
+    global FUZZY_INDEX
+    FUZZY_INDEX = build_fuzzy_index(get_compiled(), max_distance, min_length)
+    return FUZZY_INDEX
+
+
+def build_fuzzy_index(compiled, max_distance=1, min_length=5):
+    """Deletion index nad slovy předkompilovaných pravidel."""
+    words = set()
+    for rule in compiled["rules"]:
+        for key in ("very_specific", "kombinacni", "kontextove"):
+            for _, k_norm in rule[key]:
+                words.update(k_norm.split())
+    for _, entries in compiled["categories"]:
+        for k_norm, _, _ in entries:
+            words.update(k_norm.split())
+    return DeletionIndex(words, max_distance=max_distance, min_length=min_length)
+
+
+def fuzzy_grams(norm_text, tokens, compiled=None):
+    """
+    Tokeny a n-gramy, které se v textu objeví až po opravě OCR překlepů
+    (bez těch, které jsou tam i přesně). None pokud se nic neopravilo.
+    """
+    words = norm_text.split()
+    corrected, corrections = FUZZY_INDEX.correct_tokens(words)
+    if not corrections:
+        return None
+    exact = build_ngrams(norm_text, tokens, compiled)
+    fixed = build_ngrams(" ".join(corrected), set(corrected), compiled)
+    return fixed - exact
+
+
+# Nové OCR ve vyšší kvalitě pro texty, které pravidla nepřiřadila (viz --reocr)
+REOCR = False
+
+def enable_reocr():
+    """Zapne stupeň 2b - nové OCR ve vyšší kvalitě pro nepřiřazené texty s image_path."""
+    global REOCR
+    REOCR = True
+
+
+# Počty a čas stupňů kategorizace (None = vypnuto, viz enable_stage_stats / --stages)
+STAGES = None
+
+
+def enable_stage_stats():
+    """Zapne měření stupňů kategorizace a vrátí StageStats."""
+    global STAGES
+    STAGES = StageStats()
+    return STAGES
+
+
+# Záznamy rozhodnutí do JSONL (None = vypnuto, viz enable_tracing / --trace)
+TRACER = None
+
+
+def enable_tracing(path, batch_size=1000):
+    """Zapne zápis DecisionTrace každého dokumentu do path (po dávkách)."""
+    global TRACER
+    TRACER = TraceWriter(path, batch_size=batch_size)
+    return TRACER
+
+
+# Memo výsledků kategorizace (None = vypnuto, viz enable_memo)
+MEMO = None
+
+
+def enable_memo(path=None, maxsize=200_000):
+    """Zapne memo kategorizace; s path se načte z disku a půjde uložit přes MEMO.save()."""
+    global MEMO
+    MEMO = CategorizeMemo(ruleset_fingerprint(), path=path, maxsize=maxsize)
+    MEMO.load()
+    return MEMO
+
+
+# Lineární klasifikátor pro texty, které pravidla nechala v Neprirazeno
+# (None = vypnuto, viz enable_classifier / --classifier; trénink přes --train_classifier).
+CLASSIFIER = None
+CLASSIFIER_THRESHOLD = 0.6   # minimální pravděpodobnost, jinak text zůstane v Neprirazeno
+CLASSIFIER_MARK = "*"        # přípona u slov, která k rozhodnutí vybral klasifikátor
+CLASSIFIER_BATCH = 256       # kolik odložených textů dry-run test předá klasifikátoru najednou
+
+
+def enable_classifier(path, threshold=0.6):
+    """Načte natrénovaný model a zapne ho jako poslední stupeň. None pokud model chybí."""
+    global CLASSIFIER, CLASSIFIER_THRESHOLD
+    if not os.path.exists(path):
+        return None
+    CLASSIFIER = HashedLinearClassifier.load(path)
+    CLASSIFIER_THRESHOLD = threshold
+    return CLASSIFIER
+
+
+def classify_unassigned(norm_texts):
+    """
+    Dávková inference pro texty, které pravidla nepřiřadila.
+    Vrací pro každý text (kategorie, matched_terms), nebo None pod prahem jistoty.
+    """
+    docs = [t.split() for t in norm_texts]
+    results = []
+    for words, (label, _) in zip(docs, CLASSIFIER.predict(docs, CLASSIFIER_THRESHOLD)):
+        if label is None:
+            results.append(None)
+        else:
+            results.append((label, [w + CLASSIFIER_MARK for w in CLASSIFIER.explain(words, label)]))
+    return results
+
+
+def classify_deferred(texts):
+    """
+    Stupeň 3 pro texty, které categorize_text(defer_classifier=True) nechal v Neprirazeno:
+    jedna dávková inference pro všechny. Výsledek zapíše do MEMO a STAGES stejně jako
+    categorize_text (PROFILER u nich už má rozhodnutí stupňů 1-2b).
+    Vrací pro každý text (kategorie, matched_terms), nebo None pod prahem jistoty.
+    """
+    if not texts:
+        return []
+    stages = STAGES
+    t0 = stages.clock() if stages is not None else None
+    prepared = [prepare_text_surface(text) for text in texts]
+    predicted = classify_unassigned([norm_text for norm_text, _, _ in prepared])
+    share = (stages.clock() - t0) / len(texts) if stages is not None else None
+
+    results = []
+    for (norm_text, tokens, surface), result in zip(prepared, predicted):
+        if stages is not None:
+            stages.record("3 klasifikátor", share, result is not None)
+        if MEMO is not None:
+            MEMO.put(MEMO.key(norm_text), result or ("Neprirazeno", []))
+        results.append(None if result is None else (result[0], surface_terms(result[1], surface, tokens)))
+    return results
+
+
+def build_ngrams(norm_text, tokens, compiled=None):
+    """
+    Vrátí množinu tokenů + n-gramů (jen délek, které se v pravidlech vyskytují).
+    Fráze se pak hledá jako celá slova: 'sofa' už nenajde 'sofar'.
+    """
+    compiled = compiled or get_compiled()
+    lengths = compiled["phrase_lengths"]
+    first_words = compiled["phrase_first_words"]
+    words = norm_text.split()
+    grams = set(tokens)
+    count = len(words)
+    for i, word in enumerate(words):
+        if word not in first_words:
+            continue
+        for n in lengths:
+            if i + n > count:
+                break
+            grams.add(" ".join(words[i:i + n]))
+    return grams
+
+
+class _SubstringPhrases:
+    """Původní chování: slova jako tokeny, fráze jako podřetězec norm_text."""
+
+    __slots__ = ("norm_text", "tokens")
+
+    def __init__(self, norm_text, tokens):
+        self.norm_text = norm_text
+        self.tokens = tokens
+
+    def __contains__(self, k_norm):
         if ' ' in k_norm:
-            return k_norm in norm_text
-        # jinak hledej jako celé slovo
-        return k_norm in tokens
-    
-    # PRAVIDLO 1: Recepty - vyžaduje 2+ triggery NEBO 1 velmi specifický
-    recepty_very_specific = [
-        # ===== VELMI SPECIFICKÉ NÁSTROJE =====
-        "slowcooker", "slow cooker", "instant pot", "air fryer",
-        "airfryer", "thermomix", "multicooker",
-        
-        # ===== FOOD BLOGGER ÚČTY =====
-        "mycookingdiary", "toprecepty", "receptyonline", "boredoflunch",
-        
-        # ===== SPECIFICKÉ POKRMY =====
-        "slowcooker chorizo", "creamy chicken", "sundried tomato pasta",
-        
-        # ===== JASNÉ INDIKÁTORY =====
-        "cookbook", "meal prep", "mealplan",
-        "jidelni plan", "food blog", "food diary"
-    ]
-    
-    recepty_kombinacni = [
-        "ingredience", "ingredients",
-        "cooking", "vareni", "peceni", "baking",
-        "foodie", "recept", "recipe",
-        "muffin", "muffins", "muffiny",
-        "cupcake", "cupcakes",
-        "cookie", "cookies",
-        "brownie", "brownies",
-        "cake", "buchta", "kolac", "kolace",
-        "dort", "dorty", "dessert", "sladke",
-        "chorizo", "sundried tomato", "pasta", "creamy", "chicken",
-        "vegan", "vegetarian", "vegetariansky",
-        "gluten free", "bezlepkovy", "bez lepku",
-        "low carb", "keto", "paleo", "whole30",
-        "sheet pan", "one pot", "skillet",
-        "co varit", "co uvarit", "what to cook",
-        "recept na", "recipe for"
-    ]
-    
-    recepty_kontextove = [
-        "food", "jidlo", "strava",
-        "cooking", "baking"
-    ]
-    
-    # Kontrola velmi specifických (stačí 1)
-    matched_recepty_specific = [k for k in recepty_very_specific if matches_keyword(k, norm_text, tokens)]
-    if matched_recepty_specific:
-        if debug:
-            print(f"✅ PRAVIDLO 1 AKTIVOVÁNO: Recepty (velmi specifické)")
-            print(f"   Matched keywords: {matched_recepty_specific}")
-        return "Recepty", matched_recepty_specific
-    
-    # Kontrola kombinací
-    matched_recepty_kombinacni = [k for k in recepty_kombinacni if matches_keyword(k, norm_text, tokens)]
-    matched_recepty_kontextove = [k for k in recepty_kontextove if matches_keyword(k, norm_text, tokens)]
-    
-    # 2+ kombinační NEBO 1 kombinační + 1 kontextové
-    if len(matched_recepty_kombinacni) >= 2 or (len(matched_recepty_kombinacni) >= 1 and len(matched_recepty_kontextove) >= 1):
-        all_matched_recepty = matched_recepty_kombinacni + matched_recepty_kontextove
-        if debug:
-            print(f"✅ PRAVIDLO 1 AKTIVOVÁNO: Recepty (kombinace)")
-            print(f"   Matched keywords: {all_matched_recepty}")
-        return "Recepty", all_matched_recepty
-
-    # PRAVIDLO 2: Oblečení - musí mít alespoň 2 triggery
-    clothing_triggers = [
-        # ===== ZNAČKY / OBCHODY =====
-        "zara", "hm", "h&m", "mango", "reserved", "cos", "uniqlo",
-        "nike", "adidas", "puma", "new balance", "vans",
-        "decathlon", "columbia", "northface", "patagonia",
-        "wheat", "bergam",
-        # ===== FASHION KONCEPTY =====
-        "capsule wardrobe", "capsule closet",
-        "ootd", "try on", "haul", "lookbook",
-        "color analysis", "barevna typologie",
-        "winter palette", "soft autumn",
-        "fit check", "mirror selfie",
-        "stylista", "stylist",
-        "vyprodej", "sleva",
-        # ===== SPECIFICKÉ KOUSKY =====
-        "dzinovina", "denim",
-        "kardigan", "cardigan",
-        "blazer",
-        "crop top",
-        "crossbody",
-        "lodicky", "heels",
-        "baleriny", "flats",
-        "bunda", "bundy", "jacket",
-        "kabat", "coat", "parka",
-        "saty", "dress", "dresses",
-        "sukne", "skirt",
-        "kalhoty", "pants",
-        "boty", "shoes",
-        # ===== MATERIÁLY =====
-        "kasmir", "cashmere",
-        "linen", "len",
-        "leather", "kozenka", "kuze",
-        # ===== KONTEXTOVÉ FRÁZE =====
-        "outfit", "outfits",
-        "kombinace", "mix and match",
-        "trendy", "trend",
-        # ===== VELIKOSTI (důležité pro PRAVIDLO 2) =====
-        "detska", "detska bunda", "zimnich", "zimnich dnu", 
-        "velikost", "size"
-    ]
-    clothing_hits = sum(1 for k in clothing_triggers if matches_keyword(k, norm_text, tokens))
-    if clothing_hits >= 2:
-        matched = [k for k in clothing_triggers if matches_keyword(k, norm_text, tokens)]
-        if debug:
-            print(f"✅ PRAVIDLO 2 AKTIVOVÁNO: Obleceni_Styl (hits={clothing_hits})")
-            print(f"   Matched keywords: {matched}")
-        return "Obleceni_Styl", matched
-
-    # PRAVIDLO 3: Zahrada - velmi specifické rostliny
-    garden_triggers = [
-        # ===== VELMI SPECIFICKÉ ROSTLINY =====
-        "allium", "giganteum", "ambassador",
-        "hydrangea", "hortenzie",
-        "erigeron", "karvinskianus",
-        "pinus mugo", "mugo",
-        "salvia", "purple rain",
-        "sesleria", "thymus", "dianthus",
-        # ===== ZAHRADNÍ STYLY =====
-        "gravel garden", "sterkovy zahon",
-        "naturalistic planting", "naturalisticky styl",
-        "layered mix", "mix vysadby",
-        "structured planting", "kompozice trvalek",
-        "coastal garden",
-        # ===== OSVĚTLENÍ ZAHRADY =====
-        "garden lighting", "osvetleni zahrady", "uplights",
-        "zahradni svetla", "osvetleni stromu",
-        # ===== SPECIFICKÉ POJMY =====
-        "gravel mulch", "sterkovy mulc",
-        "container gardening", "potted plants",
-        "garden composition",
-        "mrazuvzdorne",
-        "kapkova zavlaha",
-        "garden path", "sterkove cesty",
-        "flower bed", "planting border",
-        # ===== ZÁKLADNÍ ALE BEZPEČNÉ =====
-        "trvalky", "perennials",
-        "garden design", "design zahrady",
-        "gardening", "gardener", "zahradkar",
-        "bylinky", "herbs",
-        "sukulent", "succulent",
-        "travy", "grasses",
-        # ===== AKTIVITY =====
-        "pestovani", "growing",
-        "vysadba", "planting",
-        "pruning",
-        "mulching", "mulc",
-        # ===== Z TVÝCH PŘÍKLADŮ =====
-        "zahradka", "zahon", "pitko", "ptaci",
-        "petrazahradnici", "biogarden", "jahody", "rostliny", "oklepavaji"
-    ]
-    matched_garden = [k for k in garden_triggers if matches_keyword(k, norm_text, tokens)]
-    if matched_garden:
-        if debug:
-            print(f"✅ PRAVIDLO 3 AKTIVOVÁNO: Zahrada")
-            print(f"   Matched keywords: {matched_garden}")
-        return "Zahrada", matched_garden
-
-    # PRAVIDLO 4: Dum_Design - interiér, architektura, outdoor
-    dum_design_triggers = [
-        # ===== ARCHITEKTONICKÉ PROJEKTY =====
-        "pudorys", "floorplan",
-        "pudorys 4kk",
-        "vizualizace", "render",
-        "rekonstrukce", "renovation",
-        "navrh domu", "plan domu",
-        "moderni dum", "bungalov",
-        
-        # ===== NÁBYTKOVÉ OBCHODY =====
-        "ikea", "jysk", "kika",
-        
-        # ===== SPECIFICKÉ STYLY =====
-        "scandi", "scandinavian", "nordic",
-        "japandi",
-        "boho", "bohemian",
-        "industrial",
-        
-        # ===== VELMI SPECIFICKÉ PRVKY =====
-        "vestavena skrin", "walk-in closet",
-        "satna", "open closet",
-        "kuchynsky ostrov", "kitchen island",
-        "barove zidle",
-        "mikrocement", "terazzo",
-        "akusticke panely",
-        "lamely", "slat wall", "wood slats",
-        "accent wall", "green wall",
-        "moodboard",
-        
-        # ===== OUTDOOR =====
-        "pergola", "lamelova pergola",
-        "outdoor living", "outdoor seating",
-        "baldachyn",
-        
-        # ===== DĚTSKÝ POKOJ =====
-        "detsky pokoj", "kids room",
-        "playroom",
-        
-        # ===== NÁBYTEK =====
-        "sedaci souprava", "sofa",
-        "vestaveny nabytek",
-        "ulozny system", "storage system",
-        
-        # ===== SPECIFICKÉ MÍSTNOSTI =====
-        "home office", "study nook",
-        "living working",
-        "minimal bedroom", "cozy bedroom",
-        "modern hallway", "entry design",
-        
-        # ===== MATERIÁLY =====
-        "parkety", "vinyl flooring",
-        "marble", "mramor",
-        "obklad", "sterka"
-    ]
-    matched_dum = [k for k in dum_design_triggers if matches_keyword(k, norm_text, tokens)]
-    if matched_dum:
-        if debug:
-            print(f"✅ PRAVIDLO 4 AKTIVOVÁNO: Dum_Design")
-            print(f"   Matched keywords: {matched_dum}")
-        return "Dum_Design", matched_dum
-
-    # PRAVIDLO 5: Deti_Aktivity - vyžaduje 2+ triggery NEBO 1 velmi specifický
-    deti_aktivity_very_specific = [
-        "montessori", "waldorf",
-        "sensory bin", "sensory play",
-        "busy book", "quiet book",
-        "slime", "kinetic sand",
-        "play dough", "plastelina",
-        "pracovni list", "worksheet",
-        "omalovanky", "coloring pages",
-        "printable", "sablona",
-        "phonics", "alphabet learning", "abeceda",
-        "counting activity", "pocitani",
-        "toddler activity", "preschool activity",
-        "kids craft", "crafts for kids",
-        "detske tvoreni"
-    ]
-    
-    deti_aktivity_kombinacni = [
-        "craft", "crafting", "tvoreni",
-        "vyrabeni", "making", "diy",
-        "malovani", "painting",
-        "drawing", "kresba",
-        "lepeni", "gluing",
-        "strihani", "cutting",
-        "pastelky", "crayons", "fixy", "markers",
-        "origami",
-        "kreativita", "creative",
-        "aktivita", "activity",
-        "trideni", "sorting",
-        "experiment"
-    ]
-    
-    deti_aktivity_kontextove = [
-        "deti", "kids", "children",
-        "detsky", "toddler", "preschool"
-    ]
-    
+            return k_norm in self.norm_text
+        return k_norm in self.tokens
+
+
+def evaluate_context_rule(rule, grams, fuzzy=None):
+    """
+    Vyhodnotí jedno (předkompilované) kontextové pravidlo.
+    grams je množina tokenů a n-gramů textu (viz build_ngrams).
+    fuzzy je volitelná množina tokenů/n-gramů, které vznikly až opravou OCR
+    překlepů - mají nižší váhu: velmi specifický trigger se počítá jen jako kombinační.
+    Vrací (druh_shody, matched_terms) pokud pravidlo zabralo, jinak None.
+    """
     # Kontrola velmi specifických (stačí 1)
-    matched_very_specific = [k for k in deti_aktivity_very_specific if matches_keyword(k, norm_text, tokens)]
-    if matched_very_specific:
-        if debug:
-            print(f"✅ PRAVIDLO 5 AKTIVOVÁNO: Deti_Aktivity (velmi specifické)")
-            print(f"   Matched keywords: {matched_very_specific}")
-        return "Deti_Aktivity", matched_very_specific
-    
+    matched_specific = [k for k, k_norm in rule["very_specific"] if k_norm in grams]
+    if matched_specific:
+        return "velmi specifické", matched_specific
+
     # Kontrola kombinací
-    matched_kombinacni = [k for k in deti_aktivity_kombinacni if matches_keyword(k, norm_text, tokens)]
-    matched_kontextove = [k for k in deti_aktivity_kontextove if matches_keyword(k, norm_text, tokens)]
-    
+    matched_kombinacni = [k for k, k_norm in rule["kombinacni"] if k_norm in grams]
+    matched_kontextove = [k for k, k_norm in rule["kontextove"] if k_norm in grams]
+    if fuzzy:
+        matched_kombinacni += [k + FUZZY_MARK for key in ("very_specific", "kombinacni")
+                               for k, k_norm in rule[key] if k_norm in fuzzy]
+        matched_kontextove += [k + FUZZY_MARK for k, k_norm in rule["kontextove"] if k_norm in fuzzy]
+
     # 2+ kombinační NEBO 1 kombinační + 1 kontextové
     if len(matched_kombinacni) >= 2 or (len(matched_kombinacni) >= 1 and len(matched_kontextove) >= 1):
-        all_matched = matched_kombinacni + matched_kontextove
-        if debug:
-            print(f"✅ PRAVIDLO 5 AKTIVOVÁNO: Deti_Aktivity (kombinace)")
-            print(f"   Matched keywords: {all_matched}")
-        return "Deti_Aktivity", all_matched
-
-    # PRAVIDLO 6: Vychova_Deti - vyžaduje 2+ triggery NEBO 1 velmi specifický
-    vychova_deti_very_specific = [
-        "gentle parenting", "respectful parenting", "attachment parenting",
-        "positive discipline", "pozitivni vychova",
-        "detsky psycholog", "child psychologist",
-        "jak vychovavat", "raising children",
-        "tantrum", "tantrums",
-        "sibling rivalry", "sourozenci zlounost",
-        "time out", "time-out",
-        "natural consequences", "prirozene dusledky",
-        "routine chart", "behavioral chart",
-        "screen time limits", "obrazovky deti",
-        "spankova hygiena deti",
-        "emocni regulace deti",
-        "citova vazba", "attachment theory",
-        "toddler discipline", "preschooler behavior",
-        "parenting tips", "parenting advice",
-        "vychovne metody"
-    ]
-    
-    vychova_deti_kombinacni = [
-        "vychova", "parenting",
-        "rodicovstvi", "parent", "parents",
-        "discipline", "disciplina",
-        "chovani", "behavior", "behaviour",
-        "hranice", "boundaries", "limits", "pravidla",
-        "respekt", "respect", "respectful",
-        "empatie", "empathy",
-        "odmena", "odmeny", "reward", "trest", "punishment",
-        "vztek", "anger", "uklidnit", "calming",
-        "rozvoj deti", "child development",
-        "emocni inteligence",
-        "socialni dovednosti",
-        "adaptace skolka", "school adaptation",
-        "sourozenec", "siblings",
-        "navyk", "habit", "rutina", "routine",
-        "temperament"
-    ]
-    
-    vychova_deti_kontextove = [
-        "deti", "kids", "children", "child",
-        "detsky", "toddler", "preschooler",
-        "rodicovstvi", "motherhood", "fatherhood"
-    ]
-    
-    # Kontrola velmi specifických (stačí 1)
-    matched_vychova_specific = [k for k in vychova_deti_very_specific if matches_keyword(k, norm_text, tokens)]
-    if matched_vychova_specific:
-        if debug:
-            print(f"✅ PRAVIDLO 6 AKTIVOVÁNO: Vychova_Deti (velmi specifické)")
-            print(f"   Matched keywords: {matched_vychova_specific}")
-        return "Vychova_Deti", matched_vychova_specific
-    
-    # Kontrola kombinací
-    matched_vychova_kombinacni = [k for k in vychova_deti_kombinacni if matches_keyword(k, norm_text, tokens)]
-    matched_vychova_kontextove = [k for k in vychova_deti_kontextove if matches_keyword(k, norm_text, tokens)]
-    
-    # 2+ kombinační NEBO 1 kombinační + 1 kontextové
-    if len(matched_vychova_kombinacni) >= 2 or (len(matched_vychova_kombinacni) >= 1 and len(matched_vychova_kontextove) >= 1):
-        all_matched_vychova = matched_vychova_kombinacni + matched_vychova_kontextove
-        if debug:
-            print(f"✅ PRAVIDLO 6 AKTIVOVÁNO: Vychova_Deti (kombinace)")
-            print(f"   Matched keywords: {all_matched_vychova}")
-        return "Vychova_Deti", all_matched_vychova
-
-    # PRAVIDLO 7: Zdraví
-    zdravi_very_specific = [
-        # ===== MEDICÍNA =====
-        "lek", "leky", "medication", "pills",
-        "lecba", "treatment", "therapy", "terapie",
-        "fyzioterapie", "physiotherapy", "rehab", "rehabilitace",
-        "doktor", "doctor", "lekar", "physician", "medical specialist",
-        "krevni testy", "blood test", "screening",
-        "prevence zraneni", "injury prevention",
-        
-        # ===== TĚHOTENSTVÍ & POROD =====
-        "porod", "po porodu", "postpartum", "after birth",
-        "tehotenstvi", "pregnancy", "pregnant", "tehotna",
-        "panevni dno", "pelvic floor",
-        
-        # ===== NEMOCI & PŘÍZNAKY =====
-        "horecka", "fever",
-        "nachlazeni", "cold", "flu",
-        "imunita", "immunity",
-        "dermatitida", "akne", "vyrazka", "ekzem", "alergie",
-        "zinkova mast", "masticka",
-        
-        # ===== ZDRAVOTNÍ LÁTKY =====
-        "probiotika", "probiotics",
-        "omega 3",
-        "mikrobiom", "gut health"
-    ]
-    
-    zdravi_kombinacni = [
-        "calisthenics", "bodyweight",
-        "hiit", "tabata",
-        "protahovani", "stretching",
-        "cviceni", "workout",
-        "rehabilitacni cviceni",
-        "vitaminy", "vitamins",
-        "supplements", "doplnky",
-        "minerals", "mineraly"
-    ]
-    
-    zdravi_kontextove = [
-        "zdravi", "health",
-        "prevence", "prevention",
-        "regenerace", "recovery"
-    ]
-    
-    # Kontrola velmi specifických (stačí 1)
-    matched_zdravi_specific = [k for k in zdravi_very_specific if matches_keyword(k, norm_text, tokens)]
-    if matched_zdravi_specific:
-        if debug:
-            print(f"✅ PRAVIDLO 7 AKTIVOVÁNO: Zdravi (velmi specifické)")
-            print(f"   Matched keywords: {matched_zdravi_specific}")
-        return "Zdravi", matched_zdravi_specific
-    
-    # Kontrola kombinací
-    matched_zdravi_kombinacni = [k for k in zdravi_kombinacni if matches_keyword(k, norm_text, tokens)]
-    matched_zdravi_kontextove = [k for k in zdravi_kontextove if matches_keyword(k, norm_text, tokens)]
-    
-    # 2+ kombinační NEBO 1 kombinační + 1 kontextové
-    if len(matched_zdravi_kombinacni) >= 2 or (len(matched_zdravi_kombinacni) >= 1 and len(matched_zdravi_kontextove) >= 1):
-        all_matched_zdravi = matched_zdravi_kombinacni + matched_zdravi_kontextove
-        if debug:
-            print(f"✅ PRAVIDLO 7 AKTIVOVÁNO: Zdravi (kombinace)")
-            print(f"   Matched keywords: {all_matched_zdravi}")
-        return "Zdravi", all_matched_zdravi
-
-    # PRAVIDLO 8: IT_Prace - vyžaduje 2+ triggery NEBO 1 velmi specifický
-    it_prace_very_specific = [
-        # ===== VELMI SPECIFICKÉ IT NÁSTROJE =====
-        "jira", "postman", "swagger", "newman", "bruno api",
-        "selenium", "playwright", "cypress", "pytest",
-        "gitlab", "github actions", "bitbucket",
-        
-        # ===== IT KOMUNITY & VZDĚLÁVÁNÍ =====
-        "czechitas", "women go tech", "women in tech",
-        "engeto", "green fox", "itnetwork",
-        "coding bootcamp", "qa academy", "tester akademie",
-        "rekvalifikace it", "it rekvalifikace", "kariera v it",
-        "skillsbuild", "digitalni certifikat",
-        "sladovani kariery s materstvi",
-        "career in it", "work in it", "it industry", "it field",
-        "tech career", "tech industry",
-        
-        # ===== KYBERBEZPEČNOST =====
-        "kyberbezpecnost", "cyberbezpecnost", "kyberneticka bezpecnost",
-        "cybersecurity", "cybersecurity courses",
-        "hands on cybersecurity",
-        "penetration test", "pentest",
-        "phishing", "malware", "ransomware",
-        "ethical hacking", "cyber attack",
-        "owasp", "vulnerability scan",
-        "threat detection", "incident response",
-        "soc analyst",
-        
-        # ===== AI & AUTOMATION =====
-        "prompt engineering", "chatgpt", "claude ai", "copilot",
-        "machine learning", "deep learning", "neural network",
-        "data science", "data analyst",
-        "robotic process automation",
-        "ai tools", "ai apps", "generative ai",
-        "artificial intelligence",
-        
-        # ===== QA SPECIFIKA =====
-        "test case", "test plan", "test scenario",
-        "bug report", "bug tracking",
-        "regression test", "smoke test", "sanity test",
-        "test automation", "api testing",
-        "manual testing", "exploratory testing",
-        "qa engineer", "qa process", "qa tools"
-    ]
-    
-    it_prace_kombinacni = [
-        "junior developer", "junior tester", "junior coder",
-        "career switch", "career change",
-        "devops", "frontend", "backend", "fullstack",
-        "scrum", "agile",
-        "pipeline", "deployment",
-        "unit test", "integration test",
-        "endpoint", "rest api", "soap",
-        "pull request", "merge request",
-        "code review", "debugging",
-        "test environment", "staging", "production"
-    ]
-    
-    it_prace_kontextove = [
-        "developer", "tester", "coder",
-        "programming", "programovani", "coding",
-        "software", "automation", "testing"
-    ]
-    
-    # Kontrola velmi specifických (stačí 1)
-    matched_it_specific = [k for k in it_prace_very_specific if matches_keyword(k, norm_text, tokens)]
-    if matched_it_specific:
-        if debug:
-            print(f"✅ PRAVIDLO 8 AKTIVOVÁNO: IT_Prace (velmi specifické)")
-            print(f"   Matched keywords: {matched_it_specific}")
-        return "IT_Prace", matched_it_specific
-    
-    # Kontrola kombinací
-    matched_it_kombinacni = [k for k in it_prace_kombinacni if matches_keyword(k, norm_text, tokens)]
-    matched_it_kontextove = [k for k in it_prace_kontextove if matches_keyword(k, norm_text, tokens)]
-    
-    # 2+ kombinační NEBO 1 kombinační + 1 kontextové
-    if len(matched_it_kombinacni) >= 2 or (len(matched_it_kombinacni) >= 1 and len(matched_it_kontextove) >= 1):
-        all_matched_it = matched_it_kombinacni + matched_it_kontextove
-        if debug:
-            print(f"✅ PRAVIDLO 8 AKTIVOVÁNO: IT_Prace (kombinace)")
-            print(f"   Matched keywords: {all_matched_it}")
-        return "IT_Prace", all_matched_it
-
-    # PRAVIDLO 9: Finance - pouze nejjasnější finanční termíny
-    finance_triggers = [
-        # ===== ÚČETNICTVÍ & DANĚ =====
-        "faktura", "invoice",
-        "danove priznani", "tax return",
-        "vypis z uctu", "bank statement",
-        "uctenka", "receipt",
-        
-        # ===== INVESTICE =====
-        "etf", "dividenda", "dividend",
-        "portfolio", "net worth",
-        "akcie", "stocks",
-        
-        # ===== FINANČNÍ PRODUKTY =====
-        "hypoteka", "mortgage",
-        "penzijko", "penzijni sporeni",
-        "stavebko",
-        
-        # ===== FINANČNÍ PLÁNOVÁNÍ =====
-        "nouzovy fond", "emergency fund",
-        "fire movement",
-        "apr", "rpsn",
-        "inflace", "inflation"
-    ]
-    
-    matched_finance = [k for k in finance_triggers if matches_keyword(k, norm_text, tokens)]
-    if matched_finance:
-        if debug:
-            print(f"✅ PRAVIDLO 9 AKTIVOVÁNO: Finance")
-            print(f"   Matched keywords: {matched_finance}")
-        return "Finance", matched_finance
-
-    # PRAVIDLO 10: Traveling - vyžaduje 2+ triggery NEBO 1 velmi specifický
-    traveling_very_specific = [
-        # ===== CESTOVATELSKÉ FRÁZE =====
-        "kam jet", "kde jet", "where to go", "travel to",
-        "must visit", "must see", "top places",
-        "bucket list",
-        "travel itinerary", "itinerar", "itinerary",
-        "roadtrip", "road trip",
-        
-        # ===== CESTOVATELSKÉ SLUŽBY =====
-        "home exchange", "vymena domu", "house swap",
-        "airbnb", "booking com",
-        "car rental", "pujcovna auta",
-        "travel insurance", "cestovni pojisteni",
-        "attractions", "tours",
-        
-        # ===== DOKUMENTY & LETIŠTĚ =====
-        "visa", "esta visa", "esta application", "passport",
-        "letiste", "airport",
-        "flight", "letadlo",
-        "border crossing", "checklist cestovani",
-        
-        # ===== OUTDOOROVÉ CESTOVÁNÍ =====
-        "glamping", "vanlife", "campervan",
-        "national park", "hiking trail",
-        "camping trip"
-    ]
-    
-    traveling_kombinacni = [
-        "dovolena", "vacation", "holiday",
-        "vylet", "trip", "weekend trip",
-        "cestovani", "traveling", "travelling",
-        "ubytovani", "accommodation",
-        "sightseeing", "pamatka", "monument",
-        # ZEMĚ
-        "australia", "austria", "belgium",
-        "chorvatsko", "croatia",
-        "france", "francie",
-        "recko", "greece",
-        "italie", "italy",
-        "nemecko", "germany",
-        "polsko", "poland",
-        "portugalsko", "portugal",
-        "spanelsko", "spain",
-        "svycarsko", "switzerland",
-        "uk", "england", "london",
-        "usa", "canada", "mexico",
-        "thajsko", "thailand", "vietnam", "bali",
-        "egypt", "maroko", "morocco", "turecko", "turkey"
-    ]
-    
-    traveling_kontextove = [
-        "travel", "cestovani",
-        "destination", "destinace",
-        "trip", "journey"
-    ]
-    
-    # Kontrola velmi specifických (stačí 1)
-    matched_traveling_specific = [k for k in traveling_very_specific if matches_keyword(k, norm_text, tokens)]
-    if matched_traveling_specific:
-        if debug:
-            print(f"✅ PRAVIDLO 10 AKTIVOVÁNO: Traveling (velmi specifické)")
-            print(f"   Matched keywords: {matched_traveling_specific}")
-        return "Traveling", matched_traveling_specific
-    
-    # Kontrola kombinací
-    matched_traveling_kombinacni = [k for k in traveling_kombinacni if matches_keyword(k, norm_text, tokens)]
-    matched_traveling_kontextove = [k for k in traveling_kontextove if matches_keyword(k, norm_text, tokens)]
-    
-    # 2+ kombinační NEBO 1 kombinační + 1 kontextové
-    if len(matched_traveling_kombinacni) >= 2 or (len(matched_traveling_kombinacni) >= 1 and len(matched_traveling_kontextove) >= 1):
-        all_matched_traveling = matched_traveling_kombinacni + matched_traveling_kontextove
-        if debug:
-            print(f"✅ PRAVIDLO 10 AKTIVOVÁNO: Traveling (kombinace)")
-            print(f"   Matched keywords: {all_matched_traveling}")
-        return "Traveling", all_matched_traveling
-
-    # PRAVIDLO 11: Deti_Svaciny - vyžaduje 2+ triggery NEBO 1 velmi specifický
-    deti_svaciny_very_specific = [
-        # ===== SVAČINOVÁ TERMINOLOGIE =====
-        "svacina", "svaciny", "svacinek", "svaca",
-        "svacinka", "svacinky", "svacinovy", "svacinova",
-        "svacina do skolky", "svacina na cestu",
-        "zdrava svacina", "zdrava svacina",
-        
-        # ===== BENTO & LUNCHBOXY =====
-        "bento", "bento box",
-        "krabickovani", "lunchbox",
-        "svacinkovy box", "snack box",
-        
-        # ===== POUCHES & TYČINKY =====
-        "pouch", "kapsicka", "ovocny pouch",
-        "tycinka", "tycinky", "granola bar", "energy bar"
-    ]
-    
-    deti_svaciny_kombinacni = [
-        "snack", "snacks", "snacking",
-        "on the go", "do auta", "na cestu",
-        "skolka", "school", "preschool",
-        "bez cukru", "sugar free", "no sugar",
-        "bez orechu", "nut free",
-        "vhodne pro deti", "suitable for kids"
-    ]
-    
-    deti_svaciny_kontextove = [
-        "deti", "kids", "children",
-        "detsky", "detske",
-        "zdrava", "healthy"
-    ]
-    
-    # Kontrola velmi specifických (stačí 1)
-    matched_svaciny_specific = [k for k in deti_svaciny_very_specific if matches_keyword(k, norm_text, tokens)]
-    if matched_svaciny_specific:
-        if debug:
-            print(f"✅ PRAVIDLO 11 AKTIVOVÁNO: Deti_Svaciny (velmi specifické)")
-            print(f"   Matched keywords: {matched_svaciny_specific}")
-        return "Deti_Svaciny", matched_svaciny_specific
-    
-    # Kontrola kombinací
-    matched_svaciny_kombinacni = [k for k in deti_svaciny_kombinacni if matches_keyword(k, norm_text, tokens)]
-    matched_svaciny_kontextove = [k for k in deti_svaciny_kontextove if matches_keyword(k, norm_text, tokens)]
-    
-    # 2+ kombinační NEBO 1 kombinační + 1 kontextové
-    if len(matched_svaciny_kombinacni) >= 2 or (len(matched_svaciny_kombinacni) >= 1 and len(matched_svaciny_kontextove) >= 1):
-        all_matched_svaciny = matched_svaciny_kombinacni + matched_svaciny_kontextove
-        if debug:
-            print(f"✅ PRAVIDLO 11 AKTIVOVÁNO: Deti_Svaciny (kombinace)")
-            print(f"   Matched keywords: {all_matched_svaciny}")
-        return "Deti_Svaciny", all_matched_svaciny
-
-    # PRAVIDLO 12: Holidays - vyžaduje 2+ triggery NEBO 1 velmi specifický
-    holidays_very_specific = [
-        # ===== VÁNOCE =====
-        "vanoce", "christmas", "xmas", "vanocni",
-        "adventni kalendar", "advent calendar",
-        "christmas tree", "vanocni stromek",
-        "christmas market", "vanocni trhy",
-        "santa claus", "jezisek",
-        "wreath", "venec",
-        
-        # ===== VELIKONOCE =====
-        "velikonoce", "easter",
-        "kraslice", "easter egg",
-        "pomlazka", "egg hunt",
-        "malovani vajicek", "easter bunny",
-        "easter basket", "easter decoration",
-        
-        # ===== HALLOWEEN =====
-        "halloween",
-        "pumpkin carving",
-        "trick or treat",
-        
-        # ===== OSTATNÍ SVÁTKY =====
-        "silvestr", "new year's eve", "novy rok",
-        "mikulas", "cert", "andel",
-        "mother's day", "svatek matek",
-        "father's day", "svatek otcu",
-        "valentine's day", "valentyn"
-    ]
-    
-    holidays_kombinacni = [
-        "advent", "adventni",
-        "wrapping", "gift wrap", "baleni darku",
-        "holiday decor", "holiday decoration",
-        "fireworks", "ohnostroj",
-        "new year party",
-        "valentine card",
-        "pumpkin", "dyne",
-        "kostym", "mask"
-    ]
-    
-    holidays_kontextove = [
-        "holiday", "holidays", "svatek",
-        "celebration", "oslava",
-        "tradition", "tradice"
-    ]
-    
-    # Kontrola velmi specifických (stačí 1)
-    matched_holidays_specific = [k for k in holidays_very_specific if matches_keyword(k, norm_text, tokens)]
-    if matched_holidays_specific:
-        if debug:
-            print(f"✅ PRAVIDLO 12 AKTIVOVÁNO: Holidays (velmi specifické)")
-            print(f"   Matched keywords: {matched_holidays_specific}")
-        return "Holidays", matched_holidays_specific
-    
-    # Kontrola kombinací
-    matched_holidays_kombinacni = [k for k in holidays_kombinacni if matches_keyword(k, norm_text, tokens)]
-    matched_holidays_kontextove = [k for k in holidays_kontextove if matches_keyword(k, norm_text, tokens)]
-    
-    # 2+ kombinační NEBO 1 kombinační + 1 kontextové
-    if len(matched_holidays_kombinacni) >= 2 or (len(matched_holidays_kombinacni) >= 1 and len(matched_holidays_kontextove) >= 1):
-        all_matched_holidays = matched_holidays_kombinacni + matched_holidays_kontextove
-        if debug:
-            print(f"✅ PRAVIDLO 12 AKTIVOVÁNO: Holidays (kombinace)")
-            print(f"   Matched keywords: {all_matched_holidays}")
-        return "Holidays", all_matched_holidays
+        return "kombinace", matched_kombinacni + matched_kontextove
+    return None
+
+
+def categorize_text_substring_phrases(text):
+    """
+    Kategorizace s původním substring matchingem frází.
+    Slouží jen k porovnání chování (--compare_matching), profiler nezapočítává.
+    """
+    global PHRASE_MATCHING
+    if not text or text.startswith("[CHYBA"):
+        return "Neprirazeno", []
+    previous = PHRASE_MATCHING
+    PHRASE_MATCHING = "substring"
+    try:
+        norm_text, tokens = prepare_text(text)
+        return _categorize_text(norm_text, tokens, None)
+    finally:
+        PHRASE_MATCHING = previous
+
+
+def categorize_text(text, debug=False, doc_id=None, image_path=None, defer_classifier=False):
+    """
+    Vrací tuple: (kategorie (str), matched_terms (list[str]))
+    matched_terms jsou top klíčová slova, která rozhodnutí podpořila.
+    S debug nebo zapnutým tracingem (TRACER) se k rozhodnutí vyplní DecisionTrace;
+    doc_id (jméno souboru) se uloží do záznamu.
+
+    Stupně - každý další dostane jen dokumenty, které předchozí nechal v Neprirazeno:
+        1  přesná pravidla + váhový systém
+        2a oprava OCR překlepů (FUZZY_INDEX, --fuzzy)
+        2b nové OCR ve vyšší kvalitě (REOCR + image_path, --reocr)
+        3  klasifikátor (CLASSIFIER, --classifier)
+    Se zapnutým STAGES se měří počty a čas jednotlivých stupňů.
+    S defer_classifier se stupeň 3 přeskočí a nepřiřazený text zůstane v Neprirazeno -
+    volající ho pak se všemi ostatními z dávky předá classify_deferred.
+    """
+    return _categorize(text, debug, doc_id, image_path, defer_classifier=defer_classifier)[0]
+
+
+def _categorize(text, debug=False, doc_id=None, image_path=None, rank=False, defer_classifier=False):
+    """
+    Společná cesta categorize_text a rank_categories: stupeň 1 a pak stejná kaskáda
+    2a/2b/3 pro dokumenty, které zůstaly v Neprirazeno.
+    S rank je stupeň 1 seznam všech kandidátů (_rank_candidates) místo zkratky
+    u prvního pravidla a memo se nepoužije (kandidáty v něm nejsou).
+    Vrací (výsledek, ranking); ranking je s rank (kandidáti s tvary z textu,
+    stupeň, který rozhodl: None = stupeň 1, jinak "FUZZY"/"REOCR"/"KLASIFIKATOR"),
+    jinak None.
+    """
+    if not text or text.startswith("[CHYBA"):
+        return ("Neprirazeno", []), ([], None) if rank else None
+
+    prof = PROFILER
+    if prof is not None:
+        start = prof.clock()
+    stages = STAGES
+    t0 = stages.clock() if stages is not None else None
+
+    # 1) FILTROVÁNÍ UI PRVKŮ + 2) NORMALIZACE + TOKENIZACE (jeden průchod)
+    # string bez diakritiky, malé písmena (lemmata) + množina slov + tvary z textu pro hlášení
+    # jedna sada pravidel pro celý dokument (activate_ruleset ji může mezitím vyměnit)
+    rs = get_ruleset()
+    norm_text, tokens, surface = prepare_text_surface(text, rs)
+    trace = DecisionTrace(doc_id, norm_text[:200]) if (debug or TRACER is not None) else None
+
+    # Memo podle otisku vyčištěného textu (v debug režimu chceme vidět celé vyhodnocení)
+    memo = MEMO if not (debug or rank) else None
+    if memo is not None:
+        key, cached = memo.get(norm_text)
+        if cached is not None:
+            if prof is not None:
+                prof.record_decision("MEMO", prof.clock() - start)
+            _stage_done(stages, "0 memo", t0, cached)
+            cached = cached[0], surface_terms(list(cached[1]), surface, tokens, rs)
+            if trace is not None:
+                trace.stage = trace.decider = "MEMO"
+                _finish_trace(trace, cached, debug)
+            return cached, None
+
+    # STUPEŇ 1: přesná pravidla a váhový systém
+    candidates = None
+    if rank:
+        candidates = _rank_candidates(norm_text, tokens, rs)
+        result, decider = _single_from_ranking(candidates)
+        if trace is not None:
+            trace.stage = "pravidla" if candidates and candidates[0].rule is not None else "vahy"
+            trace.decider = decider
+            trace.scores = {c.category: c.score for c in candidates}
+    else:
+        result, decider = _rules_stage(norm_text, tokens, prof, None, trace, rs.compiled)
+    t0 = _stage_done(stages, "1 přesná pravidla", t0, result)
+    decided_by = None
+
+    # STUPEŇ 2a: druhý pokus s opravou OCR překlepů
+    if FUZZY_INDEX is not None and result[0] == "Neprirazeno":
+        result, decider, trace = _fuzzy_stage(norm_text, tokens, prof, result, decider, trace, rs.compiled)
+        t0 = _stage_done(stages, "2a fuzzy", t0, result)
+        decided_by = "FUZZY" if result[0] != "Neprirazeno" else None
+
+    # STUPEŇ 2b: nové OCR ve vyšší kvalitě (drahé - jen pro nepřiřazené a nerozhodnuté)
+    reocr_surface = None
+    if REOCR and image_path and result[0] == "Neprirazeno":
+        result, decider, trace, reocr_surface = _reocr_stage(image_path, prof, result, decider, trace, rs)
+        t0 = _stage_done(stages, "2b re-OCR", t0, result)
+        decided_by = "REOCR" if result[0] != "Neprirazeno" else None
+
+    # STUPEŇ 3: klasifikátor naučený na jistých rozhodnutích pravidel
+    # (s defer_classifier až po dávkách v classify_deferred; memo se do té doby neplní)
+    deferred = defer_classifier and CLASSIFIER is not None and result[0] == "Neprirazeno"
+    if CLASSIFIER is not None and result[0] == "Neprirazeno" and not deferred:
+        predicted = classify_unassigned([norm_text])[0]
+        if predicted is not None:
+            result = predicted
+            decided_by = "KLASIFIKATOR"
+            if prof is not None:
+                decider = "KLASIFIKATOR"
+            if trace is not None:
+                trace.stage = trace.decider = "KLASIFIKATOR"
+        t0 = _stage_done(stages, "3 klasifikátor", t0, result)
+
+    if prof is not None:
+        prof.record_decision(decider, prof.clock() - start)
+
+    # memo drží klíčová slova z pravidel (stejná lemmata = stejný výsledek), tvary z textu až tady
+    if memo is not None and not deferred:
+        memo.put(key, result)
+    result = result[0], surface_terms(result[1], *(reocr_surface or (surface, tokens)), ruleset=rs)
+
+    if trace is not None:
+        _finish_trace(trace, result, debug)
+    if not rank:
+        return result, None
+    ranking = [c._replace(matched=surface_terms(c.matched, surface, tokens, rs)) for c in candidates]
+    return result, (ranking, decided_by)
+
+
+def _rules_stage(norm_text, tokens, prof, fuzzy, trace, compiled=None):
+    """_categorize_text s jednotným výstupem (výsledek, kdo_rozhodl); kdo_rozhodl jen s profilerem."""
+    if prof is None:
+        return _categorize_text(norm_text, tokens, None, fuzzy, trace, compiled), None
+    return _categorize_text(norm_text, tokens, prof, fuzzy, trace, compiled)
+
+
+def _fuzzy_stage(norm_text, tokens, prof, result, decider, trace, compiled=None):
+    """Stupeň 2a: pravidla znovu s tokeny opravenými přes FUZZY_INDEX."""
+    fuzzy = fuzzy_grams(norm_text, tokens, compiled)
+    if not fuzzy:
+        return result, decider, trace
+    fuzzy_trace = DecisionTrace(trace.doc, trace.text) if trace is not None else None
+    fuzzy_result, fuzzy_decider = _rules_stage(norm_text, tokens, prof, fuzzy, fuzzy_trace, compiled)
+    if fuzzy_result[0] != "Neprirazeno":
+        result = fuzzy_result
+        if prof is not None:
+            decider = "FUZZY " + fuzzy_decider
+        if trace is not None:
+            trace = fuzzy_trace
+            trace.stage, trace.decider = "fuzzy", "FUZZY " + trace.decider
+    if trace is not None:
+        trace.fuzzy = sorted(fuzzy)[:20]
+    return result, decider, trace
+
+
+def _reocr_stage(image_path, prof, result, decider, trace, ruleset=None):
+    """
+    Stupeň 2b: OCR ve vyšší kvalitě a znovu pravidla (případně i s fuzzy).
+    Vrací (výsledek, kdo_rozhodl, trace, (tvary, tokeny) nového textu nebo None).
+    """
+    text = extract_text_from_image(image_path, high_quality=True)
+    if not text or text.startswith("[CHYBA"):
+        return result, decider, trace, None
+    rs = ruleset or get_ruleset()
+    norm_text, tokens, surface = prepare_text_surface(text, rs)
+    better_trace = DecisionTrace(trace.doc, norm_text[:200]) if trace is not None else None
+    better, better_decider = _rules_stage(norm_text, tokens, prof, None, better_trace, rs.compiled)
+    if better[0] == "Neprirazeno" and FUZZY_INDEX is not None:
+        better, better_decider, better_trace = _fuzzy_stage(norm_text, tokens, prof, better,
+                                                            better_decider, better_trace, rs.compiled)
+    if better[0] == "Neprirazeno":
+        return result, decider, trace, None
+    if prof is not None:
+        decider = "REOCR " + better_decider
+    if trace is not None:
+        trace = better_trace
+        trace.stage, trace.decider = "re-ocr", "REOCR " + trace.decider
+    return better, decider, trace, (surface, tokens)
+
+
+def _stage_done(stages, stage, t0, result):
+    """Zaznamená průchod stupněm do STAGES; vrací čas pro začátek dalšího stupně."""
+    if stages is None:
+        return None
+    now = stages.clock()
+    stages.record(stage, now - t0, result[0] != "Neprirazeno")
+    return now
+
+
+def _finish_trace(trace, result, debug):
+    """Doplní výsledek do záznamu, v debug režimu ho vypíše a předá TRACER."""
+    trace.category, trace.matched = result[0], list(result[1])
+    if debug:
+        print(trace.format())
+    if TRACER is not None:
+        TRACER.record(trace)
+
+
+# ===== NEGATIVE HINTS (penalizace chybných kategorií) =====
+NEGATIVE_HINTS = {
+    "IT_Prace": [r"\bzahrad", r"\brostlin", r"\bflower\b", r"\bgarden\b"],
+    "Dum_Design": [r"\bcommit\b", r"\brepo\b", r"\bendpoint\b", r"\bhttp\b"]
+}
+_NEGATIVE_HINTS_RE = {cat: [re.compile(p) for p in patterns] for cat, patterns in NEGATIVE_HINTS.items()}
+
+# Váhový systém: minimální skóre a minimální náskok před druhou kategorií
+MIN_CATEGORY_SCORE = 3
+MIN_SCORE_MARGIN = 2
+
+
+def score_categories(norm_text, tokens, compiled=None, prof=None, trace=None, fuzzy=None):
+    """
+    Váhové bodování všech kategorií z CATEGORIES včetně NEGATIVE_HINTS.
+    fuzzy = tokeny nalezené až opravou OCR překlepů, počítají se s váhou × FUZZY_WEIGHT.
+    Vrací (scores, matches_for_category) - matches jsou top 5 tokenů podle váhy.
+    Do trace se zapíšou skutečně odečtené body z NEGATIVE_HINTS.
+    """
+    compiled = compiled or get_compiled()
+
+    # Kontext-aware (hračky) - pro případné výjimky v scoringu
+    has_toy_context = any(k in tokens for k in compiled["toy_keywords"])
+
+    # ===== VÁŽOVANÉ BODOVÁNÍ (scoring) =====
+    scores = {}
+    matches_for_category = {}
+
+    for category, entries in compiled["categories"]:
+        if prof is not None:
+            t0 = prof.clock()
+        weighted_score = 0
+        matched = []
+        for k_norm, weight, toy_exception in entries:
+            if k_norm in tokens:
+                # výjimka pro hračky u oblečení (pokud je to hračka, ignoruj velikosti)
+                if toy_exception and has_toy_context:
+                    continue
+                weighted_score += weight
+                matched.append((k_norm, weight))
+            elif fuzzy and k_norm in fuzzy:
+                if toy_exception and has_toy_context:
+                    continue
+                weighted_score += weight * FUZZY_WEIGHT
+                matched.append((k_norm + FUZZY_MARK, weight * FUZZY_WEIGHT))
+        scores[category] = weighted_score
+        # uložíme top matched tokeny (max 5)
+        matches_for_category[category] = [m[0] for m in sorted(matched, key=lambda x: x[1], reverse=True)[:5]]
+        if prof is not None:
+            prof.record_fallback(category, prof.clock() - t0, weighted_score)
+
+    for cat, patterns in _NEGATIVE_HINTS_RE.items():
+        if cat in scores:
+            penalty = 0
+            for p in patterns:
+                if p.search(norm_text):
+                    penalty += 2
+            if penalty:
+                before = scores[cat]
+                scores[cat] = max(0, before - penalty)
+                if trace is not None and before != scores[cat]:
+                    trace.penalties[cat] = before - scores[cat]
+
+    return scores, matches_for_category
+
+
+def _categorize_text(norm_text, tokens, prof, fuzzy=None, trace=None, compiled=None):
+    """
+    Vlastní kategorizace už vyčištěného textu. Bez profileru vrací
+    (kategorie, matched_terms), s profilerem ((kategorie, matched_terms), kdo_rozhodl).
+    fuzzy = tokeny/n-gramy z opravy OCR překlepů (viz fuzzy_grams).
+    trace = DecisionTrace k vyplnění (pravidlo, skóre, NEGATIVE_HINTS), nebo None.
+    compiled = pravidla, podle kterých se rozhoduje (None = aktivní).
+    """
+    def decided(result, decider):
+        return result if prof is None else (result, decider)
+
+    compiled = compiled or get_compiled()
+
+    # ===== KONTEXTOVÁ PRAVIDLA =====
+    # Jednou postavíme množinu tokenů + n-gramů, každý trigger je pak hash lookup
+    if PHRASE_MATCHING == "substring":
+        grams = _SubstringPhrases(norm_text, tokens)
+    else:
+        grams = build_ngrams(norm_text, tokens, compiled)
+
+    for rule in compiled["rules"]:
+        if prof is None:
+            hit = evaluate_context_rule(rule, grams, fuzzy)
+        else:
+            t0 = prof.clock()
+            hit = evaluate_context_rule(rule, grams, fuzzy)
+            prof.record_rule(rule["name"], prof.clock() - t0, hit is not None)
+
+        if hit:
+            kind, matched = hit
+            if trace is not None:
+                trace.stage, trace.decider = "pravidla", rule["name"]
+                trace.rule, trace.tier = rule["name"], kind
+            return decided((rule["category"], matched), rule["name"])
+
+    # ===== KONEC KONTEXTOVÝCH PRAVIDEL → VÁHOVÝ SYSTÉM =====
+    scores, matches_for_category = score_categories(norm_text, tokens, compiled, prof, trace, fuzzy)
+    top_cat, top_score, second_score, decider = _decide_by_scores(scores)
+
+    if trace is not None:
+        trace.stage, trace.decider = "vahy", decider
+        trace.scores = {cat: score for cat, score in scores.items() if score}
+        if top_cat is not None:
+            trace.top, trace.second = [top_cat, top_score], second_score
+        if trace.penalties:
+            # rozhodly by váhy bez penalizací jinak?
+            raw = {cat: score + trace.penalties.get(cat, 0) for cat, score in scores.items()}
+            trace.hint_changed = _decide_by_scores(raw)[3] != decider
+
+    if top_cat is None or decider.startswith("NEPRIRAZENO"):
+        return decided(("Neprirazeno", []), decider)
+
+    # vrátíme kategorii a top matched terms
+    return decided((top_cat, matches_for_category.get(top_cat, [])), decider)
+
+
+def _decide_by_scores(scores):
+    """
+    Minimální práh a řešení remízy váhového systému.
+    Vrací (top_kategorie, top_skóre, druhé_skóre, kdo_rozhodl).
+    """
+    if not scores:
+        return None, 0, 0, "NEPRIRAZENO: prah"
+    # zjisti top dvě skóre pro rozhodnutí o remíze
+    sorted_scores = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+    top_cat, top_score = sorted_scores[0]
+    second_score = sorted_scores[1][1] if len(sorted_scores) > 1 else 0
+
+    if top_score < MIN_CATEGORY_SCORE:  # minimální důvěra -> Neprirazeno
+        return top_cat, top_score, second_score, "NEPRIRAZENO: prah"
+    # pokud je rozdil maly -> neurčeno
+    if (top_score - second_score) < MIN_SCORE_MARGIN:
+        return top_cat, top_score, second_score, "NEPRIRAZENO: remiza"
+    return top_cat, top_score, second_score, f"VAHY: {top_cat}"
+
+
+# Jedna položka multi-label výsledku. rule = název kontextového pravidla,
+# které kategorii aktivovalo, nebo None (jen váhový systém).
+CategoryScore = namedtuple("CategoryScore", ["category", "score", "matched", "rule"])
+
+
+def rank_categories(text, top_k=3, margin=None, debug=False, doc_id=None, image_path=None,
+                    defer_classifier=False):
+    """
+    Multi-label režim: v jednom průchodu vyhodnotí VŠECHNA kontextová pravidla
+    i váhové skóre všech kategorií (bez zkratky u prvního pravidla).
+    Nepřiřazené dokumenty pak projdou stejnými stupni jako v categorize_text.
+
+    Vrací (single, ranked):
+        single - (kategorie, matched_terms), stejné rozhodnutí jako categorize_text
+                 (včetně fuzzy, re-OCR a klasifikátoru, pokud jsou zapnuté)
+        ranked - nejvýš top_k položek CategoryScore; nejdřív rozhodnutá kategorie,
+                 pak ostatní kandidáti podle skóre. S margin se vynechají kandidáti
+                 se skóre nižším než (nejlepší skóre - margin). Rozhodl-li pozdější
+                 stupeň, má první položka v rule jeho název ("FUZZY", "REOCR", "KLASIFIKATOR").
+    defer_classifier jako u categorize_text.
+
+    Skóre kategorie = váhové skóre (po NEGATIVE_HINTS) + váhy triggerů pravidla,
+    pokud pravidlo zabralo.
+    """
+    single, (candidates, decided_by) = _categorize(text, debug, doc_id, image_path, rank=True,
+                                                   defer_classifier=defer_classifier)
+    if not candidates and decided_by is None:
+        return single, []
+
+    # výstupní seznam: rozhodnutá kategorie první, dál jen dostatečně silní kandidáti
+    ranked = [c for c in candidates if c.category == single[0]][:1]
+    if decided_by is not None:
+        score = ranked[0].score if ranked else 0
+        ranked = [CategoryScore(single[0], score, single[1], decided_by)]
+    others = sorted((c for c in candidates if c.category != single[0] and
+                     (c.rule is not None or c.score >= MIN_CATEGORY_SCORE)),
+                    key=lambda c: c.score, reverse=True)
+    ranked.extend(others)
+    if margin is not None and ranked:
+        best = max(c.score for c in ranked)
+        ranked = [c for c in ranked if c.score >= best - margin or c.category == single[0]]
+    if top_k:
+        ranked = ranked[:top_k]
+    return single, ranked
+
+
+def _rank_candidates(norm_text, tokens, ruleset=None):
+    """
+    Stupeň 1 multi-label režimu: všechna kontextová pravidla (první zásah za kategorii,
+    v pořadí priority), pak ostatní kategorie váhového systému podle skóre.
+    Vrací seznam CategoryScore s klíčovými slovy z pravidel (lemmata).
+    """
+    rs = ruleset or get_ruleset()
+    compiled = rs.compiled
+    if PHRASE_MATCHING == "substring":
+        grams = _SubstringPhrases(norm_text, tokens)
+    else:
+        grams = build_ngrams(norm_text, tokens, compiled)
+
+    scores, matches_for_category = score_categories(norm_text, tokens, compiled)
+
+    # kontextová pravidla - všechna, v pořadí priority
+    candidates = []
+    fired = set()
+    for rule in compiled["rules"]:
+        hit = evaluate_context_rule(rule, grams)
+        if hit and rule["category"] not in fired:
+            _, matched = hit
+            fired.add(rule["category"])
+            rule_score = sum(rs.word_weights.get(k, 3) for k in matched)
+            candidates.append(CategoryScore(rule["category"], scores.get(rule["category"], 0) + rule_score,
+                                            matched, rule["name"]))
+
+    # váhový systém - zbylé kategorie podle skóre (stabilně v pořadí CATEGORIES)
+    fallback = sorted(((cat, score) for cat, score in scores.items() if score > 0 and cat not in fired),
+                      key=lambda kv: kv[1], reverse=True)
+    candidates.extend(CategoryScore(cat, score, matches_for_category[cat], None) for cat, score in fallback)
+    return candidates
+
+
+def _single_from_ranking(candidates):
+    """
+    Jednoznačná kategorie ze seznamu kandidátů (pravidla v pořadí priority,
+    pak váhový systém podle skóre) - stejná logika jako _categorize_text.
+    Vrací ((kategorie, matched_terms), kdo_rozhodl).
+    """
+    if not candidates:
+        return ("Neprirazeno", []), "NEPRIRAZENO: prah"
+    first = candidates[0]
+    if first.rule is not None:
+        return (first.category, first.matched), first.rule
+
+    if first.score < MIN_CATEGORY_SCORE:
+        return ("Neprirazeno", []), "NEPRIRAZENO: prah"
+    second_score = candidates[1].score if len(candidates) > 1 else 0
+    if (first.score - second_score) < MIN_SCORE_MARGIN:
+        return ("Neprirazeno", []), "NEPRIRAZENO: remiza"
+    return (first.category, first.matched), f"VAHY: {first.category}"
+
+
+def benchmark_fuzzy(texts, repeat=3, max_distance=1):
+    """
+    Změří cenu fuzzy matchingu na dokument: categorize_text bez fuzzy a s fuzzy
+    (memo a profiler se po dobu měření vypnou). Vrací dict s µs/dokument,
+    časem stavby indexu a počtem dokumentů, které fuzzy vytáhl z Neprirazeno.
+    """
+    global FUZZY_INDEX, MEMO, PROFILER
+    saved = (FUZZY_INDEX, MEMO, PROFILER)
+    MEMO = PROFILER = None
+    texts = [t for t in texts if t]
+    result = {"documents": len(texts)}
+    try:
+        start = time.perf_counter()
+        index = enable_fuzzy(max_distance=max_distance)
+        result["index_build_ms"] = (time.perf_counter() - start) * 1000
+        result["index_entries"] = len(index.index)
+
+        outcomes = {}
+        for name, fuzzy_index in (("exact", None), ("fuzzy", index)):
+            FUZZY_INDEX = fuzzy_index
+            best = None
+            for _ in range(repeat):
+                index._cache.clear()
+                start = time.perf_counter()
+                outcomes[name] = [categorize_text(t)[0] for t in texts]
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            result[name] = best / len(texts) * 1e6 if texts else 0.0
+        result["rescued"] = sum(1 for a, b in zip(outcomes["exact"], outcomes["fuzzy"])
+                                if a == "Neprirazeno" and b != "Neprirazeno")
+    finally:
+        FUZZY_INDEX, MEMO, PROFILER = saved
+    return result
+
+
+# Trénovací data klasifikátoru: jen texty, které pravidla zařadila s jistotou
+# (kontextové pravidlo, nebo váhový systém s dvojnásobným náskokem).
+CLASSIFIER_MIN_MARGIN = 2 * MIN_SCORE_MARGIN
+
+
+def confident_label(text):
+    """Kategorie, kterou pravidla (jen stupeň 1) dala textu s jistotou, jinak None."""
+    if not text or text.startswith("[CHYBA"):
+        return None
+    rs = get_ruleset()
+    candidates = _rank_candidates(*prepare_text(text, rs), rs)
+    (category, _), _ = _single_from_ranking(candidates)
+    if category == "Neprirazeno":
+        return None
+    top = candidates[0]
+    if top.rule is not None:
+        return category
+    runner_up = max((c.score for c in candidates[1:] if c.score >= MIN_CATEGORY_SCORE), default=0)
+    return category if top.score - runner_up >= CLASSIFIER_MIN_MARGIN else None
+
+
+def train_classifier(texts, path, holdout=0.2, seed=0, threshold=0.6):
+    """
+    Natrénuje klasifikátor na textech (typicky z OCR cache) a uloží ho do path.
+
+    Štítky dávají pravidla (confident_label); část holdout se nechá stranou
+    na změření přesnosti. Vrací dict s počty, přesností, pokrytím Neprirazeno
+    a časem dávkové inference na dokument.
+    """
+    labeled, unassigned = [], []
+    for text in texts:
+        if not text or text.startswith("[CHYBA"):
+            continue
+        norm_words = prepare_text(text)[0].split()
+        label = confident_label(text)
+        if label is not None:
+            labeled.append((norm_words, label))
+        elif categorize_text_uncached(text)[0] == "Neprirazeno":
+            unassigned.append(norm_words)
+
+    report = {"labeled": len(labeled), "unassigned": len(unassigned)}
+    if not labeled:
+        return report
+
+    random.Random(seed).shuffle(labeled)
+    n_test = int(len(labeled) * holdout) if len(labeled) >= 20 else 0
+    test, train = labeled[:n_test], labeled[n_test:]
+
+    model = HashedLinearClassifier(list(get_ruleset().categories))
+    start = time.perf_counter()
+    report["loss"] = model.fit([words for words, _ in train], [label for _, label in train], seed=seed)
+    report["train_s"] = time.perf_counter() - start
+
+    if test:
+        predicted = model.predict([words for words, _ in test])
+        report["accuracy"] = sum(p[0] == label for p, (_, label) in zip(predicted, test)) / len(test)
+        confident = [(p, label) for p, (_, label) in zip(predicted, test) if p[1] >= threshold]
+        report["precision_at_threshold"] = (sum(p[0] == label for p, label in confident) / len(confident)
+                                            if confident else 0.0)
+
+    # finální model ze všech označených textů
+    if test:
+        model = HashedLinearClassifier(list(get_ruleset().categories))
+        model.fit([words for words, _ in labeled], [label for _, label in labeled], seed=seed)
+    model.fingerprint = ruleset_fingerprint(include_classifier=False)
+    model.save(path)
+
+    if unassigned:
+        start = time.perf_counter()
+        predicted = model.predict(unassigned, threshold)
+        report["inference_us"] = (time.perf_counter() - start) / len(unassigned) * 1e6
+        report["rescued"] = sum(1 for label, _ in predicted if label is not None)
+    return report
+
+
+def categorize_text_uncached(text):
+    """categorize_text bez memo, profileru a klasifikátoru (pro offline nástroje)."""
+    global MEMO, PROFILER, CLASSIFIER
+    saved = (MEMO, PROFILER, CLASSIFIER)
+    MEMO = PROFILER = CLASSIFIER = None
+    try:
+        return categorize_text(text)
+    finally:
+        MEMO, PROFILER, CLASSIFIER = saved
+
+
+# ========================================================================
+# POROVNÁNÍ DVOU SAD PRAVIDEL (--diff_rules)
+# ========================================================================
+def current_ruleset():
+    """Aktuálně aktivní sada pravidel (pro pozdější activate_ruleset)."""
+    return get_ruleset()
+
+
+def load_ruleset(path):
+    """
+    Načte sadu pravidel z .py souboru ve formátu categories_v1.py (CATEGORIES,
+    WORD_WEIGHTS, SOCIAL_MEDIA_UI_KEYWORDS, volitelně CONTEXT_RULES - jinak se
+    vezmou z aktivní sady) a zkompiluje ji s aktivními lemmaty. Aktivní pravidla nemění.
+    """
+    name = "ruleset_" + hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:12]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    current = get_ruleset()
+    return make_ruleset(module.CATEGORIES, module.WORD_WEIGHTS, module.SOCIAL_MEDIA_UI_KEYWORDS,
+                        getattr(module, "CONTEXT_RULES", current.context_rules),
+                        current.lemmas, current.lemmas_digest)
+
+
+# Sady pravidel načtené ve worker procesu (cesta → ruleset; None = pravidla organizeru)
+_WORKER_RULESETS = {}
+
+
+def _diff_rules_worker(task):
+    """Worker pro diff_rules: kategorie pro dávku textů podle jedné sady pravidel."""
+    path, texts = task
+    if None not in _WORKER_RULESETS:
+        _WORKER_RULESETS[None] = current_ruleset()
+    ruleset = _WORKER_RULESETS.get(path)
+    if ruleset is None:
+        ruleset = _WORKER_RULESETS[path] = load_ruleset(path)
+    activate_ruleset(ruleset)
+    return [categorize_text_uncached(text)[0] for text in texts]
+
+
+def diff_rules(old_path, texts, names, new_path=None, workers=None, chunk_size=2000, samples=3):
+    """
+    Kategorizuje korpus (typicky OCR cache) starou a novou sadou pravidel
+    paralelně přes jádra a vrátí, které dokumenty změnily kategorii.
+
+    old_path/new_path - .py soubory s pravidly; new_path=None = aktuální categories_v1
+    names             - jména souborů ke textům (pro ukázky v reportu)
+    Identické texty se vyhodnotí jen jednou.
+    """
+    start = time.perf_counter()
+    unique = {}
+    for index, text in enumerate(texts):
+        unique.setdefault(text, []).append(index)
+    unique_texts = list(unique)
+
+    chunks = [unique_texts[i:i + chunk_size] for i in range(0, len(unique_texts), chunk_size)]
+    tasks = [(old_path, chunk) for chunk in chunks] + [(new_path, chunk) for chunk in chunks]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(min(workers, len(tasks))) as pool:
+            results = pool.map(_diff_rules_worker, tasks, chunksize=1)
+    else:
+        saved = current_ruleset()
+        try:
+            results = [_diff_rules_worker(task) for task in tasks]
+        finally:
+            activate_ruleset(saved)
+
+    old_labels = [label for chunk in results[:len(chunks)] for label in chunk]
+    new_labels = [label for chunk in results[len(chunks):] for label in chunk]
+
+    transitions = {}
+    examples = {}
+    unchanged = {}
+    for text, old, new in zip(unique_texts, old_labels, new_labels):
+        count = len(unique[text])
+        if old == new:
+            unchanged[old] = unchanged.get(old, 0) + count
+            continue
+        key = (old, new)
+        transitions[key] = transitions.get(key, 0) + count
+        bucket = examples.setdefault(key, [])
+        for index in unique[text]:
+            if len(bucket) < samples:
+                bucket.append(names[index])
+
+    return {
+        "documents": len(texts),
+        "unique": len(unique_texts),
+        "changed": sum(transitions.values()),
+        "transitions": transitions,
+        "examples": examples,
+        "unchanged": unchanged,
+        "workers": workers,
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+# ========================================================================
+# ZNOVUNAČTENÍ PRAVIDEL ZA BĚHU (--watch_rules)
+# ========================================================================
+RULE_WATCHER = None
+
+
+def reload_rules(path=None):
+    """
+    Znovu načte a zkompiluje pravidla ze souboru (výchozí categories_v1.py)
+    a atomicky je prohodí s aktivními. Memo s výsledky podle starých pravidel
+    se zahodí, fuzzy index a artefakt pravidel se přestaví.
+    """
+    global FUZZY_INDEX
+    path = path or CATEGORIES_PATH
+    ruleset = load_ruleset(path)     # kompilace mimo aktivní pravidla
+    activate_ruleset(ruleset)
+    if FUZZY_INDEX is not None:
+        FUZZY_INDEX = build_fuzzy_index(ruleset.compiled, FUZZY_INDEX.max_distance, FUZZY_INDEX.min_length)
+    if MEMO is not None:
+        MEMO.clear(ruleset_fingerprint())
+    if os.path.abspath(path) == os.path.abspath(CATEGORIES_PATH):
+        try:
+            write_rules_artifact(RULES_ARTIFACT_PATH, rules_digest(ruleset), ruleset.compiled)
+        except OSError:
+            pass
+    return ruleset
+
+
+def start_rule_watcher(paths=None, interval=1.0):
+    """Spustí vlákno, které po každé úpravě souboru s pravidly zavolá reload_rules."""
+    global RULE_WATCHER
+
+    def on_change(path):
+        start = time.perf_counter()
+        reload_rules(path)
+        print(f"\n🔄 Pravidla znovu načtena z {os.path.basename(path)} "
+              f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+
+    def on_error(path, error):
+        print(f"\n⚠️  Pravidla z {os.path.basename(path)} se nepodařilo načíst, platí původní: {error}")
+
+    RULE_WATCHER = RuleWatcher(paths or [CATEGORIES_PATH], on_change, interval=interval,
+                               on_error=on_error)
+    RULE_WATCHER.start()
+    return RULE_WATCHER
+
+
+# ========================================================================
+# HLEDÁNÍ PODOBNÝCH SCREENSHOTŮ (--similar)
+# ========================================================================
+def open_text_index(cache_dir):
+    """BM25 index OCR textů z cache složky (prázdný, pokud chybí nebo je pro jiné OCR/lemmata)."""
+    index = Bm25Index(f"{OCR_VERSION}|{get_ruleset().lemmas_digest}", os.path.join(cache_dir, TEXT_INDEX_FILE))
+    index.load()
+    return index
+
+
+def update_text_index(index, ocr_cache):
+    """Doplní do indexu texty z OCR cache, které v něm ještě nejsou. Vrací počet přidaných."""
+    added = 0
+    for file_hash, text in ocr_cache.entries.items():
+        if file_hash not in index:
+            index.add(file_hash, ocr_cache.name(file_hash), prepare_text(text)[0].split())
+            added += 1
+    return added
+
+
+def find_similar(image_path, cache_dir=None, top_n=10):
+    """
+    Nejpodobnější screenshoty k souboru podle OCR textu (BM25).
+    Text souboru se vezme z OCR cache, jinak se přečte OCR. Index se předtím
+    doplní o všechno z OCR cache. Vrací (výsledky [(hash, jméno, skóre)], ms dotazu).
+    """
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    ocr_cache = OcrTextCache(OCR_VERSION, os.path.join(cache_dir, OCR_CACHE_FILE))
+    ocr_cache.load()
+    index = open_text_index(cache_dir)
+    if update_text_index(index, ocr_cache):
+        index.save()
+
+    file_hash = calculate_file_hash(image_path)
+    text = ocr_cache.get(file_hash)
+    if text is None:
+        text = extract_text_from_image(image_path)
+    if not text or text.startswith("[CHYBA"):
+        return [], 0.0
+    start = time.perf_counter()
+    results = index.search(prepare_text(text)[0].split(), top_n=top_n, exclude=file_hash)
+    return results, (time.perf_counter() - start) * 1000
+
+
+# ========================================================================
+# KANDIDÁTI NA NOVÁ KLÍČOVÁ SLOVA (--mine_terms)
+# ========================================================================
+def rule_terms():
+    """Klíčová slova a fráze z pravidel tak, jak je vidí prepare_text (lemmatizované)."""
+    rs = get_ruleset()
+    keywords = list(rs.word_weights)
+    for rule in rs.context_rules:
+        for key in ("very_specific", "kombinacni", "kontextove"):
+            keywords.extend(rule[key])
+    for category_keywords in rs.categories.values():
+        keywords.extend(category_keywords)
+    terms = set()
+    for keyword in keywords:
+        words = [rs.lemmas.get(w, w) for w in normalize_text_simple(keyword).split()]
+        if words:
+            terms.add(" ".join(words))
+    return terms
+
+
+def mine_terms(texts, capacity=5000):
+    """
+    Projde texty jako proud (stačí generátor) a vrátí TermMiner s četnostmi
+    slov a dvojic slov v Neprirazeno a v zařazených dokumentech. Paměť je
+    daná capacity a velikostí sketche, ne počtem dokumentů.
+    """
+    miner = TermMiner(known=rule_terms(), capacity=capacity)
+    for text in texts:
+        if not text or text.startswith("[CHYBA"):
+            continue
+        category = categorize_text_uncached(text)[0]
+        miner.add(prepare_text(text)[0].split(), assigned=category != "Neprirazeno")
+    return miner
 
-    # ===== KONEC KONTEXTOVÝCH PRAVIDEL =====
 
-    if debug:
-        print(f"❌ Žádné kontextové pravidlo nebylo aktivováno")
-        print(f"   → Pokračuji do váhového systému\n")
+def print_term_candidates(miner, limit=40):
+    print("=" * 70)
+    print("⛏️  KANDIDÁTI NA KLÍČOVÁ SLOVA")
+    print("=" * 70)
+    print(f"\n   Neprirazeno: {miner.unassigned_docs} dokumentů, zařazených: {miner.assigned_docs}")
+    candidates = miner.candidates(limit=limit)
+    if not candidates:
+        print("   (žádné slovo není v Neprirazeno výrazně častější než jinde)")
+        return
+    print(f"\n   {'slovo / dvojice':<32} {'Neprirazeno':>11} {'zařazené':>9} {'lift':>7}\n")
+    for term, count, in_assigned, lift in candidates:
+        print(f"   {term[:32]:<32} {count:>11} {in_assigned:>9} {lift:>7.1f}")
 
-    # Kontext-aware (hračky) - pro případné výjimky v scoringu
-    toy_keywords = ["stavebnice", "hracka", "hra", "puzzle", "lego", "vrtacka"]
-    has_toy_context = any(normalize_text_simple(k) in tokens for k in toy_keywords)
 
-    # ===== VÁŽOVANÉ BODOVÁNÍ (scoring) =====
-    scores = {}
-    matches_for_category = {}
+# ========================================================================
+# DUPLICITY V CELÉ KNIHOVNĚ (--find_duplicates)
+# ========================================================================
+# Textové duplikáty: MinHash nad trojicemi slov vyčištěného OCR textu
+TEXT_DUPLICATE_MIN_WORDS = 8    # kratší texty (prázdné screenshoty, pár slov UI) se neporovnávají
+MINHASHER = MinHasher()
 
-    for category, keywords in CATEGORIES.items():
-        weighted_score = 0
-        matched = []
-        for keyword in keywords:
-            k_norm = normalize_text_simple(keyword)
-            if k_norm in tokens:
-                # výjimka pro hračky u oblečení (pokud je to hračka, ignoruj velikosti)
-                if category == "Obleceni_Styl" and has_toy_context and k_norm in ["vel", "velikost", "size", "cm"]:
-                    continue
-                weight = WORD_WEIGHTS.get(keyword, WORD_WEIGHTS.get(k_norm, 3))
-                weighted_score += weight
-                matched.append((k_norm, weight))
-        scores[category] = weighted_score
-        # uložíme top matched tokeny (max 5)
-        matches_for_category[category] = [m[0] for m in sorted(matched, key=lambda x: x[1], reverse=True)[:5]]
 
-    # ===== NEGATIVE HINTS (penalizace chybných kategorií) =====
-    NEGATIVE_HINTS = {
-        "IT_Prace": [r"\bzahrad", r"\brostlin", r"\bflower\b", r"\bgarden\b"],
-        "Dum_Design": [r"\bcommit\b", r"\brepo\b", r"\bendpoint\b", r"\bhttp\b"]
-    }
-    for cat, patterns in NEGATIVE_HINTS.items():
-        if cat in scores:
-            penalty = 0
-            for p in patterns:
-                if re.search(p, norm_text):
-                    penalty += 2
-            if penalty:
-                scores[cat] = max(0, scores[cat] - penalty)
-                if debug:
-                    print(f"NEGATIVE HINT: snizil jsem score {cat} o {penalty} kvuli '{patterns}'")
+def text_signature(text):
+    """MinHash signatura OCR textu (slova po clean_text), pro krátký nebo chybový text None."""
+    if not text or text.startswith("[CHYBA"):
+        return None
+    words = clean_text(text)[0].split()
+    if len(words) < TEXT_DUPLICATE_MIN_WORDS:
+        return None
+    return MINHASHER.signature(shingles(words))
 
-    # Minimalni prah a reseni remizy
-    if not scores:
-        return "Neprirazeno", []
-    max_score = max(scores.values())
-    if max_score < 3:  # minimální důvěra -> Neprirazeno
-        return "Neprirazeno", []
 
-    # zjisti top dvě skóre pro rozhodnutí o remíze
-    sorted_scores = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
-    top_cat, top_score = sorted_scores[0]
-    second_score = sorted_scores[1][1] if len(sorted_scores) > 1 else 0
+def short_path(path):
+    """"složka/soubor" pro výpisy (stejná jména v různých složkách)."""
+    return os.path.join(os.path.basename(os.path.dirname(path)), os.path.basename(path))
 
-    # pokud je rozdil maly -> neurčeno
-    if (top_score - second_score) < 2:
-        if debug:
-            print(f"AMBIGUITY: top {top_cat}={top_score}, runner-up={second_score} -> Neprirazeno")
-        return "Neprirazeno", []
 
-    # vrátíme kategorii a top matched terms
-    top_matched = matches_for_category.get(top_cat, [])
-    if debug:
-        print(f"FINAL CATEGORY: {top_cat} (score={top_score}) matched={top_matched}")
+def library_files(roots, dest_dir=None):
+    """[(cesta, velikost, zařazený)] ze zdrojových složek a z celé cílové složky (s podsložkami)."""
+    files = []
+    if dest_dir:
+        files.extend((path, size, True) for path, size in scan_tree(dest_dir, is_image_file))
+    for root in roots:
+        files.extend((path, size, False) for path, size in scan_files(root, is_image_file))
+    return files
+
+
+def _indexed_images(paths, file_stats, file_index):
+    """
+    {cesta: záznam} z indexu souborů; perceptuální hashe, které v něm chybí,
+    se spočítají po dávkách a uloží. Vrací (záznamy, počet nalezených v indexu).
+    """
+    entries, found = {}, 0
+    for path in paths:
+        entry = file_index.lookup(path, file_stats[path])
+        if entry is not None:
+            found += 1
+        entries[path] = entry or {}
+    for path, info in hash_images([path for path in paths if "phash" not in entries[path]]).items():
+        entries[path] = file_index.record(path, file_stats[path], **info)
+    return entries, found
+
+
+def build_library_catalog(roots, dest_dir, file_index, phash_distance=6):
+    """
+    Katalog všeho, co už máme (další zdroje + cílová složka), pro kontrolu
+    nových souborů. Hodnoty se berou z indexu souborů (okraje a celý hash
+    si katalog zabalí k sobě); co v něm chybí, se spočítá jednou a uloží
+    (okraje a celý hash až při shodě velikosti).
+    """
+    def indexed_value(path, field, compute):
+        st = os.stat(path)
+        entry = file_index.lookup(path, st) or {}
+        if field not in entry:
+            entry = file_index.record(path, st, **{field: compute(path, st)})
+        return entry[field]
+
+    files = library_files(roots, dest_dir)
+    catalog = LibraryCatalog(
+        edge_of=lambda path: indexed_value(path, "edge",
+                                           lambda p, st: edge_hash(p, st.st_size, new_hash=new_file_hasher)),
+        hash_of=lambda path: indexed_value(path, "hash", lambda p, st: calculate_file_hash(p)),
+        phash_distance=phash_distance, expected=len(files))
+    file_stats = {path: os.stat(path) for path, _, _ in files}
+    entries, _ = _indexed_images(list(file_stats), file_stats, file_index)
+    for path, size, filed in files:
+        info = entries[path]
+        hashes = {name: info[name] for name in IMAGE_HASH_NAMES} if "phash" in info else None
+        catalog.add(path, size, hashes, width=info.get("width"), height=info.get("height"),
+                    mtime=file_stats[path].st_mtime_ns, filed=filed, edge=info.get("edge"), digest=info.get("hash"))
+    return catalog
+
+
+def dedup_memory_summary(structures):
+    """
+    Řádek s pamětí struktur deduplikace, které běh opravdu držel.
+    structures - [(název, jednotka, struktura s nbytes() a len) nebo None]
+    """
+    parts = []
+    for label, unit, structure in structures:
+        if structure is None or not len(structure):
+            continue
+        total = structure.nbytes()
+        parts.append(f"{label} {total / len(structure):.0f} B/{unit} ({total / 2**20:.1f} MB)")
+    return "🧮 Paměť deduplikace: " + ", ".join(parts) if parts else None
+
+
+def find_duplicates(roots, cache_dir=None, phash_distance=6, dest_dir=None, text_similarity=0.6):
+    """
+    Duplicity napříč zdrojovými složkami roots a cílovou složkou dest_dir -
+    identické soubory, vizuální duplikáty a textové duplikáty (MinHash LSH nad
+    OCR textem z cache, práh text_similarity, 0 = vypnuto), spojené do skupin
+    (A≈B≈C je jedna skupina) s volbou kopie, která zůstane (přednost má už
+    zařazená). Hashe nezměněných souborů se berou z indexu souborů a nové se do
+    něj uloží. Vrací (plán z duplicate_plan, statistiky).
+    """
+    start = time.perf_counter()
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    file_index = open_file_index(cache_dir)
+    files = library_files(roots, dest_dir)
+    filed = {path for path, _, is_filed in files if is_filed}
+    file_stats = {path: os.stat(path) for path, _, _ in files}
+    known = {}
+    for path, st in file_stats.items():
+        entry = file_index.lookup(path, st)
+        if entry is not None:
+            known[path] = entry
+    groups, computed, stats = find_exact_duplicates([(path, size) for path, size, _ in files],
+                                                    calculate_file_hash, new_hash=new_file_hasher, known=known)
+    edges = [(group[0], path, "identické") for group in groups for path in group[1:]]
+    exact_copies = {path for group in groups for path in group[1:]}
+    for path, info in computed.items():
+        file_index.record(path, file_stats[path], **info)
+
+    info, _ = _indexed_images([path for path in file_stats if path not in exact_copies], file_stats, file_index)
+    visual = NearDuplicateIndex(max_distance=phash_distance)
+    for path, entry in info.items():
+        if "phash" not in entry:
+            continue
+        image_hashes = {name: entry[name] for name in IMAGE_HASH_NAMES}
+        edges.extend((other, path, "vizuální") for other, _, _ in visual.matches(image_hashes))
+        visual.add(image_hashes, path)
+    file_index.save()
+
+    # text je v OCR cache pod hashem obsahu - jen u souborů, které už prošly OCR
+    stats["text_checked"] = 0
+    if text_similarity:
+        ocr_cache = OcrTextCache(OCR_VERSION, os.path.join(cache_dir, OCR_CACHE_FILE))
+        ocr_cache.load()
+        texts = LshIndex(threshold=text_similarity)
+        for path, entry in info.items():
+            signature = text_signature(ocr_cache.entries.get(entry.get("hash")))
+            if signature is None:
+                continue
+            stats["text_checked"] += 1
+            edges.extend((other, path, "textové") for other, _ in texts.query(signature))
+            texts.add(signature, path)
+
+    meta = {path: {"width": info.get(path, {}).get("width"), "height": info.get(path, {}).get("height"),
+                   "size": st.st_size, "mtime": st.st_mtime_ns, "filed": path in filed}
+            for path, st in file_stats.items()}
+    stats["elapsed"] = time.perf_counter() - start
+    stats["indexed"] = len(known)
+    return duplicate_plan(edges, meta), stats
+
+
+def print_duplicates(plan, stats, limit=20):
+    print("=" * 70)
+    print("🗑️  DUPLICITY")
+    print("=" * 70)
+    removable = sum(len(entry["remove"]) for entry in plan)
+    reclaim = sum(entry["reclaim"] for entry in plan)
+    print(f"\n   Souborů: {stats['files']}, skupin duplicit: {len(plan)}, "
+          f"ke smazání: {removable} ({reclaim / 2**20:.1f} MB)")
+    print(f"   Skupin se stejnou velikostí: {stats['size_groups']}, "
+          f"čtení okrajů: {stats['edge_reads']}, celých souborů: {stats['full_reads']}, "
+          f"z indexu souborů: {stats['indexed']}, s OCR textem: {stats['text_checked']}")
+    print(f"   Přečteno {stats['bytes_read'] / 2**20:.1f} MB z {stats['bytes_total'] / 2**20:.1f} MB "
+          f"za {stats['elapsed']:.1f} s\n")
+    for entry in plan[:limit]:
+        kinds = ", ".join(f"{kind} {count}" for kind, count in sorted(entry["kinds"].items()))
+        print(f"   ✅ {short_path(entry['keep'])}  ({kinds})")
+        for item in entry["remove"]:
+            print(f"      ✗ {short_path(item)}")
+    if len(plan) > limit:
+        print(f"\n   … a dalších {len(plan) - limit} skupin")
+
+
+def save_duplicate_plan(plan, path):
+    """Uloží plán deduplikace jako JSON (atomicky): [{"keep", "remove", "kinds", "reclaim"}]."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(plan, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def diff_lemmas(texts, names, old_path=None):
+    """
+    Kategorizuje texty (typicky OCR cache) se starou tabulkou lemmat (old_path,
+    None = bez lemmatizace) a s aktuální. Vrací každý změněný výsledek -
+    jinou kategorii nebo jiná nalezená klíčová slova:
+    [(jméno souboru, (kategorie, matched) staré, nové)].
+    """
+    unique = {}
+    for name, text in zip(names, texts):
+        unique.setdefault(text, []).append(name)
+    current = get_ruleset()
+    lemmas, lemmas_digest = load_lemma_table(old_path) if old_path else ({}, None)
+    compiled = compile_rules(current.context_rules, current.categories, current.word_weights, lemmas)
+    activate_ruleset(current._replace(lemmas=lemmas, lemmas_digest=lemmas_digest, compiled=compiled))
+    try:
+        old_results = [categorize_text_uncached(text) for text in unique]
+    finally:
+        activate_ruleset(current)
+    changes = []
+    for (text, text_names), old in zip(unique.items(), old_results):
+        new = categorize_text_uncached(text)
+        if (old[0], list(old[1])) != (new[0], list(new[1])):
+            changes.extend((name, old, new) for name in text_names)
+    return changes
+
+
+def print_lemmas_diff(changes, documents):
+    """Vypíše všechny změněné výsledky z diff_lemmas, změny kategorie první."""
+    print("=" * 70)
+    print("🔤 DOPAD TABULKY LEMMAT")
+    print("=" * 70)
+    moved = [c for c in changes if c[1][0] != c[2][0]]
+    print(f"\n   Dokumentů: {documents}")
+    print(f"   Změněná kategorie: {len(moved)}")
+    print(f"   Změněná jen klíčová slova: {len(changes) - len(moved)}\n")
+    for name, old, new in sorted(changes, key=lambda c: (c[1][0] == c[2][0], c[0])):
+        print(f"   - {name[:60]}: {old[0]} {old[1][:3]} → {new[0]} {new[1][:3]}")
+
 
-    return top_cat, top_matched
+def print_rules_diff(report, limit=30):
+    """Vypíše matici přechodů (z → do) a ukázky souborů pro nejčastější přechody."""
+    print("=" * 70)
+    print("🔀 DOPAD ZMĚNY PRAVIDEL")
+    print("=" * 70)
+    print(f"\n   Dokumentů: {report['documents']} (unikátních textů {report['unique']}), "
+          f"{report['workers']} procesů, {report['elapsed']:.1f} s")
+    print(f"   Změnilo kategorii: {report['changed']}")
+    transitions = report["transitions"]
+    if not transitions:
+        return
+
+    # matice jen pro kategorie, kterých se změna týká
+    involved = sorted({cat for key in transitions for cat in key})
+    short = [cat[:10] for cat in involved]
+    print("\n   MATICE PŘECHODŮ (řádek = původní kategorie, sloupec = nová)\n")
+    print("   " + " " * 14 + " ".join(f"{name:>10}" for name in short))
+    for old in involved:
+        row = [transitions.get((old, new), 0) for new in involved]
+        cells = " ".join(f"{(str(count) if count else '.'):>10}" for count in row)
+        print(f"   {old[:14]:<14}{cells}")
+
+    print("\n   NEJČASTĚJŠÍ PŘECHODY\n")
+    for (old, new), count in sorted(transitions.items(), key=lambda kv: kv[1], reverse=True)[:limit]:
+        print(f"   {old} → {new}: {count}")
+        for filename in report["examples"][(old, new)]:
+            print(f"      - {filename[:60]}")
 
 
 def is_image_file(filename):
@@ -967,7 +1888,243 @@ def is_image_file(filename):
     return any(filename.lower().endswith(ext) for ext in extensions)
 
 
-def dry_run_test(folder=None, max_test_files=100, sample=None, debug=False):
+# ============================================================================
+# NASTAVENÍ BĚHU A DUPLICITY BĚHEM TESTU
+# ============================================================================
+
+# Stupně a měření kategorizace pro jeden běh (viz configure_categorization)
+CategorizeOptions = namedtuple(
+    "CategorizeOptions",
+    ["profile", "use_memo", "fuzzy", "reocr", "classifier", "classifier_threshold",
+     "trace_path", "stage_report", "watch_rules"],
+    defaults=[False, True, False, False, False, 0.6, None, False, False])
+
+# Hledání duplicit během dry-run testu (viz RunDeduplicator)
+DedupOptions = namedtuple(
+    "DedupOptions",
+    ["phash_distance", "use_file_index", "library_dirs", "dest_dir", "text_similarity"],
+    defaults=[6, True, (), None, 0.6])
+
+
+def configure_categorization(options, cache_dir=None):
+    """
+    Zapne stupně kategorizace a měření podle CategorizeOptions (globály jako enable_*).
+    Protějšek finish_categorization() na konci běhu vypíše reporty a uloží memo.
+    """
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    if options.profile:
+        enable_profiling()
+    if options.fuzzy:
+        enable_fuzzy()
+    if options.reocr:
+        enable_reocr()
+    if options.stage_report:
+        enable_stage_stats()
+    if options.classifier:
+        model = enable_classifier(os.path.join(cache_dir, CLASSIFIER_FILE), threshold=options.classifier_threshold)
+        if model is None:
+            print("⚠️  Klasifikátor není natrénovaný - spusť nejdřív --train_classifier")
+        elif model.fingerprint != ruleset_fingerprint(include_classifier=False):
+            print("⚠️  Klasifikátor je natrénovaný na starší sadě pravidel - zvaž --train_classifier")
+    if options.use_memo:
+        enable_memo(os.path.join(cache_dir, "categorize_memo.json"))
+    if options.trace_path:
+        enable_tracing(options.trace_path)
+    if options.watch_rules:
+        start_rule_watcher()
+
+
+def finish_categorization():
+    """Vypíše reporty zapnutých měření, uloží memo a zastaví watcher a zápis záznamů."""
+    if PROFILER:
+        print("\n" + "=" * 70)
+        print(PROFILER.report())
+
+    if STAGES:
+        print("\n" + "=" * 70)
+        print(STAGES.report())
+
+    if MEMO:
+        try:
+            MEMO.save()
+        except OSError as e:
+            print(f"\n⚠️  Memo se nepodařilo uložit: {e}")
+        print("\n" + MEMO.summary())
+
+    if RULE_WATCHER:
+        RULE_WATCHER.stop()
+        print(f"🔄 Přenačtení pravidel za běhu: {RULE_WATCHER.reloads}")
+
+    if TRACER:
+        TRACER.close()
+        print(f"🧾 Záznamy rozhodnutí: {TRACER.written} → {TRACER.path}")
+
+
+class RunDeduplicator:
+    """
+    Duplicity během dry-run testu: identické soubory (velikost → okraje → celý hash) předem,
+    vizuální a textové duplikáty průběžně, porovnání s knihovnou a cílovou složkou.
+    Hashe souborů se pamatují v indexu souborů (stat), takže se nezměněné soubory nečtou.
+    """
+
+    def __init__(self, options=DedupOptions(), cache_dir=None):
+        self.options = options
+        cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.file_index = open_file_index(cache_dir) if options.use_file_index else None
+        self.seen_p_hashes = NearDuplicateIndex(max_distance=options.phash_distance)
+        self.seen_texts = LshIndex(threshold=options.text_similarity) if options.text_similarity else None
+        self.catalog = None
+        self.duplicates = []     # hrany (originál, kopie, druh) pro duplicate_plan
+        self.stats = {}
+        self.known = {}
+        self.computed = {}
+        self.duplicate_of = {}
+        self.dedup_stats = {}
+
+    def prepare(self, paths):
+        """Stat, index souborů, katalog knihovny a identické soubory pro paths ještě před OCR."""
+        options = self.options
+        self.stats = {path: os.stat(path) for path in paths}
+        # nezměněné soubory (stejný stat jako minule) se vůbec nečtou
+        if self.file_index is not None:
+            for path, st in self.stats.items():
+                entry = self.file_index.lookup(path, st)
+                if entry is not None:
+                    self.known[path] = entry
+
+        # všechno, co už máme v jiných zdrojích a v cílové složce
+        if options.library_dirs or options.dest_dir:
+            self.catalog = build_library_catalog(list(options.library_dirs or []), options.dest_dir,
+                                                 self.file_index or FileIdentityIndex(None), options.phash_distance)
+            print(f"📚 Katalog knihovny: {len(self.catalog)} souborů "
+                  f"({self.catalog.nbytes() / max(len(self.catalog), 1):.0f} B na soubor včetně vizuálního indexu)")
+
+        # identické soubory předem: jen skupiny se stejnou velikostí, nejdřív okraje souborů
+        exact_groups, self.computed, self.dedup_stats = find_exact_duplicates(
+            [(path, st.st_size) for path, st in self.stats.items()], calculate_file_hash,
+            new_hash=new_file_hasher, known=self.known)
+        self.duplicate_of = {path: group[0] for group in exact_groups for path in group[1:]}
+
+        # perceptuální hashe po dávkách miniatur (jen to, co v indexu souborů ještě není)
+        unhashed = [path for path in self.stats
+                    if path not in self.duplicate_of and "phash" not in (self.known.get(path) or {})]
+        for path, info in hash_images(unhashed).items():
+            self.computed.setdefault(path, {}).update(info)
+        if self.file_index is not None:
+            for path, info in self.computed.items():
+                self.file_index.record(path, self.stats[path], **info)
+
+    def info(self, path):
+        """Všechno, co o souboru víme z indexu souborů a z prepare()."""
+        info = dict(self.known.get(path) or {})
+        info.update(self.computed.get(path, {}))
+        return info
+
+    def exact(self, path):
+        """Hláška, pokud je soubor identický s dřívějším nebo už je v knihovně (pak se přeskočí)."""
+        filename = os.path.basename(path)
+        if path in self.duplicate_of:
+            self.duplicates.append((os.path.basename(self.duplicate_of[path]), filename, "identické"))
+            return "identické soubory"
+        if self.catalog is not None:
+            in_library = self.catalog.find_exact(path, self.stats[path].st_size)
+            if in_library:
+                self.duplicates.append((in_library, filename, "v knihovně"))
+                return f"už v knihovně: {short_path(in_library)}"
+        return None
+
+    def file_hash(self, path, needed=False):
+        """Hash obsahu (klíč OCR cache); u kandidátů na duplicitu už je spočítaný."""
+        file_hash = self.info(path).get("hash")
+        if file_hash is None and (needed or self.file_index is not None):
+            file_hash = calculate_file_hash(path)
+            if self.file_index is not None:
+                self.file_index.record(path, self.stats[path], hash=file_hash)
+        return file_hash
+
+    def visual(self, path):
+        """Nejbližší shoda perceptuálních hashů (počet shodných hashů), nebo None."""
+        info = self.info(path)
+        if "phash" not in info:
+            return None
+        filename = os.path.basename(path)
+        image_hashes = {name: info[name] for name in IMAGE_HASH_NAMES}
+        # blízké hashe = stejný obrázek s jiným časem ve status baru / jiným ořezem
+        similar = self.seen_p_hashes.matches(image_hashes)
+        if self.catalog is not None:
+            similar += self.catalog.find_visual(image_hashes)
+        # všechny shody - obrázek může spojit dvě dosud oddělené skupiny
+        self.duplicates.extend((other, filename, "vizuální") for other, _, _ in similar)
+        self.seen_p_hashes.add(image_hashes, filename)
+        return similar[0][1] if similar else None
+
+    def textual(self, path, text):
+        """Nejvyšší odhad podobnosti OCR textu s dřívějším screenshotem, nebo None."""
+        if self.seen_texts is None:
+            return None
+        signature = text_signature(text)
+        if signature is None:
+            return None
+        filename = os.path.basename(path)
+        # stejný článek oříznutý / odscrollovaný - jiné pixely, skoro stejný text
+        similar_texts = self.seen_texts.query(signature)
+        self.duplicates.extend((other, filename, "textové") for other, _ in similar_texts)
+        self.seen_texts.add(signature, filename)
+        return similar_texts[0][1] if similar_texts else None
+
+    def report(self):
+        """Řádky souhrnu: počet duplicit, plán mazání a kolik se kvůli identickým souborům četlo."""
+        print(f"🗑️  Duplicity: {len({copy for _, copy, _ in self.duplicates})}")
+        if self.duplicates:
+            meta = {}
+            for path, st in self.stats.items():
+                info = self.info(path)
+                meta[os.path.basename(path)] = {"width": info.get("width"), "height": info.get("height"),
+                                                "size": st.st_size, "mtime": st.st_mtime_ns}
+            if self.catalog is not None:
+                meta.update(self.catalog.meta)
+            plan = duplicate_plan(self.duplicates, meta)
+            print(f"   skupin: {len(plan)}, ke smazání: {sum(len(entry['remove']) for entry in plan)} "
+                  f"(zůstane už zařazená → nejvyšší rozlišení → největší soubor → nejstarší)")
+        print(f"   čtení kvůli identickým souborům: {self.dedup_stats['full_reads']} celých souborů, "
+              f"{self.dedup_stats['edge_reads']} okrajů ({self.dedup_stats['bytes_read'] / 2**20:.1f} MB "
+              f"z {self.dedup_stats['bytes_total'] / 2**20:.1f} MB)")
+
+    def close(self):
+        """Vypíše paměť struktur a uloží index souborů."""
+        memory = dedup_memory_summary([("index souborů", "záznam", self.file_index),
+                                       ("katalog knihovny", "soubor", self.catalog),
+                                       ("obrázky tohoto běhu", "obrázek", self.seen_p_hashes)])
+        if memory:
+            print(memory)
+
+        if self.file_index is not None:
+            try:
+                self.file_index.save()
+            except OSError as e:
+                print(f"\n⚠️  Index souborů se nepodařilo uložit: {e}")
+            print(self.file_index.summary())
+
+
+def apply_classifier_batch(stats, pending):
+    """
+    Stupeň 3 dry-run testu po dávkách: pending = [(položka statistik, text)] z Neprirazeno.
+    Zařazené položky přesune ve stats do jejich kategorie a vypíše je.
+    """
+    results = classify_deferred([text for _, text in pending])
+    assigned = [(item, result) for (item, _), result in zip(pending, results) if result is not None]
+    print(f"   🤖 Klasifikátor: dávka {len(pending)} nepřiřazených, zařazeno {len(assigned)}")
+    moved = {id(item) for item, _ in assigned}
+    stats["Neprirazeno"] = [item for item in stats["Neprirazeno"] if id(item) not in moved]
+    for item, (category, matched_terms) in assigned:
+        item['matched'] = matched_terms
+        stats[category].append(item)
+        print(f"      {item['filename'][:40]} → {category}    |  klíčová slova: {', '.join(matched_terms[:3])}")
+
+
+def dry_run_test(folder=None, max_test_files=100, sample=None, debug=False, cache_dir=None,
+                 multi_label=False, top_k=3, margin=None, use_ocr_cache=True,
+                 categorize=CategorizeOptions(), dedup=DedupOptions()):
     """
     Dry run test - simulace kategorizace bez pohybu souborů.
     
@@ -976,6 +2133,13 @@ def dry_run_test(folder=None, max_test_files=100, sample=None, debug=False):
         max_test_files: Maximum souborů k testování
         sample: Počet náhodných souborů k testování (None = všechny)
         debug: Zapnout debug výpis
+        cache_dir: Složka pro cache mezi běhy (None = DEFAULT_CACHE_DIR)
+        multi_label: Vypsat pro každý screenshot top_k kategorií se skóre (rank_categories)
+        top_k: Kolik kategorií v multi-label režimu nejvýš vypsat
+        margin: Multi-label - vynechat kategorie o víc než margin bodů horší než nejlepší
+        use_ocr_cache: Brát OCR texty z cache podle hashe souboru (a nové do ní ukládat)
+        categorize: CategorizeOptions - stupně (fuzzy, re-OCR, klasifikátor), memo, profil, záznamy
+        dedup: DedupOptions - vizuální a textové duplikáty, index souborů, knihovna a cílová složka
     """
     print("=" * 70)
     print("🧪 DRY RUN TEST - FILTROVÁNÍ SOCIAL MEDIA UI + OCR improvements")
@@ -1036,11 +2200,22 @@ def dry_run_test(folder=None, max_test_files=100, sample=None, debug=False):
     print("✨ Ignoruji UI prvky: follow, like, message, 1.1M, 356K atd.\n")
     input("Stiskni Enter pro spuštění...")
 
-    stats = {category: [] for category in list(CATEGORIES.keys()) + ["Neprirazeno"]}
-    duplicates = []
+    stats = {category: [] for category in list(get_ruleset().categories) + ["Neprirazeno"]}
     errors = []
-    seen_hashes = {}
-    seen_p_hashes = {}
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    configure_categorization(categorize, cache_dir)
+    ocr_cache = None
+    text_index = None
+    if use_ocr_cache:
+        ocr_cache = OcrTextCache(OCR_VERSION, os.path.join(cache_dir, OCR_CACHE_FILE))
+        ocr_cache.load()
+        # index pro --similar se plní průběžně se stejnými slovy, jaká vidí pravidla
+        text_index = open_text_index(cache_dir)
+    multi_label_docs = 0
+    pending = []        # (položka statistik, text) pro klasifikátor po dávkách
+
+    deduplicator = RunDeduplicator(dedup, cache_dir)
+    deduplicator.prepare([os.path.join(SOURCE, filename) for filename in test_files])
 
     print("\n" + "=" * 70)
     print("🔍 SPOUŠTÍM TEST...")
@@ -1051,54 +2226,91 @@ def dry_run_test(folder=None, max_test_files=100, sample=None, debug=False):
         print(f"[{idx}/{len(test_files)}] {filename[:40]}...", end=" ")
 
         try:
-            # klasický MD5 hash
-            file_hash = calculate_file_hash(source_path)
-            if file_hash in seen_hashes:
-                print("🗑️  DUPLICITA (identické soubory)")
-                duplicates.append((filename, seen_hashes[file_hash]))
+            duplicate = deduplicator.exact(source_path)
+            if duplicate:
+                print(f"🗑️  DUPLICITA ({duplicate})")
                 continue
-            seen_hashes[file_hash] = filename
-
-            # perceptual hash (vizuální duplicity)
-            p_hash = perceptual_hash(source_path)
-            if p_hash:
-                if p_hash in seen_p_hashes:
-                    print("⚠️  VIZUÁLNÍ DUPLIKÁT (podobné obrázky)")
-                    duplicates.append((filename, seen_p_hashes[p_hash]))
-                    # pouze upozorníme, ale budeme dál zpracovávat
-                else:
-                    seen_p_hashes[p_hash] = filename
+            file_hash = deduplicator.file_hash(source_path, needed=ocr_cache is not None)
+
+            # perceptuální hashe (vizuální duplicity) - pouze upozorníme, ale budeme dál zpracovávat
+            votes = deduplicator.visual(source_path)
+            if votes:
+                print(f"⚠️  VIZUÁLNÍ DUPLIKÁT (podobné obrázky, shoda {votes}/4 hashů)")
 
             print("📖", end=" ")
-            text = extract_text_from_image(source_path)
-            cat, matched_terms = categorize_text(text, debug=debug)
+            t_ocr = STAGES.clock() if STAGES else None
+            text = ocr_cache.get(file_hash) if ocr_cache is not None else None
+            if text is None:
+                text = extract_text_from_image(source_path)
+                if ocr_cache is not None:
+                    ocr_cache.put(file_hash, text, filename)
+                if STAGES:
+                    STAGES.record("0 OCR", STAGES.clock() - t_ocr)
+            elif STAGES:
+                STAGES.record("0 OCR (cache)", STAGES.clock() - t_ocr)
+            if text_index is not None and text and not text.startswith("[CHYBA"):
+                text_index.add(file_hash, filename, prepare_text(text)[0].split())
+            similarity = deduplicator.textual(source_path, text)
+            if similarity:
+                print(f"📝 TEXTOVÝ DUPLIKÁT (shoda {similarity * 100:.0f} %)", end=" ")
+            if multi_label:
+                # jedno vyhodnocení dá seznam kandidátů i jednoznačnou kategorii
+                (cat, matched_terms), ranked = rank_categories(text, top_k=top_k, margin=margin, debug=debug,
+                                                               doc_id=filename, image_path=source_path,
+                                                               defer_classifier=True)
+            else:
+                cat, matched_terms = categorize_text(text, debug=debug, doc_id=filename, image_path=source_path,
+                                                     defer_classifier=True)
 
             # uložíme do statistik
-            stats[cat].append({
+            item = {
                 'filename': filename,
                 'text_preview': text[:150] if text else "[prázdné]",
                 'matched': matched_terms
-            })
+            }
+            stats[cat].append(item)
+            if cat == "Neprirazeno" and CLASSIFIER is not None and text and not text.startswith("[CHYBA"):
+                pending.append((item, text))
 
             # výpis do terminálu : kategorie + top matched terms
             matched_str = ", ".join(matched_terms[:3]) if matched_terms else "(žádné)"
-            print(f"✅ → {cat}    |  klíčová slova: {matched_str}")
+            if PROFILER:
+                print(f"✅ → {cat}    |  klíčová slova: {matched_str}    |  rozhodl: {PROFILER.last_decision}")
+            else:
+                print(f"✅ → {cat}    |  klíčová slova: {matched_str}")
+
+            if multi_label:
+                extra = [c for c in ranked if c.category != cat]
+                if extra:
+                    multi_label_docs += 1
+                for c in ranked:
+                    source = c.rule or "váhy"
+                    print(f"      🏷️  {c.category}: {c.score} b. ({source}) | {', '.join(c.matched[:3])}")
+
+            if len(pending) >= CLASSIFIER_BATCH:
+                apply_classifier_batch(stats, pending)
+                pending = []
 
         except Exception as e:
             print(f"❌ CHYBA: {e}")
             errors.append((filename, str(e)))
 
+    if pending:
+        apply_classifier_batch(stats, pending)
+
     # Souhrn výsledků
     print("\n" + "=" * 70)
     print("📊 VÝSLEDKY")
     print("=" * 70)
 
     print(f"\n✅ Testováno: {len(test_files)}")
-    print(f"🗑️  Duplicity: {len(duplicates)}")
+    deduplicator.report()
     print(f"❌ Chyby: {len(errors)}")
+    if multi_label:
+        print(f"🏷️  Víc kategorií: {multi_label_docs}")
 
     print(f"\n📂 KATEGORIE:\n")
-    for category in CATEGORIES.keys():
+    for category in get_ruleset().categories:
         count = len(stats[category])
         if count > 0:
             print(f"   📁 {category}: {count}")
@@ -1119,11 +2331,270 @@ def dry_run_test(folder=None, max_test_files=100, sample=None, debug=False):
                 preview = item['text_preview'].replace('\n', ' ')[:80]
                 print(f"        💬 \"{preview}...\"")
 
+    finish_categorization()
+
+    if ocr_cache is not None:
+        try:
+            ocr_cache.save()
+        except OSError as e:
+            print(f"\n⚠️  OCR cache se nepodařilo uložit: {e}")
+        print(ocr_cache.summary())
+
+    deduplicator.close()
+
+    if text_index is not None:
+        try:
+            text_index.save()
+        except OSError as e:
+            print(f"\n⚠️  Index textů se nepodařilo uložit: {e}")
+
     print("\n" + "=" * 70)
     print("✅ TEST DOKONČEN!")
     print("=" * 70)
 
 
+# ============================================================================
+# REŽIMY PŘÍKAZOVÉ ŘÁDKY (každý něco vypíše a skončí; vrací návratový kód)
+# ============================================================================
+
+def load_ocr_cache(cache_dir=None):
+    """Načtená OCR cache z cache_dir, nebo None (s hláškou), pokud je prázdná."""
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    ocr_cache = OcrTextCache(OCR_VERSION, os.path.join(cache_dir, OCR_CACHE_FILE))
+    if not ocr_cache.load():
+        print(f"❌ OCR cache v {cache_dir} je prázdná - nejdřív spusť dry-run test")
+        return None
+    return ocr_cache
+
+
+def run_build_lemmas(args):
+    count, size = build_lemmas(tsv_path=args.lemmas_tsv)
+    print(f"✅ Tabulka lemmat: {count} tvarů, {size / 1024:.1f} KB → {LEMMAS_PATH}")
+    return 0
+
+
+def run_benchmark_hashes(args):
+    speeds = benchmark_hashes()
+    print("⏱️  Propustnost hashů (64 MB v paměti, 1 jádro):\n")
+    for algorithm, speed in sorted(speeds.items(), key=lambda kv: kv[1], reverse=True):
+        print(f"   {algorithm:<10} {speed:>8.0f} MB/s  ({speed / speeds['md5']:.1f}× MD5)")
+    if args.input_dir and os.path.isdir(args.input_dir):
+        paths = [path for path, _ in scan_files(args.input_dir, is_image_file)][:1000]
+        size_mb = sum(os.path.getsize(path) for path in paths) / 2**20
+        print(f"\n⏱️  Čtení + {HASH_ALGORITHM} nad {len(paths)} soubory ({size_mb:.0f} MB) z --input_dir:\n")
+        print(f"   {'způsob':<16} {'studený':>10} {'teplý':>10}")
+        for method, cold, warm in benchmark_file_hashing(paths, HASH_ALGORITHM):
+            print(f"   {method:<16} {cold:>5.0f} MB/s {warm:>5.0f} MB/s")
+        if FILE_CACHE_DROPPABLE:
+            print("\n   (studený = soubory vyhozené z page cache, tedy rychlost disku; teplý = z page cache,"
+                  "\n    rozdíl oproti MB/s v paměti je režie čtení v Pythonu)")
+        else:
+            print("\n   (studený = každý způsob na vlastní části souborů, které ještě nikdo nečetl -"
+                  "\n    soubory z dřívějších běhů mohou být v cache; teplý = z page cache)")
+    return 0
+
+
+def run_benchmark_dedup_memory(args):
+    print(f"⏱️  Paměť stavu deduplikace pro {args.benchmark_dedup_memory} souborů:\n")
+    for layout, per_entry in benchmark_dedup_memory(args.benchmark_dedup_memory):
+        print(f"   {layout:<34} {per_entry:>6.0f} B/záznam")
+    return 0
+
+
+def run_build_rules(args):
+    start = time.perf_counter()
+    _, size = build_rules()
+    print(f"✅ Pravidla zkompilována za {(time.perf_counter() - start) * 1000:.0f} ms, "
+          f"{size / 1024:.1f} KB → {RULES_ARTIFACT_PATH}")
+    return 0
+
+
+def run_query_traces(args):
+    try:
+        found = query_traces(args.query_traces, parse_filters(args.filter))
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    for data in found[:50]:
+        print(format_trace(data))
+    print(f"\n📋 Nalezeno záznamů: {len(found)}" + (" (vypsáno prvních 50)" if len(found) > 50 else ""))
+    return 0
+
+
+def run_similar(args):
+    if not os.path.isfile(args.similar):
+        print(f"❌ Soubor neexistuje: {args.similar}")
+        return 1
+    results, elapsed_ms = find_similar(args.similar, cache_dir=args.cache_dir, top_n=args.top_n)
+    print(f"🔎 Podobné screenshoty k {os.path.basename(args.similar)} ({elapsed_ms:.1f} ms):\n")
+    for _, name, score in results:
+        print(f"   {score:7.2f}  {name}")
+    if not results:
+        print("   (nic podobného - je OCR cache naplněná dry-run testem?)")
+    return 0
+
+
+def run_find_duplicates(args):
+    if not args.input_dir or not os.path.isdir(args.input_dir):
+        print("❌ --find_duplicates potřebuje existující --input_dir")
+        return 1
+    plan, dedup_stats = find_duplicates([args.input_dir] + args.library_dir, cache_dir=args.cache_dir,
+                                        phash_distance=args.phash_distance, dest_dir=args.dest_dir,
+                                        text_similarity=args.text_similarity)
+    print_duplicates(plan, dedup_stats)
+    if args.duplicates_plan:
+        save_duplicate_plan(plan, args.duplicates_plan)
+        print(f"\n💾 Plán deduplikace → {args.duplicates_plan}")
+    return 0
+
+
+def run_mine_terms(args):
+    # texty jdou z cache souboru proudem (iter_texts), celá cache se do paměti nenačítá
+    cache_dir = args.cache_dir or DEFAULT_CACHE_DIR
+    ocr_cache = OcrTextCache(OCR_VERSION, os.path.join(cache_dir, OCR_CACHE_FILE))
+    start = time.perf_counter()
+    miner = mine_terms(ocr_cache.iter_texts())
+    if not miner.unassigned_docs and not miner.assigned_docs:
+        print(f"❌ OCR cache v {cache_dir} je prázdná - nejdřív spusť dry-run test")
+        return 1
+    print_term_candidates(miner)
+    print(f"\n   ({time.perf_counter() - start:.1f} s)")
+    return 0
+
+
+def run_diff_rules(args):
+    ocr_cache = load_ocr_cache(args.cache_dir)
+    if ocr_cache is None:
+        return 1
+    hashes = list(ocr_cache.entries)
+    report = diff_rules(args.diff_rules, [ocr_cache.entries[h] for h in hashes],
+                        [ocr_cache.name(h) for h in hashes],
+                        new_path=args.diff_rules_new, workers=args.workers)
+    print_rules_diff(report)
+    return 0
+
+
+def run_diff_lemmas(args):
+    ocr_cache = load_ocr_cache(args.cache_dir)
+    if ocr_cache is None:
+        return 1
+    hashes = list(ocr_cache.entries)
+    changes = diff_lemmas([ocr_cache.entries[h] for h in hashes], [ocr_cache.name(h) for h in hashes],
+                          old_path=args.diff_lemmas or None)
+    print_lemmas_diff(changes, len(hashes))
+    return 0
+
+
+def run_train_classifier(args):
+    ocr_cache = load_ocr_cache(args.cache_dir)
+    if ocr_cache is None:
+        return 1
+    model_path = os.path.join(args.cache_dir or DEFAULT_CACHE_DIR, CLASSIFIER_FILE)
+    report = train_classifier(ocr_cache.texts(), model_path, threshold=args.classifier_threshold)
+    print(f"🤖 Trénovacích textů (jisté štítky z pravidel): {report['labeled']}")
+    if not report["labeled"]:
+        print("❌ Žádný text nemá jistý štítek - klasifikátor se netrénoval")
+        return 1
+    print(f"   trénink: {report['train_s']:.1f} s, ztráta {report['loss']:.3f}")
+    if "accuracy" in report:
+        print(f"   přesnost na odložených textech: {report['accuracy'] * 100:.1f} %")
+        print(f"   přesnost nad prahem {args.classifier_threshold}: "
+              f"{report['precision_at_threshold'] * 100:.1f} %")
+    if report["unassigned"]:
+        print(f"   Neprirazeno: {report['unassigned']}, klasifikátor zařadí: {report['rescued']}")
+        print(f"   dávková inference: {report['inference_us']:.1f} µs/dokument")
+    print(f"✅ Model uložen → {model_path}")
+    return 0
+
+
+def compare_phrase_matching(texts, names):
+    """Texty, u kterých n-gram matching frází dá jiný výsledek než původní substring matching."""
+    changes = []
+    for text, filename in zip(texts, names):
+        cat, matched_terms = categorize_text(text)
+        old_cat, old_matched = categorize_text_substring_phrases(text)
+        if (old_cat, old_matched) != (cat, matched_terms):
+            changes.append((filename, old_cat, old_matched, cat, matched_terms))
+    return changes
+
+
+def run_compare_matching(args):
+    ocr_cache = load_ocr_cache(args.cache_dir)
+    if ocr_cache is None:
+        return 1
+    hashes = list(ocr_cache.entries)
+    matching_changes = compare_phrase_matching([ocr_cache.entries[h] for h in hashes],
+                                               [ocr_cache.name(h) for h in hashes])
+    print("=" * 70)
+    print("🔤 POROVNÁNÍ MATCHINGU FRÁZÍ (substring → n-gramy)")
+    print("=" * 70)
+    changed = [c for c in matching_changes if c[1] != c[3]]
+    print(f"\n   Textů z OCR cache: {len(hashes)}")
+    print(f"   Změněná kategorie: {len(changed)}")
+    print(f"   Změněná jen klíčová slova: {len(matching_changes) - len(changed)}\n")
+    for filename, old_cat, old_matched, cat, matched_terms in matching_changes[:20]:
+        lost = [k for k in old_matched if k not in matched_terms]
+        print(f"      - {filename[:50]}: {old_cat} → {cat}")
+        if lost:
+            print(f"        ✂️  už nematchuje: {', '.join(lost[:5])}")
+    return 0
+
+
+def run_benchmark_cleaning(args):
+    ocr_cache = load_ocr_cache(args.cache_dir)
+    if ocr_cache is None:
+        return 1
+    bench = benchmark_text_cleaning(ocr_cache.texts())
+    print("=" * 70)
+    print("🧹 BENCHMARK ČIŠTĚNÍ TEXTU")
+    print("=" * 70)
+    print(f"\n   Dokumentů: {bench['documents']}")
+    print(f"   filter → normalize → tokenize: {bench['chain']:.1f} µs/dokument")
+    print(f"   clean_text (jeden průchod):    {bench['fused']:.1f} µs/dokument")
+    if bench['fused']:
+        print(f"   zrychlení: {bench['chain'] / bench['fused']:.1f}×")
+    print(f"   rozdílné výsledky: {bench['mismatches']}")
+    return 0
+
+
+def run_benchmark_fuzzy(args):
+    ocr_cache = load_ocr_cache(args.cache_dir)
+    if ocr_cache is None:
+        return 1
+    bench = benchmark_fuzzy(ocr_cache.texts())
+    print("=" * 70)
+    print("🔤 BENCHMARK FUZZY MATCHINGU")
+    print("=" * 70)
+    print(f"\n   Dokumentů: {bench['documents']}")
+    print(f"   stavba indexu: {bench['index_build_ms']:.0f} ms ({bench['index_entries']} delecí)")
+    print(f"   bez fuzzy: {bench['exact']:.1f} µs/dokument")
+    print(f"   s fuzzy:   {bench['fuzzy']:.1f} µs/dokument")
+    print(f"   vytaženo z Neprirazeno: {bench['rescued']}")
+    return 0
+
+
+# Režimy v pořadí, ve kterém se kontrolují (argument → funkce); jinak se spustí dry-run test.
+# TOOL_MODES běží s pravidly tak, jak jsou (--no_lemmas na ně nemá vliv), CLI_MODES až po něm.
+TOOL_MODES = [
+    ("build_lemmas", run_build_lemmas),
+    ("benchmark_hashes", run_benchmark_hashes),
+    ("benchmark_dedup_memory", run_benchmark_dedup_memory),
+    ("build_rules", run_build_rules),
+]
+CLI_MODES = [
+    ("query_traces", run_query_traces),
+    ("similar", run_similar),
+    ("find_duplicates", run_find_duplicates),
+    ("mine_terms", run_mine_terms),
+    ("diff_rules", run_diff_rules),
+    ("diff_lemmas", run_diff_lemmas),
+    ("train_classifier", run_train_classifier),
+    ("compare_matching", run_compare_matching),
+    ("benchmark_cleaning", run_benchmark_cleaning),
+    ("benchmark_fuzzy", run_benchmark_fuzzy),
+]
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Kategorizace screenshotů")
     parser.add_argument(
@@ -1143,8 +2614,267 @@ if __name__ == "__main__":
         action="store_true",
         help="Zobrazí detailní výstup při testování"
     )
+    parser.add_argument(
+        "--compare_matching",
+        action="store_true",
+        help="Nad texty z OCR cache porovná n-gram matching frází s původním substring matchingem a skončí"
+    )
+    parser.add_argument(
+        "--benchmark_cleaning",
+        action="store_true",
+        help="Změří sloučené čištění textu proti původnímu řetězci na textech z OCR cache a skončí"
+    )
+    parser.add_argument(
+        "--no_memo",
+        action="store_true",
+        help="Vypne memo kategorizace (každý text se vyhodnotí znovu)"
+    )
+    parser.add_argument(
+        "--cache_dir",
+        type=str,
+        default=None,
+        help=f"Složka pro cache mezi běhy (výchozí: {DEFAULT_CACHE_DIR})"
+    )
+    parser.add_argument(
+        "--multi_label",
+        action="store_true",
+        help="Ke každému screenshotu vypíše top kategorie se skóre (jeden průchod pravidly)"
+    )
+    parser.add_argument(
+        "--top_k",
+        type=int,
+        default=3,
+        help="Multi-label: kolik kategorií nejvýš vypsat (výchozí 3)"
+    )
+    parser.add_argument(
+        "--margin",
+        type=int,
+        default=None,
+        help="Multi-label: vynechat kategorie o víc než N bodů horší než nejlepší"
+    )
+    parser.add_argument(
+        "--fuzzy",
+        action="store_true",
+        help="Toleruje OCR překlepy (rec1pe, montesori) u textů, které pravidla nepřiřadila"
+    )
+    parser.add_argument(
+        "--benchmark_fuzzy",
+        action="store_true",
+        help="Změří cenu fuzzy matchingu na dokument na textech z OCR cache a skončí"
+    )
+    parser.add_argument(
+        "--no_lemmas",
+        action="store_true",
+        help="Vypne lemmatizaci (tabulka tvar → lemma z --build_lemmas)"
+    )
+    parser.add_argument(
+        "--build_lemmas",
+        action="store_true",
+        help=f"Vygeneruje tabulku tvar → lemma pro slova z pravidel do {os.path.basename(LEMMAS_PATH)} a skončí"
+    )
+    parser.add_argument(
+        "--diff_lemmas",
+        nargs="?",
+        const="",
+        metavar="TABULKA",
+        help="Nad texty z OCR cache vypíše každý výsledek, který se liší se starou tabulkou lemmat "
+             "(cesta k .bin) nebo bez lemmat (bez cesty) oproti aktuální tabulce, a skončí"
+    )
+    parser.add_argument(
+        "--lemmas_tsv",
+        type=str,
+        default=None,
+        help="Pro --build_lemmas: TSV 'tvar<TAB>lemma' z morfologického slovníku (např. MorfFlex)"
+    )
+    parser.add_argument(
+        "--similar",
+        type=str,
+        default=None,
+        help="Cesta ke screenshotu: vypíše nejpodobnější screenshoty podle OCR textu a skončí"
+    )
+    parser.add_argument(
+        "--top_n",
+        type=int,
+        default=10,
+        help="Pro --similar: kolik podobných screenshotů vypsat (výchozí 10)"
+    )
+    parser.add_argument(
+        "--diff_rules",
+        type=str,
+        default=None,
+        help="Cesta ke staré verzi categories_v1.py: porovná ji s aktuální nad OCR cache a skončí"
+    )
+    parser.add_argument(
+        "--diff_rules_new",
+        type=str,
+        default=None,
+        help="Pro --diff_rules: nová verze pravidel (výchozí: aktuální categories_v1.py)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Počet procesů pro --diff_rules (výchozí: počet jader)"
+    )
+    parser.add_argument(
+        "--reocr",
+        action="store_true",
+        help="Nepřiřazené screenshoty znovu přečte OCR ve vyšší kvalitě (pomalé, jen pro ně)"
+    )
+    parser.add_argument(
+        "--stages",
+        action="store_true",
+        help="Na konci vypíše počty a čas stupňů kategorizace (OCR, pravidla, fuzzy, re-OCR, klasifikátor)"
+    )
+    parser.add_argument(
+        "--watch_rules",
+        action="store_true",
+        help="Sleduje categories_v1.py a po úpravě pravidla za běhu přenačte (bez restartu)"
+    )
+    parser.add_argument(
+        "--trace",
+        type=str,
+        default=None,
+        help="Zapíše záznam rozhodnutí každého screenshotu (pravidlo, skóre, NEGATIVE_HINTS) do JSONL"
+    )
+    parser.add_argument(
+        "--query_traces",
+        type=str,
+        default=None,
+        help="Vypíše záznamy z JSONL souboru (z --trace), které splňují --filter, a skončí"
+    )
+    parser.add_argument(
+        "--filter",
+        action="append",
+        default=[],
+        help="Pro --query_traces: klíč=hodnota, např. hint_changed=true, category=Recepty, "
+             "decider=PRAVIDLO, matched=lego (lze opakovat)"
+    )
+    parser.add_argument(
+        "--phash_distance",
+        type=int,
+        default=6,
+        help="Vizuální duplikát: aspoň 2 ze 4 perceptuálních hashů (aHash, dHash, pHash, wHash) "
+             "se liší nejvýš o tolik bitů z 64 (0 = jen shodné, výchozí 6)"
+    )
+    parser.add_argument(
+        "--hash_algorithm",
+        choices=sorted(HASH_ALGORITHMS),
+        default=DEFAULT_ALGORITHM,
+        help="Algoritmus hashe obsahu souborů (výchozí md5; blake2b je rychlejší, "
+             "xxh64/xxh3_128 po pip install xxhash). Jiný algoritmus = nové klíče OCR cache"
+    )
+    parser.add_argument(
+        "--benchmark_hashes",
+        action="store_true",
+        help="Změří propustnost dostupných algoritmů hashe v MB/s na tomto stroji "
+             "(s --input_dir i čtení souborů po různých blocích) a skončí"
+    )
+    parser.add_argument(
+        "--benchmark_dedup_memory",
+        type=int,
+        metavar="N",
+        help="Změří paměť na záznam stavu deduplikace (slovníky vs. kompaktní pole) "
+             "pro N syntetických souborů a skončí"
+    )
+    parser.add_argument(
+        "--hash_chunk_mb",
+        type=float,
+        default=DEFAULT_CHUNK_SIZE / 2**20,
+        help="Velikost bloku čtení při hashování v MB (výchozí 1; pro USB HDD 1-4)"
+    )
+    parser.add_argument(
+        "--no_file_index",
+        action="store_true",
+        help="Vždy znovu spočítá hashe všech souborů (nepoužije index podle inode/velikosti/mtime)"
+    )
+    parser.add_argument(
+        "--find_duplicates",
+        action="store_true",
+        help="Najde identické i vizuálně shodné screenshoty v celé --input_dir, seskupí je "
+             "a pro každou skupinu vybere kopii, která zůstane (nejvyšší rozlišení, velikost, nejstarší)"
+    )
+    parser.add_argument(
+        "--text_similarity",
+        type=float,
+        default=0.6,
+        help="Textový duplikát: podobnost OCR textů (trojice slov, MinHash) aspoň tolik (výchozí 0.6, 0 = vypnuto)"
+    )
+    parser.add_argument(
+        "--library_dir",
+        action="append",
+        default=[],
+        help="Další zdrojová složka (jiný telefon, export), proti které se hledají duplicity (lze opakovat)"
+    )
+    parser.add_argument(
+        "--dest_dir",
+        type=str,
+        default=None,
+        help="Cílová složka s už zařazenými screenshoty (podsložky = kategorie); "
+             "co v ní už je, se znovu nezařazuje"
+    )
+    parser.add_argument(
+        "--duplicates_plan",
+        type=str,
+        default=None,
+        help="Pro --find_duplicates: uloží plán (která kopie zůstane, které smazat) do JSON souboru"
+    )
+    parser.add_argument(
+        "--mine_terms",
+        action="store_true",
+        help="Projde texty z OCR cache a vypíše slova a dvojice slov časté v Neprirazeno "
+             "a vzácné v zařazených kategoriích (kandidáti do CATEGORIES), pak skončí"
+    )
+    parser.add_argument(
+        "--build_rules",
+        action="store_true",
+        help="Zkompiluje pravidla do binárního artefaktu v cache složce a skončí "
+             "(jinak se to stane automaticky při první kategorizaci po změně pravidel)"
+    )
+    parser.add_argument(
+        "--no_ocr_cache",
+        action="store_true",
+        help="Vždy spustí OCR znovu (nepoužije ani neuloží cache OCR textů)"
+    )
+    parser.add_argument(
+        "--classifier",
+        action="store_true",
+        help="Nepřiřazené texty zkusí zařadit klasifikátorem z --train_classifier"
+    )
+    parser.add_argument(
+        "--classifier_threshold",
+        type=float,
+        default=0.6,
+        help="Minimální pravděpodobnost klasifikátoru pro zařazení (výchozí 0.6)"
+    )
+    parser.add_argument(
+        "--train_classifier",
+        action="store_true",
+        help="Natrénuje klasifikátor na textech z OCR cache (štítky z pravidel) a skončí"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Změří čas a počet zásahů každého pravidla a na konci vypíše report"
+    )
     args = parser.parse_args()
 
+    set_hash_algorithm(args.hash_algorithm)
+    HASH_CHUNK_SIZE = int(args.hash_chunk_mb * 2**20)
+    if args.cache_dir:
+        RULES_ARTIFACT_PATH = os.path.join(args.cache_dir, RULES_ARTIFACT_FILE)
+
+    for name, mode in TOOL_MODES:
+        if getattr(args, name) not in (None, False):
+            exit(mode(args))
+
+    if args.no_lemmas:
+        disable_lemmas()
+
+    for name, mode in CLI_MODES:
+        if getattr(args, name) not in (None, False):
+            exit(mode(args))
+
     input_dir = args.input_dir
 
     # ========================================================================
@@ -1174,5 +2904,28 @@ if __name__ == "__main__":
     dry_run_test(
         folder=input_dir, 
         sample=args.sample,
-        debug=args.debug
-    )
\ No newline at end of file
+        debug=args.debug,
+        cache_dir=args.cache_dir,
+        multi_label=args.multi_label,
+        top_k=args.top_k,
+        margin=args.margin,
+        use_ocr_cache=not args.no_ocr_cache,
+        categorize=CategorizeOptions(
+            profile=args.profile,
+            use_memo=not args.no_memo,
+            fuzzy=args.fuzzy,
+            reocr=args.reocr,
+            classifier=args.classifier,
+            classifier_threshold=args.classifier_threshold,
+            trace_path=args.trace,
+            stage_report=args.stages,
+            watch_rules=args.watch_rules,
+        ),
+        dedup=DedupOptions(
+            phash_distance=args.phash_distance,
+            use_file_index=not args.no_file_index,
+            library_dirs=args.library_dir,
+            dest_dir=args.dest_dir,
+            text_similarity=args.text_similarity,
+        ),
+    )
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Profiler kontextových pravidel a váhového systému.
+
+Sbírá pro každé pravidlo (PRAVIDLO 1–12) a pro každou kategorii z CATEGORIES:
+- kolikrát se vyhodnocovalo,
+- kolik času to celkem stálo,
+- kolikrát zabralo (pravidlo aktivováno / kategorie měla skóre > 0),
+- kolikrát právě ono rozhodlo o výsledné kategorii dokumentu.
+
+Když je profiler vypnutý (organizer drží None), categorize_text nedělá
+nic navíc kromě jednoho testu `is None` na pravidlo.
+"""
+
+from time import perf_counter
+
+
+class RuleStats:
+    """Počítadla pro jedno pravidlo nebo jednu kategorii váhového systému."""
+
+    __slots__ = ("evaluations", "total_time", "fires", "decisions")
+
+    def __init__(self):
+        self.evaluations = 0
+        self.total_time = 0.0
+        self.fires = 0
+        self.decisions = 0
+
+
+class RuleProfiler:
+    """
+    Sběr statistik pro categorize_text.
+
+    Klíče:
+        rules    - "PRAVIDLO 1" … "PRAVIDLO 12"
+        fallback - názvy kategorií z CATEGORIES (váhové bodování)
+        decisions - kdo rozhodl o dokumentu ("PRAVIDLO 3", "VAHY: Finance",
+                    "NEPRIRAZENO: prah", "NEPRIRAZENO: remiza" …)
+    """
+
+    clock = staticmethod(perf_counter)
+
+    def __init__(self):
+        self.rules = {}
+        self.fallback = {}
+        self.decisions = {}
+        self.documents = 0
+        self.total_time = 0.0
+        self.last_decision = None
+
+    def _stats(self, table, key):
+        stats = table.get(key)
+        if stats is None:
+            stats = table[key] = RuleStats()
+        return stats
+
+    def record_rule(self, name, elapsed, fired):
+        """Zaznamená jedno vyhodnocení kontextového pravidla."""
+        stats = self._stats(self.rules, name)
+        stats.evaluations += 1
+        stats.total_time += elapsed
+        if fired:
+            stats.fires += 1
+
+    def record_fallback(self, category, elapsed, score):
+        """Zaznamená bodování jedné kategorie ve váhovém systému."""
+        stats = self._stats(self.fallback, category)
+        stats.evaluations += 1
+        stats.total_time += elapsed
+        if score > 0:
+            stats.fires += 1
+
+    def record_decision(self, decider, elapsed):
+        """
+        Zaznamená, kdo o dokumentu rozhodl, a celkový čas categorize_text.
+        decider je název pravidla, "VAHY: <kategorie>" nebo "NEPRIRAZENO: <důvod>".
+        """
+        self.documents += 1
+        self.total_time += elapsed
+        self.decisions[decider] = self.decisions.get(decider, 0) + 1
+        self.last_decision = decider
+        if decider in self.rules:
+            self.rules[decider].decisions += 1
+        elif decider.startswith("VAHY: "):
+            category = decider[len("VAHY: "):]
+            if category in self.fallback:
+                self.fallback[category].decisions += 1
+
+    def report(self, limit=None):
+        """Vrátí textový report seřazený podle celkového času (sestupně)."""
+        lines = []
+        lines.append(f"⏱️  PROFIL KATEGORIZACE - dokumentů: {self.documents}, "
+                     f"celkem {self.total_time * 1000:.1f} ms")
+        if self.documents:
+            lines.append(f"   průměr na dokument: {self.total_time / self.documents * 1e6:.0f} µs")
+
+        for title, table in (("KONTEXTOVÁ PRAVIDLA", self.rules),
+                             ("VÁHOVÝ SYSTÉM (CATEGORIES)", self.fallback)):
+            if not table:
+                continue
+            lines.append("")
+            lines.append(f"   {title}")
+            lines.append(f"   {'název':<20} {'vyhodn.':>8} {'čas ms':>9} {'µs/vyh.':>8} "
+                         f"{'zabralo':>8} {'rozhodlo':>8}")
+            ordered = sorted(table.items(), key=lambda kv: kv[1].total_time, reverse=True)
+            for name, s in ordered[:limit]:
+                per_eval = s.total_time / s.evaluations * 1e6 if s.evaluations else 0.0
+                lines.append(f"   {name:<20} {s.evaluations:>8} {s.total_time * 1000:>9.2f} "
+                             f"{per_eval:>8.1f} {s.fires:>8} {s.decisions:>8}")
+
+        if self.decisions:
+            lines.append("")
+            lines.append("   KDO ROZHODL")
+            for decider, count in sorted(self.decisions.items(), key=lambda kv: kv[1], reverse=True):
+                share = count / self.documents * 100 if self.documents else 0.0
+                lines.append(f"   {decider:<32} {count:>6}  ({share:.1f}%)")
+        return "\n".join(lines)
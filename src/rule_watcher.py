@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Sledování souborů s pravidly (categories_v1.py…) pro dlouho běžící proces.
+
+Vlákno na pozadí jednou za interval porovná (mtime, velikost) sledovaných
+souborů a při změně spočítá otisk obsahu - pouhé "touch" nic nespustí.
+Změna se ohlásí až ve chvíli, kdy je soubor dva intervaly po sobě stejný
+(editor už dopsal), a callback běží ve vlákně watcheru, takže kategorizace
+v hlavním vlákně na přestavbu pravidel nečeká.
+"""
+
+import hashlib
+import os
+import threading
+
+
+def _file_state(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _file_digest(path):
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class RuleWatcher(threading.Thread):
+    """
+    paths     - sledované soubory
+    on_change - callback(path) volaný po ustálené změně obsahu souboru
+    on_error  - callback(path, výjimka), když on_change selže (stará pravidla zůstávají)
+    """
+
+    def __init__(self, paths, on_change, interval=1.0, on_error=None):
+        super().__init__(name="rule-watcher", daemon=True)
+        self.paths = list(paths)
+        self.on_change = on_change
+        self.on_error = on_error
+        self.interval = interval
+        self.reloads = 0
+        self._stop_event = threading.Event()
+        self._states = {path: _file_state(path) for path in self.paths}
+        self._digests = {path: _file_digest(path) for path in self.paths}
+        self._pending = {}
+
+    def check(self):
+        """Jeden průchod sledovanými soubory (volá ho run(), jde volat i ručně)."""
+        for path in self.paths:
+            state = _file_state(path)
+            if path in self._pending:
+                if state != self._pending[path]:
+                    self._pending[path] = state      # pořád se zapisuje, počkej
+                    continue
+                del self._pending[path]
+                digest = _file_digest(path)
+                self._states[path] = state
+                if digest is None or digest == self._digests[path]:
+                    continue
+                self._digests[path] = digest
+                try:
+                    self.on_change(path)
+                    self.reloads += 1
+                except Exception as e:
+                    if self.on_error is not None:
+                        self.on_error(path, e)
+            elif state != self._states[path]:
+                self._pending[path] = state
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.check()
+
+    def stop(self):
+        self._stop_event.set()
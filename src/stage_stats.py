@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Počty a čas jednotlivých stupňů kategorizace.
+
+Levné stupně (přesná pravidla) rozhodnou většinu dokumentů; dražší stupně
+(fuzzy, nové OCR ve vyšší kvalitě, klasifikátor) dostanou jen to, co
+předchozí stupeň nechal v Neprirazeno. Report ukáže, kolik dokumentů do
+kterého stupně vstoupilo, kolik jich tam bylo rozhodnuto a kolik to stálo.
+"""
+
+from time import perf_counter
+
+
+class StageStats:
+    """Statistiky stupňů: název → [vstoupilo, rozhodnuto, čas]."""
+
+    clock = staticmethod(perf_counter)
+
+    def __init__(self):
+        self.stages = {}
+
+    def record(self, stage, elapsed, decided=None):
+        """
+        Zaznamená jeden průchod dokumentu stupněm. decided=None znamená,
+        že stupeň o kategorii nerozhoduje (např. OCR).
+        """
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = [0, 0, 0.0, decided is not None]
+        stats[0] += 1
+        stats[2] += elapsed
+        if decided:
+            stats[1] += 1
+
+    def report(self):
+        lines = ["🪜 STUPNĚ KATEGORIZACE",
+                 f"   {'stupeň':<22} {'vstoupilo':>9} {'rozhodnuto':>10} {'čas ms':>10} {'µs/dok.':>9}"]
+        for stage in sorted(self.stages):
+            runs, decided, elapsed, decides = self.stages[stage]
+            per_doc = elapsed / runs * 1e6 if runs else 0.0
+            decided_str = str(decided) if decides else "-"
+            lines.append(f"   {stage:<22} {runs:>9} {decided_str:>10} {elapsed * 1000:>10.1f} {per_doc:>9.0f}")
+        return "\n".join(lines)
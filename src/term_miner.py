@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Streamové hledání častých slov a dvojic slov v nepřiřazených screenshotech.
+
+Kandidáti na nová klíčová slova jsou slova, která jsou častá v Neprirazeno
+a vzácná v už zařazených dokumentech. Paměť je omezená bez ohledu na počet
+dokumentů:
+- SpaceSaving drží jen `capacity` nejčastějších položek z Neprirazeno
+  (četnost je horní odhad, chyba je nejvýš `error`),
+- CountMinSketch odhaduje četnost libovolné položky v zařazených dokumentech
+  (pole depth × width čítačů, odhad je vždy ≥ skutečnosti).
+
+Počítá se dokumentová četnost: slovo opakované v jednom screenshotu se
+započítá jednou.
+"""
+
+import hashlib
+import heapq
+
+import numpy as np
+
+
+class SpaceSaving:
+    """Top-k nejčastějších položek proudu v paměti O(capacity) (Metwally a kol.)."""
+
+    def __init__(self, capacity=5000):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self._heap = []     # (count, item), zastaralé záznamy se přeskakují líně
+
+    def add(self, item):
+        counts = self.counts
+        count = counts.get(item)
+        if count is not None:
+            counts[item] = count + 1
+            heapq.heappush(self._heap, (count + 1, item))
+        elif len(counts) < self.capacity:
+            counts[item] = 1
+            self.errors[item] = 0
+            heapq.heappush(self._heap, (1, item))
+        else:
+            # nahradí položku s nejmenším počtem; nová dědí její počet jako chybu
+            heap = self._heap
+            while True:
+                low, victim = heapq.heappop(heap)
+                if counts.get(victim) == low:
+                    break
+            del counts[victim]
+            del self.errors[victim]
+            counts[item] = low + 1
+            self.errors[item] = low
+            heapq.heappush(heap, (low + 1, item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, i) for i, c in counts.items()]
+            heapq.heapify(self._heap)
+
+    def top(self, limit=None):
+        """[(položka, odhad četnosti, max. chyba)] sestupně podle četnosti."""
+        ordered = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)
+        return [(item, count, self.errors[item]) for item, count in ordered[:limit]]
+
+
+class CountMinSketch:
+    """
+    Odhad četností v poli depth × width (odhad ≥ skutečnost, chyba ~ N·e/width).
+
+    Sloupec v každém řádku je z vlastních 64 bitů jednoho BLAKE2b digestu, takže
+    řádky jsou nezávislé - kolize v jednom řádku nic neříká o ostatních a víc
+    řádků opravdu zpřesňuje odhad (CRC32 s různým počátečním stavem je afinní:
+    stejně dlouhé položky kolidující v jednom řádku kolidovaly ve všech).
+    """
+
+    def __init__(self, width=2 ** 18, depth=4):
+        if not 1 <= depth <= 8:
+            raise ValueError("depth musí být 1 až 8 (jeden 64bitový úsek digestu na řádek)")
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.uint32)
+        self._rows = np.arange(depth)
+
+    def _indexes(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=8 * self.depth).digest()
+        return [int.from_bytes(digest[8 * row:8 * row + 8], "little") % self.width for row in range(self.depth)]
+
+    def add_many(self, items):
+        """Přičte 1 každé položce z items (jeden NumPy zápis pro celou dávku)."""
+        if not items:
+            return
+        columns = np.array([self._indexes(item) for item in items], dtype=np.int64)   # (n, depth)
+        rows = np.broadcast_to(self._rows, columns.shape)
+        np.add.at(self.table, (rows.ravel(), columns.ravel()), 1)
+
+    def estimate(self, item):
+        return int(self.table[self._rows, self._indexes(item)].min())
+
+
+def document_terms(words, min_length=3):
+    """Unikátní slova a dvojice slov dokumentu (bez krátkých slov a čísel)."""
+    useful = [w if len(w) >= min_length and not w.isdigit() else None for w in words]
+    terms = {w for w in useful if w}
+    terms.update(f"{a} {b}" for a, b in zip(useful, useful[1:]) if a and b and a != b)
+    return terms
+
+
+class TermMiner:
+    """
+    Sbírá dokumentové četnosti slov/dvojic v Neprirazeno (SpaceSaving) a
+    v zařazených dokumentech (CountMinSketch).
+    known - slova/fráze, které už v pravidlech jsou (nebudou mezi kandidáty)
+    """
+
+    def __init__(self, known=(), capacity=5000, sketch_width=2 ** 18, sketch_depth=4):
+        self.known = frozenset(known)
+        self.unassigned = SpaceSaving(capacity)
+        self.assigned = CountMinSketch(sketch_width, sketch_depth)
+        self.unassigned_docs = 0
+        self.assigned_docs = 0
+
+    def add(self, words, assigned):
+        terms = document_terms(words)
+        if assigned:
+            self.assigned_docs += 1
+            self.assigned.add_many(list(terms))
+        else:
+            self.unassigned_docs += 1
+            for term in terms:
+                self.unassigned.add(term)
+
+    def candidates(self, limit=40, min_docs=3, min_lift=5.0):
+        """
+        Kandidáti na klíčová slova: [(slovo, v Neprirazeno, odhad v zařazených, lift)].
+        lift = podíl dokumentů v Neprirazeno / podíl v zařazených (s vyhlazením +1).
+        """
+        if not self.unassigned_docs:
+            return []
+        found = []
+        for term, count, error in self.unassigned.top():
+            if term in self.known or count - error < min_docs:
+                continue
+            in_assigned = self.assigned.estimate(term)
+            lift = (count / self.unassigned_docs) / ((in_assigned + 1) / (self.assigned_docs + 1))
+            if lift >= min_lift:
+                found.append((term, count, in_assigned, lift))
+            if len(found) >= limit:
+                break
+        return found
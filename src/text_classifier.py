@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Lehký lineární klasifikátor pro texty, které pravidla nechala v Neprirazeno.
+
+- příznaky: hashovaná slova a dvojice slov (zlib.crc32 → n_features košů),
+  hodnoty normalizované na jednotkovou délku; žádný slovník se neukládá,
+- model: multinomiální logistická regrese (softmax), jen NumPy,
+- trénink: minibatch SGD na textech, které pravidla zařadila s jistotou.
+
+Inference dávky dokumentů je jeden gather z matice vah + sečtení po dokumentech,
+takže na dokument stojí desítky µs (většinou hashování slov).
+"""
+
+import hashlib
+import os
+import zlib
+
+import numpy as np
+
+
+def _hash(term, n_features):
+    return zlib.crc32(term.encode("utf-8")) % n_features
+
+
+class HashedLinearClassifier:
+    """
+    Softmax klasifikátor nad hashovanými příznaky.
+
+    labels     - názvy kategorií (pořadí = sloupce matice vah)
+    n_features - počet košů pro hashování (kolize jsou u tohoto typu modelu v pořádku)
+    bigrams    - přidat dvojice sousedních slov ("meal prep", "pull request")
+    """
+
+    def __init__(self, labels, n_features=2 ** 16, bigrams=True):
+        self.labels = list(labels)
+        self.n_features = n_features
+        self.bigrams = bigrams
+        self.weights = np.zeros((n_features, len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+        self.fingerprint = None
+
+    # ----- příznaky -----
+
+    def features(self, words):
+        """Indexy košů jednoho dokumentu (bez opakování)."""
+        n = self.n_features
+        feats = {_hash(w, n) for w in words}
+        if self.bigrams:
+            feats.update(_hash(f"{a} {b}", n) for a, b in zip(words, words[1:]))
+        return feats
+
+    def featurize(self, docs):
+        """
+        Dávka dokumentů (seznamy slov) → řídká matice ve tvaru
+        (doc_ids, indices, values); values jsou 1/sqrt(počet příznaků dokumentu).
+        """
+        doc_ids, indices, values = [], [], []
+        for doc_id, words in enumerate(docs):
+            feats = self.features(words)
+            if not feats:
+                continue
+            value = 1.0 / len(feats) ** 0.5
+            indices.extend(feats)
+            doc_ids.extend([doc_id] * len(feats))
+            values.extend([value] * len(feats))
+        return (np.asarray(doc_ids, dtype=np.int64), np.asarray(indices, dtype=np.int64),
+                np.asarray(values, dtype=np.float32))
+
+    def _scores(self, n_docs, doc_ids, indices, values):
+        contrib = self.weights[indices] * values[:, None]
+        scores = np.empty((n_docs, len(self.labels)), dtype=np.float32)
+        for j in range(len(self.labels)):
+            scores[:, j] = np.bincount(doc_ids, weights=contrib[:, j], minlength=n_docs)
+        return scores + self.bias
+
+    @staticmethod
+    def _softmax(scores):
+        scores = scores - scores.max(axis=1, keepdims=True)
+        exp = np.exp(scores)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    # ----- inference -----
+
+    def predict_proba(self, docs):
+        """Pravděpodobnosti kategorií, matice (počet dokumentů × počet kategorií)."""
+        docs = list(docs)
+        doc_ids, indices, values = self.featurize(docs)
+        return self._softmax(self._scores(len(docs), doc_ids, indices, values))
+
+    def predict(self, docs, threshold=0.0):
+        """
+        Vrací seznam (kategorie, pravděpodobnost) pro každý dokument;
+        kategorie je None, pokud model není aspoň na threshold jistý.
+        """
+        proba = self.predict_proba(docs)
+        if not len(proba):
+            return []
+        best = proba.argmax(axis=1)
+        return [(self.labels[j] if p >= threshold else None, float(p))
+                for j, p in zip(best, proba[np.arange(len(best)), best])]
+
+    def explain(self, words, label, limit=3):
+        """Slova dokumentu, která nejvíc táhla k dané kategorii (pro matched_terms)."""
+        j = self.labels.index(label)
+        n = self.n_features
+        weighted = {w: float(self.weights[_hash(w, n), j]) for w in set(words)}
+        ranked = sorted((w for w in weighted if weighted[w] > 0), key=lambda w: weighted[w], reverse=True)
+        return ranked[:limit]
+
+    # ----- trénink -----
+
+    def fit(self, docs, labels, epochs=10, learning_rate=1.0, l2=1e-6, batch_size=64, seed=0):
+        """
+        Minibatch SGD na softmax cross-entropy. docs jsou seznamy slov, labels
+        názvy kategorií ze self.labels. Vrací průměrnou ztrátu poslední epochy.
+        """
+        docs = list(docs)
+        y = np.asarray([self.labels.index(label) for label in labels], dtype=np.int64)
+        rng = np.random.default_rng(seed)
+        loss = 0.0
+        for epoch in range(epochs):
+            order = rng.permutation(len(docs))
+            lr = learning_rate / (1.0 + epoch)
+            total = 0.0
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                doc_ids, indices, values = self.featurize([docs[i] for i in batch])
+                proba = self._softmax(self._scores(len(batch), doc_ids, indices, values))
+                rows = np.arange(len(batch))
+                total += float(-np.log(proba[rows, y[batch]] + 1e-12).sum())
+
+                grad = proba
+                grad[rows, y[batch]] -= 1.0
+                if len(indices):
+                    if l2:
+                        self.weights[indices] *= (1.0 - lr * l2)
+                    np.add.at(self.weights, indices, -lr * values[:, None] * grad[doc_ids])
+                self.bias -= lr * grad.sum(axis=0)
+            loss = total / len(docs) if docs else 0.0
+        return loss
+
+    # ----- uložení -----
+
+    @property
+    def digest(self):
+        """Otisk vah (mění se s každým přetrénováním)."""
+        hasher = hashlib.sha1(self.weights.tobytes())
+        hasher.update(self.bias.tobytes())
+        return hasher.hexdigest()
+
+    def save(self, path):
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(tmp_path, weights=self.weights, bias=self.bias,
+                            labels=np.asarray(self.labels), bigrams=np.asarray(self.bigrams),
+                            fingerprint=np.asarray(self.fingerprint or ""))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            weights = data["weights"]
+            model = cls([str(label) for label in data["labels"]], n_features=weights.shape[0],
+                        bigrams=bool(data["bigrams"]))
+            model.weights = weights.astype(np.float32)
+            model.bias = data["bias"].astype(np.float32)
+            model.fingerprint = str(data["fingerprint"]) or None
+        return model
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Invertovaný index OCR textů s BM25 pro hledání podobných screenshotů.
+
+Dokument = screenshot (klíč je hash souboru), slova jsou stejná normalizovaná
+a lemmatizovaná slova, se kterými pracuje categorize_text (prepare_text).
+Index se plní průběžně během běhu organizeru a ukládá se do .npz:
+postings všech slov jsou sloučené do dvou velkých polí + offsety.
+
+Posting list jednoho slova je array('i') (rychlé přidávání); při dotazu se
+zkopíruje do NumPy a skóre všech dokumentů se počítá vektorově.
+"""
+
+import math
+import os
+from array import array
+from collections import Counter
+
+import numpy as np
+
+
+class Bm25Index:
+    """
+    BM25 index: slovo → (id dokumentů, četnosti).
+
+    version - otisk tokenizace (verze OCR + tabulky lemmat); starý index
+              s jinou verzí se při load() zahodí
+    """
+
+    def __init__(self, version, path=None, k1=1.2, b=0.75):
+        self.version = version
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.keys = []          # id dokumentu → hash souboru
+        self.names = []         # id dokumentu → jméno souboru
+        self.key_to_id = {}
+        self.lengths = array("i")
+        self.postings = {}      # slovo → (array doc_ids, array tfs)
+        self._norm = None       # cache k1 * (1 - b + b * délka / průměr)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.key_to_id
+
+    def add(self, key, name, words):
+        """Přidá dokument (seznam slov). Už zaindexovaný klíč se přeskočí. Vrací True, pokud přidal."""
+        if key in self.key_to_id:
+            return False
+        doc_id = len(self.keys)
+        self.key_to_id[key] = doc_id
+        self.keys.append(key)
+        self.names.append(name or key[:12])
+        self.lengths.append(len(words))
+        postings = self.postings
+        for word, tf in Counter(words).items():
+            entry = postings.get(word)
+            if entry is None:
+                entry = postings[word] = (array("i"), array("i"))
+            entry[0].append(doc_id)
+            entry[1].append(tf)
+        self._norm = None
+        return True
+
+    def _idf(self, df):
+        n = len(self.keys)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, words, top_n=10, exclude=None, max_terms=32):
+        """
+        Top-N dokumentů podle BM25 pro dotaz (seznam slov).
+        Použije se nejvýš max_terms nejvzácnějších slov dotazu (nejvyšší idf).
+        Vrací [(klíč, jméno, skóre)] sestupně.
+        """
+        n = len(self.keys)
+        if not n:
+            return []
+        terms = [w for w in set(words) if w in self.postings]
+        terms.sort(key=lambda w: len(self.postings[w][0]))
+        terms = terms[:max_terms]
+        if not terms:
+            return []
+
+        if self._norm is None:
+            lengths = np.array(self.lengths, dtype=np.float32)
+            avgdl = float(lengths.mean()) or 1.0
+            self._norm = self.k1 * (1.0 - self.b + self.b * lengths / avgdl)
+        norm = self._norm
+
+        scores = np.zeros(n, dtype=np.float32)
+        for term in terms:
+            doc_ids, tfs = self.postings[term]
+            ids = np.array(doc_ids, dtype=np.int64)
+            tf = np.array(tfs, dtype=np.float32)
+            # id v jednom posting listu jsou unikátní → stačí fancy-index +=
+            scores[ids] += self._idf(len(ids)) * tf * (self.k1 + 1.0) / (tf + norm[ids])
+
+        if exclude is not None and exclude in self.key_to_id:
+            scores[self.key_to_id[exclude]] = 0.0
+        top_n = min(top_n, n)
+        best = np.argpartition(-scores, top_n - 1)[:top_n]
+        best = best[np.argsort(-scores[best])]
+        return [(self.keys[i], self.names[i], float(scores[i])) for i in best if scores[i] > 0]
+
+    def load(self):
+        """Načte index z disku, pokud sedí verze. Vrací počet dokumentů."""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data["version"]) != self.version:
+                    return 0
+                self.keys = [str(k) for k in data["keys"]]
+                self.names = [str(name) for name in data["names"]]
+                self.lengths = array("i", data["lengths"].astype(np.int32).tobytes())
+                terms = data["terms"]
+                offsets = data["offsets"]
+                doc_ids = data["doc_ids"].astype(np.int32)
+                tfs = data["tfs"].astype(np.int32)
+        except (OSError, ValueError, KeyError):
+            return 0
+        self.key_to_id = {key: i for i, key in enumerate(self.keys)}
+        self.postings = {}
+        for i, term in enumerate(terms):
+            start, end = offsets[i], offsets[i + 1]
+            self.postings[str(term)] = (array("i", doc_ids[start:end].tobytes()),
+                                        array("i", tfs[start:end].tobytes()))
+        self._norm = None
+        return len(self.keys)
+
+    def save(self):
+        """Uloží index (atomicky přes dočasný soubor)."""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        terms = list(self.postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        for i, term in enumerate(terms):
+            offsets[i + 1] = offsets[i] + len(self.postings[term][0])
+        doc_ids = np.frombuffer(b"".join(self.postings[t][0].tobytes() for t in terms), dtype=np.int32)
+        tfs = np.frombuffer(b"".join(self.postings[t][1].tobytes() for t in terms), dtype=np.int32)
+        tmp_path = self.path + ".tmp.npz"
+        np.savez(tmp_path, version=np.asarray(self.version), keys=np.asarray(self.keys, dtype=str),
+                 names=np.asarray(self.names, dtype=str), lengths=np.array(self.lengths, dtype=np.int32),
+                 terms=np.asarray(terms, dtype=str), offsets=offsets, doc_ids=doc_ids, tfs=tfs)
+        os.replace(tmp_path, self.path)
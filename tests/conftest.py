@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+import importlib.util
+import os
+import sys
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC)
+
+
+@pytest.fixture(scope="session")
+def organizer(tmp_path_factory):
+    """organizer_1.2.py jako modul; artefakt pravidel do dočasné složky, ne do ~/.screenshots_organizer."""
+    spec = importlib.util.spec_from_file_location("organizer", os.path.join(SRC, "organizer_1.2.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.RULES_ARTIFACT_PATH = str(tmp_path_factory.mktemp("cache") / module.RULES_ARTIFACT_FILE)
+    return module
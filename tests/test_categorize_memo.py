@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from categorize_memo import CategorizeMemo
+
+RULES_FILE = '''
+from categories_v1 import CATEGORIES as _BASE, WORD_WEIGHTS, SOCIAL_MEDIA_UI_KEYWORDS
+CATEGORIES = dict(_BASE, Recepty=list(_BASE["Recepty"]) + ["lecso"])
+'''
+
+
+@pytest.fixture
+def memo(organizer, tmp_path):
+    saved = organizer.get_ruleset()
+    memo = organizer.enable_memo(str(tmp_path / "memo.json"))
+    yield memo
+    organizer.MEMO = None
+    organizer.activate_ruleset(saved)
+
+
+def test_copies_differing_in_ui_hit_memo(organizer, memo):
+    first = organizer.categorize_text("Recept na bramborovou polévku")
+    again = organizer.categorize_text("Like Share Recept na bramborovou polévku 10,2k")
+    assert again == first and (memo.hits, memo.misses) == (1, 1)
+
+
+def test_saved_memo_dropped_after_rule_change(organizer, memo, tmp_path):
+    organizer.categorize_text("recept na polevku")
+    memo.save()
+    assert CategorizeMemo(organizer.ruleset_fingerprint(), memo.path).load() == 1
+
+    path = tmp_path / "categories_new.py"
+    path.write_text(RULES_FILE, encoding="utf-8")
+    organizer.reload_rules(str(path))
+    assert len(memo.entries) == 0 and memo.fingerprint == organizer.ruleset_fingerprint()
+    assert CategorizeMemo(organizer.ruleset_fingerprint(), memo.path).load() == 0
+
+
+def test_put_from_before_clear_is_dropped():
+    memo = CategorizeMemo("pravidla-1")
+    key, cached = memo.get("recept na polevku")
+    assert cached is None
+    memo.clear("pravidla-2")
+    memo.put(key, ("Recepty", ["recept"]))
+    assert len(memo.entries) == 0
+    memo.put(memo.key("recept na polevku"), ("Recepty", ["recept"]))
+    assert memo.get("recept na polevku")[1] == ("Recepty", ["recept"])
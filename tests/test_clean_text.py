@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+TEXTS = [
+    "Recept na bramborovou polévku – 2 porce",
+    "Like Comment Share 10,2k 1.1m To se mi líbí",
+    "Follow @zahrada.cz #gardening #DIY!!! Odebírat",
+    "Čtvrtek 12:45 ŽLUŤOUČKÝ kůň úpěl ďábelské ódy",
+    "emoji 🍲 a azbuka Привет, ligatura ﬁ, řecké Ωmega",
+    "   \n\t  ",
+    "[CHYBA: tesseract]",
+]
+
+
+def _chain(organizer, text):
+    norm_text = organizer.normalize_text_simple(organizer.filter_social_media_ui_text(text))
+    return norm_text, organizer.tokenize_words(norm_text)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_clean_text_matches_original_chain(organizer, text):
+    assert organizer.clean_text(text) == _chain(organizer, text)
+
+
+def test_benchmark_reports_no_mismatches(organizer):
+    result = organizer.benchmark_text_cleaning(TEXTS, repeat=1)
+    assert result["documents"] == len(TEXTS) and result["mismatches"] == 0
+
+
+def test_ui_words_and_metrics_are_dropped(organizer):
+    assert organizer.clean_text("Like Comment Share 10,2k 1.1m To se mi líbí")[0] == "to se mi libi"
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import random
+
+import numpy as np
+
+from compact_state import DigestColumn, SortedMultiMap, pack_digest
+from dedup import LibraryCatalog
+
+
+def test_sorted_multimap_keeps_insertion_order_across_runs():
+    rng = random.Random(3)
+    multimap = SortedMultiMap(np.int64, merge_every=7)
+    expected = {}
+    for value in range(5000):
+        key = rng.randrange(300)
+        multimap.add(key, value)
+        expected.setdefault(key, []).append(value)
+    assert len(multimap) == 5000
+    assert all(multimap.get(key) == values for key, values in expected.items())
+    assert multimap.get(1000) == []
+    # běhy po dvojnásobcích - jen logaritmicky mnoho
+    sizes = [len(keys) for keys, _ in multimap._runs]
+    assert len(sizes) <= 12 and sizes == sorted(sizes, reverse=True)
+
+
+def test_digest_column_computes_unknown_once():
+    column = DigestColumn()
+    column.append("md5:" + "ab" * 16)
+    column.append()
+    calls = []
+    assert column.get(0, lambda: calls.append(0)) == pack_digest("ab" * 16)
+    assert column.get(1, lambda: calls.append(1) or "cd" * 16) == bytes.fromhex("cd" * 16)
+    assert column.get(1, lambda: calls.append(1)) == bytes.fromhex("cd" * 16)
+    assert calls == [1]
+
+
+def test_catalog_compares_packed_digests():
+    computed = []
+
+    def edge_of(path):
+        computed.append(path)
+        return "11" * 16
+
+    catalog = LibraryCatalog(edge_of=edge_of, hash_of=lambda path: "22" * 16 if path == "new" else "33" * 16)
+    catalog.add("known", 10 ** 6, edge="11" * 16, digest="22" * 16)
+    catalog.add("other", 10 ** 6, edge="11" * 16, digest="44" * 16)
+    assert catalog.find_exact("new", 10 ** 6) == "known"
+    assert computed == ["new"]
+    assert catalog.find_exact("new", 5) is None
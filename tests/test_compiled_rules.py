@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import os
+import subprocess
+import sys
+
+from compiled_rules import MAGIC, load_artifact, write_artifact
+
+DIGEST = "a" * 40
+
+
+def test_artifact_round_trip(tmp_path):
+    path = str(tmp_path / "rules.bin")
+    compiled = {"rules": ({"name": "x", "very_specific": (("Lego", "lego"),)},), "words": frozenset({"lego"})}
+    size = write_artifact(path, DIGEST, compiled)
+    assert size == (tmp_path / "rules.bin").stat().st_size
+    assert load_artifact(path, DIGEST) == compiled
+    assert load_artifact(path, "b" * 40) is None
+
+
+def test_broken_or_missing_artifact(tmp_path):
+    path = tmp_path / "rules.bin"
+    assert load_artifact(str(path), DIGEST) is None
+    path.write_bytes(MAGIC + DIGEST.encode("ascii") + b"\xff\x00")
+    assert load_artifact(str(path), DIGEST) is None
+
+
+def test_digest_covers_marshal_version(organizer, monkeypatch):
+    digest = organizer.rules_digest()
+    monkeypatch.setattr(organizer.marshal, "version", organizer.marshal.version + 1)
+    assert organizer.rules_digest() != digest
+
+
+def test_import_defers_rules(organizer):
+    # samotný import nenačte categories_v1, lemmata ani tabulku diakritiky
+    code = ("import importlib.util, os, sys; sys.path.insert(0, sys.argv[1]);"
+            "spec = importlib.util.spec_from_file_location('organizer', os.path.join(sys.argv[1], 'organizer_1.2.py'));"
+            "m = importlib.util.module_from_spec(spec); spec.loader.exec_module(m);"
+            "print('categories_v1' in sys.modules, m.ACTIVE_RULESET is None, m._DIACRITICS_TABLE is None)")
+    src = os.path.dirname(organizer.__file__)
+    out = subprocess.run([sys.executable, "-c", code, src], capture_output=True, text=True, check=True).stdout
+    assert out.split() == ["False", "True", "True"]
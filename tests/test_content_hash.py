@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import hashlib
+
+import pytest
+
+from content_hash import ALGORITHMS, benchmark, hash_id, new_hasher
+
+DATA = b"screenshot" * 1000
+
+
+@pytest.mark.parametrize("algorithm, reference", [
+    ("md5", hashlib.md5),
+    ("sha1", hashlib.sha1),
+    ("blake2b", lambda: hashlib.blake2b(digest_size=16)),
+])
+def test_hasher_matches_hashlib(algorithm, reference):
+    hasher = new_hasher(algorithm)
+    hasher.update(DATA)
+    expected = reference()
+    expected.update(DATA)
+    assert hasher.hexdigest() == expected.hexdigest()
+
+
+def test_unknown_algorithm():
+    with pytest.raises(ValueError):
+        new_hasher("crc1")
+
+
+def test_hash_id_keeps_md5_unprefixed():
+    assert hash_id("md5", "abc") == "abc"
+    assert hash_id("blake2b", "abc") == "blake2b:abc"
+
+
+def test_benchmark_covers_requested_algorithms():
+    result = benchmark(size=1 << 20, algorithms=["md5", "blake2b"], repeat=1)
+    assert set(result) == {"md5", "blake2b"} and all(speed > 0 for speed in result.values())
+    assert set(benchmark(size=1 << 20, repeat=1)) == set(ALGORITHMS)
+
+
+def test_organizer_file_hash_ids(organizer, tmp_path):
+    path = tmp_path / "a.png"
+    path.write_bytes(DATA)
+    assert organizer.calculate_file_hash(str(path)) == hashlib.md5(DATA).hexdigest()
+    organizer.set_hash_algorithm("blake2b")
+    try:
+        assert organizer.calculate_file_hash(str(path)) == "blake2b:" + hashlib.blake2b(DATA, digest_size=16).hexdigest()
+        with pytest.raises(ValueError):
+            organizer.set_hash_algorithm("crc1")
+        assert organizer.HASH_ALGORITHM == "blake2b"
+    finally:
+        organizer.set_hash_algorithm("md5")
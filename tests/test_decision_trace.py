@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from decision_trace import DecisionTrace, TraceWriter, match_trace, parse_filters, query_traces
+
+TEXTS = {
+    "recept.png": "recept na bramborovou polevku",
+    "zahrada.png": "zahradni nastroje",
+    "prazdny.png": "nic tu neni",
+    "hint.png": "python developer zahrada",     # bez NEGATIVE_HINTS by vyhrálo IT_Prace
+}
+
+
+@pytest.fixture
+def traces(organizer, monkeypatch, tmp_path):
+    monkeypatch.setattr(organizer, "MEMO", None)
+    path = str(tmp_path / "traces.jsonl")
+    writer = organizer.enable_tracing(path, batch_size=2)
+    try:
+        for doc, text in TEXTS.items():
+            organizer.categorize_text(text, doc_id=doc)
+        assert writer.written == 4     # dvě plné dávky už zapsané
+        writer.close()
+    finally:
+        organizer.TRACER = None
+    return path
+
+
+def test_trace_per_document(traces):
+    by_doc = {data["doc"]: data for data in query_traces(traces, [])}
+    assert list(by_doc) == list(TEXTS)
+    assert by_doc["recept.png"]["decider"] == "PRAVIDLO 1" and by_doc["recept.png"]["stage"] == "pravidla"
+    assert by_doc["zahrada.png"]["decider"] == "VAHY: Zahrada"
+    assert by_doc["hint.png"]["penalties"] == {"IT_Prace": 2}
+
+
+@pytest.mark.parametrize("filters, docs", [
+    (["hint_changed=true"], ["hint.png"]),
+    (["category=Neprirazeno"], ["prazdny.png", "hint.png"]),
+    (["decider=NEPRIRAZENO"], ["prazdny.png", "hint.png"]),
+    (["decider=VAHY", "matched=nastroje"], ["zahrada.png"]),
+    (["scores=IT_Prace", "hint_changed=false"], []),
+])
+def test_query_traces_filters(traces, filters, docs):
+    assert [data["doc"] for data in query_traces(traces, parse_filters(filters))] == docs
+
+
+def test_parse_filters_requires_key_value():
+    with pytest.raises(ValueError):
+        parse_filters(["category"])
+
+
+def test_writer_starts_new_file(tmp_path):
+    path = str(tmp_path / "traces.jsonl")
+    writer = TraceWriter(path)
+    trace = DecisionTrace("a.png", "text")
+    trace.category = "Recepty"
+    writer.record(trace)
+    writer.close()
+    TraceWriter(path).close()
+    assert query_traces(path, []) == []
+    assert match_trace(trace.to_dict(), [("doc", "a.png")])
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+OLD_RULES = '''
+from categories_v1 import CATEGORIES as _BASE, WORD_WEIGHTS as _WEIGHTS, SOCIAL_MEDIA_UI_KEYWORDS
+CATEGORIES = dict(_BASE, Recepty=list(_BASE["Recepty"]) + ["lecso"])
+WORD_WEIGHTS = dict(_WEIGHTS, lecso=5)
+'''
+
+TEXTS = ["lecso s klobasou", "recept na polevku", "lecso s klobasou", "zahradni nastroje", "nic tu neni"]
+NAMES = ["a.png", "b.png", "c.png", "d.png", "e.png"]
+
+
+def test_diff_rules_transitions(organizer, tmp_path):
+    path = tmp_path / "categories_old.py"
+    path.write_text(OLD_RULES, encoding="utf-8")
+    active = organizer.get_ruleset()
+
+    report = organizer.diff_rules(str(path), TEXTS, NAMES, workers=1, chunk_size=2)
+    assert organizer.get_ruleset() is active
+    assert (report["documents"], report["unique"], report["changed"]) == (5, 4, 2)
+    assert report["transitions"] == {("Recepty", "Neprirazeno"): 2}
+    assert report["examples"][("Recepty", "Neprirazeno")] == ["a.png", "c.png"]
+    assert report["unchanged"] == {"Recepty": 1, "Zahrada": 1, "Neprirazeno": 1}
+
+
+def test_same_rules_change_nothing(organizer):
+    report = organizer.diff_rules(organizer.CATEGORIES_PATH, TEXTS, NAMES, workers=1)
+    assert report["changed"] == 0 and sum(report["unchanged"].values()) == len(TEXTS)
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from dedup import UnionFind, duplicate_plan
+
+
+def test_union_find_groups_chains():
+    sets = UnionFind()
+    for a, b in [("a", "b"), ("c", "d"), ("b", "c"), ("x", "y")]:
+        sets.union(a, b)
+    sets.find("alone")
+    groups = sorted(sorted(group) for group in sets.groups())
+    assert groups == [["a", "b", "c", "d"], ["x", "y"]]
+
+
+def test_chain_ends_in_one_group_keeping_best_copy():
+    edges = [("a.png", "b.png", "identické"), ("b.png", "c.png", "vizuální"), ("c.png", "d.png", "vizuální")]
+    meta = {
+        "a.png": {"width": 720, "height": 1280, "size": 300, "mtime": 1},
+        "b.png": {"width": 720, "height": 1280, "size": 300, "mtime": 2},
+        "c.png": {"width": 1080, "height": 1920, "size": 200, "mtime": 3},   # nejvyšší rozlišení
+        "d.png": {"width": 1080, "height": 1920, "size": 100, "mtime": 0},
+    }
+    (entry,) = duplicate_plan(edges, meta)
+    assert entry["keep"] == "c.png"
+    assert sorted(entry["remove"]) == ["a.png", "b.png", "d.png"]
+    assert entry["kinds"] == {"identické": 1, "vizuální": 2}
+    assert entry["reclaim"] == 700
+
+
+def test_keep_order_filed_then_size_then_age():
+    meta = {
+        "new.png": {"width": 1080, "height": 1920, "size": 500, "mtime": 5},
+        "filed.png": {"width": 720, "height": 1280, "size": 100, "mtime": 9, "filed": True},
+        "big.png": {"width": 10, "height": 10, "size": 900, "mtime": 1},
+        "small_old.png": {"width": 10, "height": 10, "size": 800, "mtime": 0},
+        "old.png": {"width": 10, "height": 10, "size": 900, "mtime": 0},
+    }
+    plan = duplicate_plan([("new.png", "filed.png", "vizuální"),
+                           ("big.png", "small_old.png", "identické"), ("big.png", "old.png", "identické")], meta)
+    # větší skupina první; zařazená kopie vyhrává nad vyšším rozlišením, pak velikost, pak nejstarší
+    assert [entry["keep"] for entry in plan] == ["old.png", "filed.png"]
+    assert plan[0]["remove"] == ["big.png", "small_old.png"]
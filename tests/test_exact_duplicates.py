@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+
+import pytest
+
+from dedup import find_exact_duplicates
+
+EDGE = 16
+
+
+@pytest.fixture
+def files(tmp_path):
+    body = bytes(range(256))
+    contents = {
+        "original.png": body,
+        "copy.png": body,
+        "middle.png": body[:100] + b"X" + body[101:],    # stejné okraje, jiný střed
+        "header.png": b"Y" + body[1:],                    # stejná velikost, jiná hlavička
+        "unique.png": body + b"!",                        # jediná se svou velikostí
+        "small_a.png": b"abc",
+        "small_b.png": b"abc",
+    }
+    paths = []
+    for name, data in contents.items():
+        path = tmp_path / name
+        path.write_bytes(data)
+        paths.append((str(path), len(data)))
+    return paths
+
+
+def _md5(reads):
+    def full_hash(path):
+        reads.append(os.path.basename(path))
+        with open(path, "rb") as f:
+            return hashlib.md5(f.read()).hexdigest()
+    return full_hash
+
+
+def test_groups_and_reads(files):
+    reads = []
+    groups, computed, stats = find_exact_duplicates(files, _md5(reads), edge_bytes=EDGE)
+    names = [[os.path.basename(path) for path in group] for group in groups]
+    assert names == [["original.png", "copy.png"], ["small_a.png", "small_b.png"]]
+    # celý obsah jen u souborů se stejnou velikostí i okraji; malé soubory pokryly okraje
+    assert sorted(reads) == ["copy.png", "middle.png", "original.png"]
+    assert stats["size_groups"] == 2 and stats["edge_reads"] == 6 and stats["full_reads"] == 3
+    assert stats["bytes_read"] == 4 * 2 * EDGE + 2 * 3 + 3 * 256
+    assert "unique.png" not in {os.path.basename(path) for path in computed}
+
+
+def test_known_values_are_not_recomputed(files):
+    _, computed, _ = find_exact_duplicates(files, _md5([]), edge_bytes=EDGE)
+    reads = []
+    groups, again, stats = find_exact_duplicates(files, _md5(reads), edge_bytes=EDGE, known=computed)
+    assert reads == [] and again == {} and stats["bytes_read"] == 0
+    assert len(groups) == 2
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from file_index import FileIdentityIndex
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "a.png"
+    path.write_bytes(b"obsah")
+    return path
+
+
+def test_lookup_survives_rename_not_content_change(image, tmp_path):
+    index = FileIdentityIndex("md5|v1")
+    index.record(str(image), hash="h1", phash=7)
+    renamed = tmp_path / "b.png"
+    os.rename(image, renamed)
+    assert index.lookup(str(renamed)) == {"hash": "h1", "phash": 7, "name": "b.png"}
+
+    renamed.write_bytes(b"jiny obsah")
+    st = os.stat(renamed)
+    os.utime(renamed, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert index.lookup(str(renamed)) is None
+    assert (index.hits, index.misses) == (1, 1)
+
+
+def test_record_keeps_known_values(image):
+    index = FileIdentityIndex("md5|v1")
+    index.record(str(image), hash="h1")
+    entry = index.record(str(image), hash=None, width=1080)
+    assert entry == {"hash": "h1", "width": 1080, "name": "a.png"}
+
+
+def test_journal_replayed_after_crash(image, tmp_path):
+    path = str(tmp_path / "file_index.json")
+    index = FileIdentityIndex("md5|v1", path, batch_size=1)
+    index.record(str(image), hash="h1")            # dávka 1 → hned do deníku
+    assert os.path.exists(path + ".log") and not os.path.exists(path)
+    with open(path + ".log", "a", encoding="utf-8") as f:
+        f.write('["useknuty')                       # pád uprostřed zápisu
+
+    reloaded = FileIdentityIndex("md5|v1", path)
+    assert reloaded.load() == 1
+    assert reloaded.lookup(str(image))["hash"] == "h1"
+    reloaded.save()
+    assert not os.path.exists(path + ".log")
+    assert FileIdentityIndex("md5|v1", path).load() == 1
+
+
+def test_other_version_is_dropped(image, tmp_path):
+    path = str(tmp_path / "file_index.json")
+    index = FileIdentityIndex("md5|v1", path, batch_size=1)
+    index.record(str(image), hash="h1")
+    assert FileIdentityIndex("blake2b|v1", path).load() == 0
+    assert not os.path.exists(path + ".log")
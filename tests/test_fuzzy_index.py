@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from fuzzy_index import DeletionIndex, edit_distance
+
+WORDS = ["recept", "montessori", "zahrada", "kvetiny", "svacina", "bramborova", "polevka", "hra"]
+
+
+@pytest.mark.parametrize("token, expected", [
+    ("recept", ("recept", 0)),
+    ("rec1pt", ("recept", 1)),      # záměna
+    ("montesori", ("montessori", 1)),   # vypadlý znak
+    ("zahdara", None),              # dvě chyby nad max_distance
+    ("zhardaa", None),
+    ("kvetinny", ("kvetiny", 1)),   # vložený znak
+    ("svaicna", ("svacina", 1)),    # prohozené sousední znaky
+    ("hrx", None),                  # kratší než min_length se neopravuje
+    ("12345", None),
+])
+def test_lookup(token, expected):
+    assert DeletionIndex(WORDS).lookup(token) == expected
+
+
+def test_ambiguous_correction_is_rejected():
+    index = DeletionIndex(["kocka", "kopka"])
+    assert index.lookup("kotka") is None
+    assert index.lookup("kockz") == ("kocka", 1)
+
+
+def test_lookup_matches_brute_force():
+    rng = random.Random(4)
+    alphabet = "abcdeiklmnoprstuvz"
+    words = {"".join(rng.choice(alphabet) for _ in range(rng.randint(5, 9))) for _ in range(300)}
+    index = DeletionIndex(words, max_distance=2)
+    for _ in range(300):
+        token = list(rng.choice(sorted(words)))
+        for _ in range(rng.randint(0, 3)):
+            token[rng.randrange(len(token))] = rng.choice(alphabet)
+        token = "".join(token)
+        distances = {word: edit_distance(token, word, 2) for word in words}
+        best = min(distances.values())
+        closest = [word for word, distance in distances.items() if distance == best]
+        expected = (closest[0], best) if best <= 2 and len(closest) == 1 else None
+        assert index.lookup(token) == expected
+
+
+def test_correct_tokens_reports_only_changes():
+    corrected, corrections = DeletionIndex(WORDS).correct_tokens(["rec1pt", "na", "polevka"])
+    assert corrected == ["recept", "na", "polevka"]
+    assert corrections == {"rec1pt": "recept"}
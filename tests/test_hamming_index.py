@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from hamming_index import HammingIndex, NearDuplicateIndex, hamming_distance
+
+
+def _flip(rng, value, bits):
+    for position in rng.sample(range(64), bits):
+        value ^= 1 << position
+    return value
+
+
+def _examined_per_query(n, queries=200, seed=1):
+    rng = random.Random(seed)
+    values = [rng.getrandbits(64) for _ in range(n)]
+    index = HammingIndex(max_distance=6)
+    for i, value in enumerate(values):
+        index.add(value, i)
+    for _ in range(queries):
+        index.query(_flip(rng, rng.choice(values), rng.randint(0, 6)))
+    return index.examined / queries
+
+
+def test_candidates_grow_sublinearly():
+    small, large = _examined_per_query(2000), _examined_per_query(128000)
+    # 64× víc hashů; pevné úseky k + 1 po 9 bitech by prověřily ~64× víc kandidátů
+    assert large / small < 16
+    assert large < 128000 * 7 / 512 / 4
+
+
+def test_query_matches_brute_force():
+    rng = random.Random(2)
+    # shluky podobných hashů jako u skoro bílých screenshotů
+    centers = [rng.getrandbits(64) for _ in range(20)]
+    values = [_flip(rng, rng.choice(centers), rng.randint(0, 10)) for _ in range(5000)]
+    index = HammingIndex(max_distance=6)
+    for i, value in enumerate(values):
+        index.add(value, i)
+    for _ in range(100):
+        probe = _flip(rng, rng.choice(centers), rng.randint(0, 4))
+        for k in (0, 3, 6):
+            expected = sorted(i for i, value in enumerate(values) if hamming_distance(probe, value) <= k)
+            assert sorted(i for i, _ in index.query(probe, k)) == expected
+
+
+def test_pair_agreeing_only_on_ahash_and_whash():
+    rng = random.Random(3)
+    original = {name: rng.getrandbits(64) for name in ("ahash", "dhash", "phash", "whash")}
+    # dHash a pHash úplně jiné (např. posunutý status bar), aHash a wHash skoro stejné
+    copy = {"ahash": _flip(rng, original["ahash"], 2), "dhash": rng.getrandbits(64),
+            "phash": rng.getrandbits(64), "whash": _flip(rng, original["whash"], 3)}
+    index = NearDuplicateIndex(max_distance=6)
+    index.add(original, "original.png")
+    for i in range(200):
+        index.add({name: rng.getrandbits(64) for name in original}, f"other{i}.png")
+    assert index.nearest(copy)[:2] == ("original.png", 2)
+
+
+def test_too_few_indexed_hashes_rejected():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(indexed=("phash", "dhash"))
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+
+import pytest
+
+from content_hash import hash_file, hash_file_simple
+
+CHUNK = 4096
+
+
+@pytest.mark.parametrize("size", [0, 1, CHUNK - 1, CHUNK, CHUNK + 1, 3 * CHUNK + 17])
+@pytest.mark.parametrize("mmap_threshold", [None, 1])
+def test_hash_file_matches_hashlib(tmp_path, size, mmap_threshold):
+    data = os.urandom(size)
+    path = tmp_path / "a.bin"
+    path.write_bytes(data)
+    hasher = hash_file(str(path), hashlib.md5(), chunk_size=CHUNK, mmap_threshold=mmap_threshold)
+    assert hasher.hexdigest() == hashlib.md5(data).hexdigest()
+    assert hash_file_simple(str(path), hashlib.md5(), chunk_size=CHUNK).hexdigest() == hasher.hexdigest()
+
+
+def test_reused_buffer_does_not_leak_between_files(tmp_path):
+    # druhý, kratší soubor čte do stejného bufferu - zbytek prvního se nesmí započítat
+    long_path, short_path = tmp_path / "long.bin", tmp_path / "short.bin"
+    long_path.write_bytes(b"x" * (CHUNK + 100))
+    short_path.write_bytes(b"y" * 10)
+    hash_file(str(long_path), hashlib.sha1(), chunk_size=CHUNK, mmap_threshold=None)
+    hasher = hash_file(str(short_path), hashlib.sha1(), chunk_size=CHUNK, mmap_threshold=None)
+    assert hasher.hexdigest() == hashlib.sha1(b"y" * 10).hexdigest()
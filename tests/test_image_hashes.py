@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from PIL import Image, ImageFilter
+
+from hamming_index import hamming_distance
+from image_hashes import HASH_NAMES, batch_hashes, hash_images, load_thumbnail
+
+
+@pytest.fixture(scope="module")
+def images(tmp_path_factory):
+    """Hladké náhodné obrázky velikosti screenshotu (bez plných ploch, kde rozhodují remízy)."""
+    folder = tmp_path_factory.mktemp("images")
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(8):
+        noise = rng.integers(0, 256, (24, 12, 3)).astype(np.uint8)
+        img = Image.fromarray(noise).resize((360, 720), Image.BICUBIC).filter(ImageFilter.GaussianBlur(8))
+        path = str(folder / f"{i}.png")
+        img.save(path)
+        paths.append(path)
+    return paths
+
+
+def test_batch_equals_single_images(images):
+    thumbs = np.stack([load_thumbnail(path)[0] for path in images])
+    batch = batch_hashes(thumbs)
+    for i, thumb in enumerate(thumbs):
+        single = batch_hashes(thumb)
+        assert {name: int(single[name][0]) for name in HASH_NAMES} == {name: int(batch[name][i]) for name in HASH_NAMES}
+
+
+def test_ahash_matches_pil_box_resize(images):
+    for path in images:
+        thumb = load_thumbnail(path)[0]
+        blocks = np.asarray(Image.fromarray(thumb.astype(np.float32), "F").resize((8, 8), Image.BOX))
+        bits = "".join("1" if value > blocks.mean() else "0" for value in blocks.ravel())
+        assert int(batch_hashes(thumb)["ahash"][0]) == int(bits, 2)
+
+
+def test_phash_and_whash_close_to_imagehash(images):
+    imagehash = pytest.importorskip("imagehash")
+    hashes = hash_images(images)
+    for path in images:
+        with Image.open(path) as img:
+            reference = {"phash": imagehash.phash(img), "whash": imagehash.whash(img)}
+        for name, value in reference.items():
+            assert hamming_distance(hashes[path][name], int(str(value), 16)) <= 4
+
+
+def test_recompressed_copy_is_close(images, tmp_path):
+    copy = str(tmp_path / "copy.jpg")
+    with Image.open(images[0]) as img:
+        img.convert("RGB").resize((300, 600)).save(copy, quality=70)
+    hashes = hash_images([images[0], images[1], copy])
+    for name in HASH_NAMES:
+        assert hamming_distance(hashes[images[0]][name], hashes[copy][name]) <= 2
+        assert hamming_distance(hashes[images[0]][name], hashes[images[1]][name]) >= 16
+
+
+def test_unreadable_files_are_skipped(images, tmp_path):
+    broken = tmp_path / "broken.png"
+    broken.write_bytes(b"not an image")
+    hashes = hash_images([str(broken), images[0]], batch_size=1)
+    assert list(hashes) == [images[0]]
+    assert (hashes[images[0]]["width"], hashes[images[0]]["height"]) == (360, 720)
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from lemmas import build_table
+
+# texty, které se s lemmatizací přes pravidla a kategorie zařadily jinam než bez ní
+REGRESSIONS = [
+    ("Dětský pokoj – nový trend 2024", "Dum_Design", ["detsky pokoj"]),
+    ("dětské tvoření a trendy barvy", "Deti_Aktivity", ["detske tvoreni"]),
+]
+
+
+@pytest.mark.parametrize("text, category, matched", REGRESSIONS)
+def test_lemmas_keep_rule_triggers_apart(organizer, text, category, matched):
+    assert organizer.categorize_text_uncached(text) == (category, matched)
+
+
+def test_shipped_table_matches_rules(organizer):
+    groups, czech = organizer.rule_vocabulary()
+    assert organizer.get_ruleset().lemmas_digest == organizer.lemma_source_digest(groups, groups, czech)
+
+
+@pytest.mark.parametrize("word", ["link", "mape", "vane", "bund", "cest"])
+def test_english_lookalikes_are_not_mapped(organizer, word):
+    # holý kmen a anglická slova z OCR nesmí splynout s českým klíčovým slovem
+    assert word not in organizer.get_ruleset().lemmas
+
+
+def test_no_merge_across_groups():
+    groups = {"detska": frozenset({"pravidlo:2"}), "detsky": frozenset({"pravidlo:4"})}
+    table = build_table(groups, groups=groups, czech=set(groups))
+    assert "detsky" not in table
+    assert table["detskeho"] == "detsky"
+    assert "detske" not in table          # tvar obou slov - nejednoznačný
+
+
+def test_merge_within_group():
+    groups = {"bunda": frozenset({"kategorie:Obleceni"}), "bundy": frozenset({"kategorie:Obleceni"})}
+    assert build_table(groups, groups=groups, czech=set(groups))["bundy"] == "bunda"
+
+
+def test_foreign_words_are_not_inflected():
+    groups = {"health": frozenset({"kategorie:Zdravi"}), "bunda": frozenset({"kategorie:Obleceni"})}
+    table = build_table(groups, groups=groups, czech={"bunda"})
+    assert not any(lemma == "health" for lemma in table.values())
+    assert table["bundou"] == "bunda"
+
+
+def test_reports_surface_form(organizer, monkeypatch):
+    lemmas = {"trendy": "trend", "bundou": "bunda"}
+    monkeypatch.setattr(organizer, "ACTIVE_RULESET", organizer.get_ruleset()._replace(lemmas=lemmas))
+    _, tokens, surface = organizer.prepare_text_surface("nový trend a s bundou")
+    assert organizer.surface_terms(["trendy", "bunda", "nový"], surface, tokens) == ["trend", "bundou", "nový"]
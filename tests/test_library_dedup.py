@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+
+import numpy as np
+import pytest
+from PIL import Image, ImageFilter
+
+from file_index import FileIdentityIndex
+
+
+def _image(path, seed, size=(360, 720)):
+    noise = np.random.default_rng(seed).integers(0, 256, (24, 12, 3)).astype(np.uint8)
+    img = Image.fromarray(noise).resize(size, Image.BICUBIC).filter(ImageFilter.GaussianBlur(8))
+    img.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def library(tmp_path):
+    dest, first, second = tmp_path / "dest", tmp_path / "zdroj1", tmp_path / "zdroj2"
+    for folder in (dest / "Recepty", first, second):
+        folder.mkdir(parents=True)
+    paths = {
+        "filed": _image(dest / "Recepty" / "a.png", 1),
+        "big": _image(first / "b.png", 2),
+        "unique": _image(second / "c.png", 3),
+    }
+    paths["copy"] = str(first / "a_kopie.png")
+    shutil.copy(paths["filed"], paths["copy"])
+    paths["small"] = _image(second / "b_mensi.png", 2, size=(180, 360))
+    (first / "poznamky.txt").write_text("neni obrazek")
+    return tmp_path, paths
+
+
+def test_library_files_marks_destination(organizer, library):
+    root, paths = library
+    files = organizer.library_files([str(root / "zdroj1"), str(root / "zdroj2")], str(root / "dest"))
+    assert {path: filed for path, _, filed in files} == {
+        paths["filed"]: True, paths["big"]: False, paths["copy"]: False, paths["unique"]: False, paths["small"]: False}
+
+
+def test_find_duplicates_across_roots(organizer, library):
+    root, paths = library
+    roots = [str(root / "zdroj1"), str(root / "zdroj2")]
+    cache_dir = str(root / "cache")
+    plan, stats = organizer.find_duplicates(roots, cache_dir=cache_dir, dest_dir=str(root / "dest"), text_similarity=0)
+    groups = {entry["keep"]: (entry["remove"], entry["kinds"]) for entry in plan}
+    # zařazená kopie v cílové složce zůstává, z dvojice vizuálních duplikátů ta s vyšším rozlišením
+    assert groups == {paths["filed"]: ([paths["copy"]], {"identické": 1}),
+                      paths["big"]: ([paths["small"]], {"vizuální": 1})}
+    assert stats["files"] == 5
+
+    # druhý běh bere hashe z indexu souborů, nic znovu nečte
+    again, stats = organizer.find_duplicates(roots, cache_dir=cache_dir, dest_dir=str(root / "dest"), text_similarity=0)
+    assert again == plan
+    assert stats["indexed"] == 5 and stats["edge_reads"] == 0 and stats["full_reads"] == 0
+
+
+def test_catalog_finds_copy_in_destination(organizer, library, tmp_path):
+    root, paths = library
+    file_index = FileIdentityIndex("test", str(tmp_path / "file_index.json"))
+    catalog = organizer.build_library_catalog([str(root / "zdroj2")], str(root / "dest"), file_index)
+    assert len(catalog) == 3
+    assert catalog.find_exact(paths["copy"], os.path.getsize(paths["copy"])) == paths["filed"]
+    assert catalog.meta[paths["filed"]]["filed"] is True
+    assert catalog.find_exact(paths["big"], os.path.getsize(paths["big"])) is None
+    big_hashes = organizer.hash_images([paths["big"]])[paths["big"]]
+    hashes = {name: big_hashes[name] for name in organizer.IMAGE_HASH_NAMES}
+    assert [path for path, _, _ in catalog.find_visual(hashes)] == [paths["small"]]
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import random
+
+from minhash import LshIndex, MinHasher, shingles, similarity
+
+VOCABULARY = [f"slovo{i}" for i in range(2000)]
+
+
+def _article(rng, length=150):
+    return [rng.choice(VOCABULARY) for _ in range(length)]
+
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def test_signature_estimates_jaccard():
+    rng = random.Random(6)
+    hasher = MinHasher()
+    for _ in range(50):
+        words = _article(rng)
+        start, end = rng.randint(0, 60), rng.randint(90, 150)
+        a, b = shingles(words), shingles(words[start:end])
+        estimate = similarity(hasher.signature(a), hasher.signature(b))
+        assert abs(estimate - _jaccard(a, b)) < 0.2
+
+
+def test_lsh_finds_cropped_copies():
+    rng = random.Random(7)
+    hasher = MinHasher()
+    index = LshIndex(threshold=0.6)
+    articles = [_article(rng) for _ in range(300)]
+    for i, words in enumerate(articles):
+        index.add(hasher.signature(shingles(words)), i)
+
+    found = 0
+    for i, words in enumerate(articles[:100]):
+        # oříznutý screenshot: chybí pár řádků nahoře a dole
+        cropped = words[rng.randint(0, 8):len(words) - rng.randint(0, 8)]
+        matches = index.query(hasher.signature(shingles(cropped)))
+        found += bool(matches) and matches[0][0] == i
+        assert all(item == i for item, _ in matches)     # jiné články nad prahem nejsou
+    assert found >= 97
+
+
+def test_short_texts_have_no_signature(organizer):
+    assert organizer.text_signature("jen par slov") is None
+    assert organizer.text_signature("[CHYBA: tesseract]") is None
+    text = "recept na bramborovou polevku s houbami a smetanou od babicky"
+    assert similarity(organizer.text_signature(text), organizer.text_signature("Like Share " + text)) == 1.0
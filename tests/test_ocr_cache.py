@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from ocr_cache import OcrTextCache
+
+TEXTS = {
+    "a1": "Recept na bramborovou polévku",
+    "b2": 'citace "v uvozovkách", čárky: a {závorky}',
+    "c3": "řádek\nnový řádek\t🍲",
+    "d4": "12345",
+}
+
+
+@pytest.fixture
+def saved(tmp_path):
+    cache = OcrTextCache("v1", str(tmp_path / "ocr_texts.json"))
+    for file_hash, text in TEXTS.items():
+        cache.put(file_hash, text, filename=file_hash + ".png")
+    cache.save()
+    return cache.path
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 16, 1 << 20])
+def test_iter_texts_streams_saved_entries(saved, chunk_size):
+    assert list(OcrTextCache("v1", saved).iter_texts(chunk_size)) == list(TEXTS.values())
+
+
+def test_iter_texts_other_version_or_missing(saved, tmp_path):
+    assert list(OcrTextCache("v2", saved).iter_texts()) == []
+    assert list(OcrTextCache("v1", str(tmp_path / "missing.json")).iter_texts()) == []
+
+
+def test_iter_texts_stops_on_truncated_file(saved):
+    with open(saved, "r", encoding="utf-8") as f:
+        data = f.read()
+    cut = data.index(TEXTS["c3"][:5].replace("\n", "\\n"))
+    with open(saved, "w", encoding="utf-8") as f:
+        f.write(data[:cut + 3])
+    assert list(OcrTextCache("v1", saved).iter_texts(4)) == [TEXTS["a1"], TEXTS["b2"]]
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+# (text, výsledek s n-gramy, výsledek s původním substring matchingem)
+BOUNDARIES = [
+    ("busy booking hotel", ("Traveling", ["hotel", "booking"]), ("Deti_Aktivity", ["busy book"])),
+    ("nebusy book", ("Knihy_Cetba", ["book"]), ("Deti_Aktivity", ["busy book"])),
+    ("kam jetel roste", ("Neprirazeno", []), ("Traveling", ["kam jet"])),
+]
+
+
+@pytest.mark.parametrize("text, ngram, substring", BOUNDARIES)
+def test_phrase_must_match_whole_words(organizer, text, ngram, substring):
+    assert organizer.categorize_text_uncached(text) == ngram
+    assert organizer.categorize_text_substring_phrases(text) == substring
+
+
+@pytest.mark.parametrize("text", ["busy book pro deti", "recept do air fryer", "svacina do skolky zdrava svacina"])
+def test_whole_phrases_match_as_before(organizer, text):
+    assert organizer.categorize_text_uncached(text) == organizer.categorize_text_substring_phrases(text)
+
+
+def test_ngrams_only_of_rule_lengths(organizer):
+    norm_text = "busy book a jeste busy booking"
+    grams = organizer.build_ngrams(norm_text, set(norm_text.split()))
+    assert "busy book" in grams
+    assert "jeste busy" not in grams            # "jeste" žádnou frázi z pravidel nezačíná
+    assert "book" in grams and "booking" in grams
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+
+@pytest.fixture
+def fuzzy(organizer):
+    organizer.enable_fuzzy()
+    yield organizer
+    organizer.FUZZY_INDEX = None
+
+
+def test_rank_categories_matches_categorize_text(organizer):
+    texts = ["lego duplo kostky stavebnice pro deti", "zahradni nastroje", "recept na bramborovou polevku",
+             "nastroje lepeni flowre", "", "[CHYBA: tesseract]"]
+    for text in texts:
+        assert organizer.categorize_text(text)[0] == organizer.rank_categories(text)[0][0]
+
+
+def test_rank_categories_runs_fuzzy_stage(fuzzy):
+    # remíza váhového systému (nastroje × lepeni), rozhodne až opravený překlep "flowre" → flower
+    text = "nastroje lepeni flowre"
+    single, ranked = fuzzy.rank_categories(text)
+    assert fuzzy.categorize_text(text)[0] == single[0] == "Zahrada"
+    assert ranked[0].category == "Zahrada"
+    assert ranked[0].rule == "FUZZY"
+    assert "Deti_Aktivity" in [c.category for c in ranked[1:]]
+
+
+def test_confident_label_ignores_later_stages(fuzzy):
+    # štítky pro trénink klasifikátoru dávají jen přesná pravidla
+    assert fuzzy.confident_label("nastroje lepeni flowre") is None
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from rule_profiler import RuleProfiler
+
+TEXTS = ["recept na bramborovou polevku", "zahradni nastroje", "nic tu neni", "lego duplo kostky stavebnice pro deti"]
+
+
+@pytest.fixture
+def profiler(organizer, monkeypatch):
+    monkeypatch.setattr(organizer, "MEMO", None)
+    monkeypatch.setattr(organizer, "PROFILER", RuleProfiler())
+    return organizer.PROFILER
+
+
+def test_profiler_does_not_change_results(organizer, profiler):
+    profiled = [organizer.categorize_text(text) for text in TEXTS]
+    organizer.PROFILER = None
+    assert [organizer.categorize_text(text) for text in TEXTS] == profiled
+
+
+def test_profiler_counts_evaluations_and_deciders(organizer, profiler):
+    deciders = []
+    for text in TEXTS:
+        organizer.categorize_text(text)
+        deciders.append(profiler.last_decision)
+    assert deciders[:3] == ["PRAVIDLO 1", "VAHY: Zahrada", "NEPRIRAZENO: prah"]
+
+    assert profiler.documents == len(TEXTS)
+    assert sum(profiler.decisions.values()) == len(TEXTS)
+    rule1 = profiler.rules["PRAVIDLO 1"]
+    assert (rule1.evaluations, rule1.fires, rule1.decisions) == (4, 1, 1)
+    # po zásahu pravidla 1 se další pravidla ani váhový systém nevyhodnocují
+    assert profiler.rules["PRAVIDLO 12"].evaluations == 3
+    assert {stats.evaluations for stats in profiler.fallback.values()} == {3}
+    assert profiler.fallback["Zahrada"].decisions == 1
+    assert "PRAVIDLO 1" in profiler.report()
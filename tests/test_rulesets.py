@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+RULES_FILE = '''
+from categories_v1 import CATEGORIES as _BASE, WORD_WEIGHTS, SOCIAL_MEDIA_UI_KEYWORDS
+CATEGORIES = dict(_BASE, Zahrada=list(_BASE["Zahrada"]) + ["kvetinac"])
+WORD_WEIGHTS = dict(WORD_WEIGHTS, kvetinac=10)
+'''
+
+
+@pytest.fixture
+def active(organizer):
+    saved = organizer.get_ruleset()
+    yield organizer
+    organizer.activate_ruleset(saved)
+
+
+def test_reload_swaps_whole_ruleset(active, tmp_path):
+    path = tmp_path / "categories_new.py"
+    path.write_text(RULES_FILE, encoding="utf-8")
+    old = active.get_ruleset()
+    assert active.categorize_text_uncached("kvetinac")[0] == "Neprirazeno"
+
+    new = active.reload_rules(str(path))
+    assert active.get_ruleset() is new
+    assert active.categorize_text_uncached("kvetinac") == ("Zahrada", ["kvetinac"])
+    # soubor bez CONTEXT_RULES převezme kontextová pravidla i lemmata aktivní sady
+    assert new.context_rules is old.context_rules
+    assert new.lemmas is old.lemmas
+    # stará sada se nezměnila - kdo si ji vzal, dokončí dokument podle ní
+    assert "kvetinac" not in old.categories["Zahrada"]
+    assert old.compiled is not new.compiled
+
+
+def test_categorize_reads_ruleset_once(active, monkeypatch):
+    calls = []
+    get_ruleset = active.get_ruleset
+    monkeypatch.setattr(active, "get_ruleset", lambda: calls.append(1) or get_ruleset())
+    active.categorize_text_uncached("recept na bramborovou polevku")
+    assert len(calls) == 1
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from stage_stats import StageStats
+
+
+@pytest.fixture
+def stages(organizer, monkeypatch):
+    monkeypatch.setattr(organizer, "MEMO", None)
+    monkeypatch.setattr(organizer, "STAGES", StageStats())
+    monkeypatch.setattr(organizer, "FUZZY_INDEX", organizer.build_fuzzy_index(organizer.get_compiled()))
+    return organizer.STAGES
+
+
+def test_later_stages_only_see_unassigned(organizer, stages):
+    results = [organizer.categorize_text(text) for text in
+               ("recept na bramborovou polevku", "zahradni nastroje", "nastroje lepeni flowre", "nic tu neni")]
+    assert [category for category, _ in results] == ["Recepty", "Zahrada", "Zahrada", "Neprirazeno"]
+    assert stages.stages["1 přesná pravidla"][:2] == [4, 2]
+    assert stages.stages["2a fuzzy"][:2] == [2, 1]
+    assert "2b re-OCR" not in stages.stages and "3 klasifikátor" not in stages.stages
+
+
+def test_reocr_only_with_image_and_unassigned(organizer, stages, monkeypatch):
+    calls = []
+
+    def better_ocr(path, high_quality=False):
+        calls.append((path, high_quality))
+        return "Recept na bramborovou polévku"
+
+    monkeypatch.setattr(organizer, "REOCR", True)
+    monkeypatch.setattr(organizer, "extract_text_from_image", better_ocr)
+    assert organizer.categorize_text("zahradni nastroje", image_path="a.png")[0] == "Zahrada"
+    assert organizer.categorize_text("nic tu neni")[0] == "Neprirazeno"
+    assert organizer.categorize_text("nic tu neni", image_path="b.png")[0] == "Recepty"
+    assert calls == [("b.png", True)]
+    assert stages.stages["2b re-OCR"][:2] == [1, 1]
+
+
+def test_memo_stage(organizer, stages, monkeypatch):
+    monkeypatch.setattr(organizer, "MEMO", organizer.CategorizeMemo(organizer.ruleset_fingerprint()))
+    for _ in range(3):
+        organizer.categorize_text("recept na bramborovou polevku")
+    assert stages.stages["0 memo"][:2] == [2, 2]
+    assert stages.stages["1 přesná pravidla"][:2] == [1, 1]
+    assert "0 memo" in stages.report()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import itertools
+
+from term_miner import CountMinSketch, TermMiner
+
+
+def test_sketch_rows_are_independent():
+    # stejně dlouhé položky - u CRC32 s jiným počátečním stavem kolidovaly ve všech řádcích naráz
+    sketch = CountMinSketch(width=256, depth=4)
+    items = [f"term{i:05d}" for i in range(3000)]
+    columns = {}
+    for item in items:
+        columns.setdefault(sketch._indexes(item)[0], []).append(item)
+    pairs = 0
+    repeated = [0] * (sketch.depth - 1)
+    for bucket in columns.values():
+        for a, b in itertools.combinations(bucket, 2):
+            pairs += 1
+            ia, ib = sketch._indexes(a), sketch._indexes(b)
+            for row in range(1, sketch.depth):
+                repeated[row - 1] += ia[row] == ib[row]
+    assert pairs > 10000
+    # nezávislé řádky: kolize v dalším řádku s pravděpodobností ~1/width
+    for count in repeated:
+        assert count / pairs < 3 / sketch.width
+
+
+def test_sketch_never_underestimates():
+    sketch = CountMinSketch(width=64, depth=4)
+    counts = {f"w{i}": i % 7 + 1 for i in range(500)}
+    for item, count in counts.items():
+        for _ in range(count):
+            sketch.add_many([item])
+    assert all(sketch.estimate(item) >= count for item, count in counts.items())
+
+
+def test_miner_finds_unassigned_term():
+    miner = TermMiner(known={"recept"}, capacity=100, sketch_width=1024)
+    for i in range(50):
+        miner.add(["airfryer", "recept", f"slovo{i}"], assigned=False)
+        miner.add(["recept", "zahrada", f"jine{i}"], assigned=True)
+    terms = [candidate[0] for candidate in miner.candidates(limit=5)]
+    assert "airfryer" in terms and "recept" not in terms
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from text_classifier import HashedLinearClassifier
+
+# slova, která v pravidlech nejsou - o kategorii rozhodne jen klasifikátor
+CORPUS = [
+    ("osmahnout cibulku osolit opeprit".split(), "Recepty"),
+    ("nechat prejit varem osolit".split(), "Recepty"),
+    ("cibulku osmahnout dozlatova".split(), "Recepty"),
+    ("okopat hlinu a zalit".split(), "Zahrada"),
+    ("zrytou hlinu okopat".split(), "Zahrada"),
+    ("prihnojit hlinu zalit".split(), "Zahrada"),
+]
+
+
+@pytest.fixture
+def model():
+    model = HashedLinearClassifier(["Recepty", "Zahrada"], n_features=2 ** 12)
+    model.fit([words for words, _ in CORPUS], [label for _, label in CORPUS], epochs=30, seed=0)
+    return model
+
+
+def test_fit_predicts_training_corpus(model):
+    predicted = model.predict([words for words, _ in CORPUS])
+    assert [label for label, _ in predicted] == [label for _, label in CORPUS]
+
+
+def test_save_load_round_trip(model, tmp_path):
+    path = str(tmp_path / "classifier.npz")
+    model.fingerprint = "pravidla-1"
+    model.save(path)
+    loaded = HashedLinearClassifier.load(path)
+    docs = [words for words, _ in CORPUS] + [["neznamy", "text"]]
+    assert loaded.predict(docs) == model.predict(docs)
+    assert loaded.digest == model.digest
+    assert loaded.fingerprint == "pravidla-1"
+
+
+def test_threshold_leaves_uncertain_docs_unassigned(model):
+    (label, prob), = model.predict([["neznamy", "text"]], threshold=0.99)
+    assert label is None and prob < 0.99
+
+
+def test_deferred_batch_matches_per_document(organizer, model, monkeypatch):
+    monkeypatch.setattr(organizer, "CLASSIFIER", model)
+    monkeypatch.setattr(organizer, "CLASSIFIER_THRESHOLD", 0.5)
+    monkeypatch.setattr(organizer, "MEMO", None)
+    texts = ["cibulku osolit", "okopat hlinu", "neco uplne jineho"]
+    calls = []
+    classify = organizer.classify_unassigned
+    monkeypatch.setattr(organizer, "classify_unassigned", lambda docs: calls.append(len(docs)) or classify(docs))
+
+    deferred = [organizer.categorize_text(t, defer_classifier=True) for t in texts]
+    assert calls == [] and all(cat == "Neprirazeno" for cat, _ in deferred)
+    batch = organizer.classify_deferred(texts)
+    assert calls == [len(texts)]
+    expected = [organizer.categorize_text(t) for t in texts]
+    assert [r or ("Neprirazeno", []) for r in batch] == expected
+    assert [cat for cat, _ in expected[:2]] == ["Recepty", "Zahrada"]
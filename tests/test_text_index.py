@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import math
+import random
+
+import pytest
+
+from text_index import Bm25Index
+
+WORDS = "recept polevka brambor zahrada kvetina lego kostka sleva kod bunda vanoce strom".split()
+
+
+def _corpus(n=300, seed=5):
+    rng = random.Random(seed)
+    return [[rng.choice(WORDS) for _ in range(rng.randint(1, 15))] for _ in range(n)]
+
+
+def _bm25(docs, query, k1=1.2, b=0.75):
+    avgdl = sum(len(doc) for doc in docs) / len(docs)
+    scores = []
+    for doc in docs:
+        score = 0.0
+        for term in set(query):
+            df = sum(1 for d in docs if term in d)
+            tf = doc.count(term)
+            if tf:
+                idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+                score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / avgdl))
+        scores.append(score)
+    return scores
+
+
+@pytest.fixture
+def index():
+    index = Bm25Index("v1")
+    for i, doc in enumerate(_corpus()):
+        index.add(f"hash{i}", f"{i}.png", doc)
+    return index
+
+
+def test_search_matches_bm25_formula(index):
+    docs = _corpus()
+    for query in (["recept", "polevka"], ["lego"], ["vanoce", "strom", "sleva", "neznam"]):
+        expected = _bm25(docs, query)
+        found = index.search(query, top_n=10)
+        assert len(found) == 10
+        for key, name, score in found:
+            assert score == pytest.approx(expected[int(key[4:])], rel=1e-4)
+        assert [score for _, _, score in found] == sorted((score for _, _, score in found), reverse=True)
+        assert found[0][2] == pytest.approx(max(expected), rel=1e-4)
+
+
+def test_exclude_and_duplicate_keys(index):
+    top_key = index.search(["lego"], top_n=1)[0][0]
+    assert top_key not in [key for key, _, _ in index.search(["lego"], top_n=300, exclude=top_key)]
+    assert not index.add("hash0", "0.png", ["lego"])
+    assert index.search(["neznam"]) == []
+
+
+def test_save_load_round_trip(index, tmp_path):
+    index.path = str(tmp_path / "text_index.npz")
+    index.save()
+    loaded = Bm25Index("v1", index.path)
+    assert loaded.load() == len(index)
+    assert loaded.search(["recept", "kod"]) == index.search(["recept", "kod"])
+    assert Bm25Index("v2", index.path).load() == 0